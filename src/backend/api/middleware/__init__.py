@@ -0,0 +1,3 @@
+from .profiling import ProfilingMiddleware, instrument_engine, request_stats
+
+__all__ = ["ProfilingMiddleware", "instrument_engine", "request_stats"]
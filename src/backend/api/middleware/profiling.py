@@ -0,0 +1,200 @@
+import cProfile
+import heapq
+import logging
+import time
+from collections import defaultdict, deque
+from contextvars import ContextVar
+from pathlib import Path
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+STATEMENT_KEY_CHARS = 160  # statements are grouped by their leading text
+ROUTE_SAMPLES = 500
+# Stats are keyed by method and route template; anything a client can vary
+# freely (unmatched paths, made-up methods) shares one key so the table stays bounded
+UNMATCHED_ROUTE = "<unmatched>"
+KNOWN_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+
+class RequestProfile:
+    """Counters for one HTTP request, filled in by the SQLAlchemy listeners."""
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.db_count = 0
+        self.db_seconds = 0.0
+        # statement prefix → [count, total seconds]
+        self.statements: defaultdict[str, list] = defaultdict(lambda: [0, 0.0])
+        self.response_bytes = 0
+        self.closed = False
+
+    def record(self, statement: str, seconds: float) -> None:
+        if self.closed:  # a background task that inherited the request context
+            return
+        self.db_count += 1
+        self.db_seconds += seconds
+        entry = self.statements[" ".join(statement.split())[:STATEMENT_KEY_CHARS]]
+        entry[0] += 1
+        entry[1] += seconds
+
+    def breakdown(self, limit: int = 10) -> list[tuple[str, int, float]]:
+        """(statement, count, ms) for the statements with the most total time."""
+        top = heapq.nlargest(limit, self.statements.items(), key=lambda item: item[1][1])
+        return [(sql, count, seconds * 1000) for sql, (count, seconds) in top]
+
+
+class RouteStats:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.wall_ms: deque[float] = deque(maxlen=ROUTE_SAMPLES)
+        self.db_ms_total = 0.0
+        self.statements_total = 0
+        self.bytes_total = 0
+
+
+_current: ContextVar[RequestProfile | None] = ContextVar("request_profile", default=None)
+_route_stats: defaultdict[str, RouteStats] = defaultdict(RouteStats)
+# (wall ms, file) of the slowest sampled profiles kept on disk
+_kept_profiles: list[tuple[float, str]] = []
+_profiler_busy = False
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attribute this engine's statements to the request being served."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is not None:
+            conn.info.setdefault("profile_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        profile = _current.get()
+        if profile is not None and conn.info.get("profile_start"):
+            profile.record(statement, time.perf_counter() - conn.info["profile_start"].pop())
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware: per-request wall time, SQL statement count, DB time
+    and response size. Adds a Server-Timing header, logs requests slower than
+    profile_slow_request_ms with their statement breakdown, and runs a
+    profile_sample_rate fraction of requests under cProfile, keeping the
+    profile_keep slowest as .prof files. cProfile hooks the whole thread, so
+    a sampled profile also contains whatever other requests ran meanwhile.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._sample_every = (
+            round(1 / settings.profile_sample_rate) if settings.profile_sample_rate > 0 else 0
+        )
+        self._seen = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        global _profiler_busy
+        profile = RequestProfile()
+        token = _current.set(profile)
+        status_code = 500
+
+        profiler = None
+        self._seen += 1
+        if self._sample_every and self._seen % self._sample_every == 0 and not _profiler_busy:
+            _profiler_busy = True
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                elapsed_ms = (time.perf_counter() - profile.start) * 1000
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", (
+                    f"app;dur={elapsed_ms:.1f}, "
+                    f'db;dur={profile.db_seconds * 1000:.1f};desc="{profile.db_count} queries"'
+                ).encode()))
+                message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                profile.response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.closed = True
+            _current.reset(token)
+            if profiler is not None:
+                profiler.disable()
+                _profiler_busy = False
+            self._finish(scope, profile, status_code, profiler)
+
+    def _finish(
+        self, scope: Scope, profile: RequestProfile, status_code: int, profiler
+    ) -> None:
+        wall_ms = (time.perf_counter() - profile.start) * 1000
+        route = scope.get("route")
+        method = scope["method"] if scope["method"] in KNOWN_METHODS else "OTHER"
+        key = f"{method} {getattr(route, 'path', UNMATCHED_ROUTE)}"
+
+        stats = _route_stats[key]
+        stats.requests += 1
+        stats.wall_ms.append(wall_ms)
+        stats.db_ms_total += profile.db_seconds * 1000
+        stats.statements_total += profile.db_count
+        stats.bytes_total += profile.response_bytes
+
+        if wall_ms >= settings.profile_slow_request_ms:
+            lines = "".join(
+                f"\n  {count:>4}x {ms:8.1f} ms  {sql}"
+                for sql, count, ms in profile.breakdown()
+            )
+            logger.warning(
+                "Slow request %s %s → %d in %.0f ms (%d statements, %.0f ms DB, %d bytes)%s",
+                scope["method"], scope["path"], status_code, wall_ms,
+                profile.db_count, profile.db_seconds * 1000, profile.response_bytes, lines,
+            )
+        if profiler is not None:
+            _keep_profile(profiler, key, wall_ms)
+
+
+def _keep_profile(profiler: cProfile.Profile, key: str, wall_ms: float) -> None:
+    if len(_kept_profiles) >= settings.profile_keep and wall_ms <= _kept_profiles[0][0]:
+        return
+    folder = Path(settings.profile_dir)
+    folder.mkdir(parents=True, exist_ok=True)
+    name = "".join(c if c.isalnum() else "_" for c in key).strip("_")
+    path = folder / f"{int(time.time() * 1000)}-{wall_ms:.0f}ms-{name}.prof"
+    profiler.dump_stats(path)
+    heapq.heappush(_kept_profiles, (wall_ms, str(path)))
+    if len(_kept_profiles) > settings.profile_keep:
+        _, evicted = heapq.heappop(_kept_profiles)
+        Path(evicted).unlink(missing_ok=True)
+
+
+def request_stats() -> dict[str, dict]:
+    """Per-route aggregates for /metrics/requests, slowest p95 first."""
+    result: dict[str, dict] = {}
+    for key, stats in _route_stats.items():
+        samples = sorted(stats.wall_ms)
+        result[key] = {
+            "requests": stats.requests,
+            "p50Ms": samples[len(samples) // 2],
+            "p95Ms": samples[int(len(samples) * 0.95)],
+            "maxMs": samples[-1],
+            "avgStatements": stats.statements_total / stats.requests,
+            "avgDbMs": stats.db_ms_total / stats.requests,
+            "avgBytes": stats.bytes_total / stats.requests,
+        }
+    return dict(sorted(result.items(), key=lambda item: item[1]["p95Ms"], reverse=True))
@@ -1,18 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from models.orm import PageResult
-from models.schemas import AiSuggestionResponse, PageDiagnosisResponse
-from services.ai import generate_suggestions
+from models.orm import PageResult, ScanTask
+from models.schemas import AiSuggestionResponse, PageDiagnosisResponse, SeoIssueResponse
+from services.issues import compact_page_issues
+from services.scoring import decode_issues
 from utils.database import get_db
 
 router = APIRouter(prefix="/pages", tags=["pages"])
 
 
 @router.get("/{page_id}", response_model=PageDiagnosisResponse)
-async def get_page_diagnosis(page_id: str, db: AsyncSession = Depends(get_db)):
+async def get_page_diagnosis(
+    page_id: str,
+    scanId: Optional[str] = Query(None, description="Scan the page belongs to; required for archived scans"),
+    db: AsyncSession = Depends(get_db),
+):
+    if scanId:
+        scan = await db.get(ScanTask, scanId)
+        if scan and scan.archivedAt:
+            from services.archive import read_archived_page  # pyarrow, loaded lazily
+
+            archived = await read_archived_page(scan, page_id)
+            if not archived:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Page result not found")
+            return archived
+
     result = await db.execute(
         select(PageResult)
         .where(PageResult.id == page_id)
@@ -24,6 +41,15 @@ async def get_page_diagnosis(page_id: str, db: AsyncSession = Depends(get_db)):
     page = result.scalar_one_or_none()
     if not page:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Page result not found")
+    if page.issueMask is not None:
+        return PageDiagnosisResponse.model_validate(page).model_copy(update={
+            "issues": [
+                SeoIssueResponse(**issue)
+                for issue in compact_page_issues(
+                    page.id, page.crawledAt, page.issueMask, page.issueParams
+                )
+            ],
+        })
     return page
 
 
@@ -46,7 +72,15 @@ async def generate_ai_suggestions(page_id: str, db: AsyncSession = Depends(get_d
         await db.delete(s)
     await db.flush()
 
-    new_suggestions = await generate_suggestions(page, page.issues)
+    # The anthropic SDK is heavy to import; load it only when suggestions are requested
+    from services.ai import generate_suggestions
+
+    issues = (
+        decode_issues(page.issueMask, page.issueParams)
+        if page.issueMask is not None
+        else page.issues
+    )
+    new_suggestions = await generate_suggestions(page, issues)
     for s in new_suggestions:
         db.add(s)
 
@@ -1,15 +1,39 @@
 import asyncio
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from datetime import datetime
+from typing import Optional
+from urllib.parse import urlparse
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import String, case, func, insert, literal_column, select
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by, array
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from crawler import run_crawler
-from models.orm import ScanTask, Site, PageResult
-from models.schemas import ScanCreate, ScanTaskResponse, PageResultResponse
-from utils.database import get_db
+from models.orm import ScanBatch, ScanTask, Site, PageResult, SeoIssue
+from models.schemas import (
+    ExportFormat,
+    ScanCreate,
+    ScanBatchCreate,
+    ScanBatchResponse,
+    ScanBatchProgressResponse,
+    ScanTaskResponse,
+    PageResultResponse,
+    PageChange,
+    PageDiffResponse,
+    ScanDiffResponse,
+    ScanDiffSummary,
+)
+from services.issues import compact_issue_codes
+from services.scoring import ISSUE_CATALOG
+from services.ws_manager import manager
+from utils.database import get_db, get_read_db
+from utils.responses import fast_json_rows
 
 router = APIRouter(prefix="/scans", tags=["scans"])
 
+# get_scan_results selects exactly these columns, in this order
+_RESULT_FIELDS = tuple(PageResultResponse.model_fields)
+
 
 @router.post("", response_model=ScanTaskResponse, status_code=status.HTTP_201_CREATED)
 async def create_scan(
@@ -20,7 +44,29 @@ async def create_scan(
     if not site:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Site not found")
 
-    scan = ScanTask(siteId=payload.siteId, status="PENDING")
+    if payload.mode == "URL_LIST":
+        base_host = urlparse(
+            site.domain if site.domain.startswith("http") else f"https://{site.domain}"
+        ).netloc
+        foreign = [
+            url for url in payload.urls
+            if urlparse(url).scheme not in ("http", "https") or urlparse(url).netloc != base_host
+        ]
+        if foreign:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"URLs must be http(s) on {base_host}: {', '.join(foreign[:10])}",
+            )
+
+    scan = ScanTask(
+        siteId=payload.siteId,
+        status="PENDING",
+        mode=payload.mode,
+        maxWallSeconds=payload.maxWallSeconds,
+        maxBytes=payload.maxBytes,
+        maxBrowserMemoryMb=payload.maxBrowserMemoryMb,
+        sampleSize=payload.sampleSize,
+    )
     db.add(scan)
     await db.flush()
     await db.refresh(scan)
@@ -29,15 +75,101 @@ async def create_scan(
     scan_id = scan.id
     domain = site.domain
 
+    # Imported on first use: the crawler pulls in Playwright, BeautifulSoup/lxml
+    # and NumPy/SciPy, which API-only workers should never pay for at startup.
+    from crawler import run_crawler, run_sample, run_url_list
+
+    if payload.mode == "CRAWL":
+        job = run_crawler(scan_id, domain)
+    elif payload.mode == "SAMPLE":
+        job = run_sample(scan_id, domain)
+    else:
+        # URL_LIST fetches exactly payload.urls; SITEMAP (urls=None) reads the sitemap
+        job = run_url_list(scan_id, domain, payload.urls)
+
     # Schedule crawler as a standalone asyncio task so it runs AFTER this
     # request's DB session commits (BackgroundTasks run inside the session
     # scope in modern FastAPI, causing a rollback race condition).
     loop = asyncio.get_event_loop()
-    loop.call_soon(lambda: asyncio.ensure_future(run_crawler(scan_id, domain)))
+    loop.call_soon(lambda: asyncio.ensure_future(job))
 
     return scan
 
 
+@router.post("/batch", response_model=ScanBatchResponse, status_code=status.HTTP_201_CREATED)
+async def create_scan_batch(
+    payload: ScanBatchCreate,
+    db: AsyncSession = Depends(get_db),
+):
+    site_ids = list(dict.fromkeys(payload.siteIds))
+    result = await db.execute(select(Site.id, Site.domain).where(Site.id.in_(site_ids)))
+    domains = dict(result.all())
+    missing = [site_id for site_id in site_ids if site_id not in domains]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Sites not found: {', '.join(missing)}",
+        )
+
+    batch = ScanBatch()
+    db.add(batch)
+    await db.flush()
+
+    # One multi-row INSERT … RETURNING for every ScanTask in the batch
+    result = await db.execute(
+        insert(ScanTask).returning(ScanTask),
+        [{"siteId": site_id, "batchId": batch.id, "status": "PENDING"} for site_id in site_ids],
+    )
+    scans = result.scalars().all()
+
+    batch_id = batch.id
+    jobs = [(scan.id, domains[scan.siteId]) for scan in scans]
+
+    from crawler import run_batch
+
+    # Same post-commit scheduling as create_scan; the batch shares one
+    # browser and a fair page gate instead of one crawler per scan.
+    loop = asyncio.get_event_loop()
+    loop.call_soon(lambda: asyncio.ensure_future(run_batch(batch_id, jobs)))
+
+    return ScanBatchResponse(id=batch.id, createdAt=batch.createdAt, scans=scans)
+
+
+@router.get("/batch/{batch_id}", response_model=ScanBatchProgressResponse)
+async def get_scan_batch(batch_id: str, db: AsyncSession = Depends(get_db)):
+    batch = await db.get(ScanBatch, batch_id)
+    if not batch:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Batch not found")
+
+    def count_status(value: str):
+        return func.count().filter(ScanTask.status == value)
+
+    row = (await db.execute(
+        select(
+            func.count(),
+            count_status("PENDING"),
+            count_status("RUNNING"),
+            count_status("COMPLETED"),
+            count_status("FAILED"),
+            count_status("CANCELLED"),
+            func.coalesce(func.sum(ScanTask.pagesScanned), 0),
+            func.coalesce(func.sum(ScanTask.pagesFound), 0),
+        ).where(ScanTask.batchId == batch_id)
+    )).one()
+    total, pending, running, completed, failed, cancelled, pages_scanned, pages_found = row
+    return ScanBatchProgressResponse(
+        id=batch_id,
+        scansTotal=total,
+        pending=pending,
+        running=running,
+        completed=completed,
+        failed=failed,
+        cancelled=cancelled,
+        pagesScanned=pages_scanned,
+        pagesFound=pages_found,
+    )
+
+
 @router.get("/{scan_id}", response_model=ScanTaskResponse)
 async def get_scan(scan_id: str, db: AsyncSession = Depends(get_db)):
     scan = await db.get(ScanTask, scan_id)
@@ -46,14 +178,262 @@ async def get_scan(scan_id: str, db: AsyncSession = Depends(get_db)):
     return scan
 
 
+@router.post("/{scan_id}/cancel", response_model=ScanTaskResponse, status_code=status.HTTP_202_ACCEPTED)
+async def cancel_scan(scan_id: str, db: AsyncSession = Depends(get_db)):
+    """
+    Stop a scan. A PENDING scan is cancelled on the spot; a RUNNING one is
+    flagged, and its crawler (in whichever worker runs it) notices within
+    scan_guard_interval_seconds, closes its pages and ends it CANCELLED,
+    keeping the pages crawled so far.
+    """
+    scan = await db.get(ScanTask, scan_id, with_for_update=True)
+    if not scan:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Scan not found")
+    if scan.status not in ("PENDING", "RUNNING"):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Scan is already {scan.status}",
+        )
+
+    scan.stopReason = "CANCELLED"
+    if scan.status == "PENDING":
+        scan.status = "CANCELLED"
+        scan.completedAt = datetime.utcnow()
+    await db.commit()
+    if scan.status == "CANCELLED":
+        await manager.broadcast(scan_id, {"type": "cancelled", "pagesScanned": 0})
+    return scan
+
+
 @router.get("/{scan_id}/results", response_model=list[PageResultResponse])
-async def get_scan_results(scan_id: str, db: AsyncSession = Depends(get_db)):
+async def get_scan_results(
+    request: Request,
+    scan_id: str,
+    issue: Optional[list[str]] = Query(None, description="Only pages that have all of these issue codes"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Bulk path: plain column tuples encoded with orjson, without building ORM
+    objects or validating each row through PageResultResponse.
+    """
     scan = await db.get(ScanTask, scan_id)
     if not scan:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Scan not found")
-    result = await db.execute(
-        select(PageResult)
-        .where(PageResult.scanTaskId == scan_id)
-        .order_by(PageResult.seoScore.asc())
+    if issue:
+        unknown = sorted(set(issue) - ISSUE_CATALOG.keys())
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Unknown issue codes: {', '.join(unknown)}",
+            )
+    if scan.archivedAt:
+        from services.archive import read_archived_pages  # pyarrow, loaded lazily
+
+        pages = await read_archived_pages(scan, issue)
+        return fast_json_rows(
+            request, _RESULT_FIELDS, ([page.get(key) for key in _RESULT_FIELDS] for page in pages)
+        )
+
+    query = select(*(getattr(PageResult, key) for key in _RESULT_FIELDS)).where(
+        PageResult.scanTaskId == scan_id
+    )
+    if issue and scan.compactIssues:
+        # GIN-indexed key-existence test on issueParams (?&)
+        query = query.where(PageResult.issueParams.has_all(array(issue)))
+    elif issue:
+        query = query.where(
+            PageResult.id.in_(
+                select(SeoIssue.pageResultId)
+                .where(SeoIssue.code.in_(issue))
+                .group_by(SeoIssue.pageResultId)
+                .having(func.count(func.distinct(SeoIssue.code)) == len(set(issue)))
+            )
+        )
+    result = await db.execute(query.order_by(PageResult.seoScore.asc()))
+    return fast_json_rows(request, _RESULT_FIELDS, result.all())
+
+
+@router.get("/{scan_id}/export")
+async def export_scan(
+    scan_id: str,
+    format: ExportFormat = Query("csv"),
+    gzip: bool = Query(False, description="gzip-compress the file"),
+    db: AsyncSession = Depends(get_db),
+):
+    scan = await db.get(ScanTask, scan_id)
+    if not scan:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Scan not found")
+    if scan.archivedAt:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Scan is archived; its Parquet files are already the export",
+        )
+
+    from services.export import MEDIA_TYPES, stream_scan_export  # pyarrow, loaded lazily
+
+    filename = f"scan-{scan_id}.{format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        stream_scan_export(scan_id, format, compress=gzip),
+        media_type="application/gzip" if gzip else MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/{scan_id}/diff", response_model=ScanDiffResponse)
+async def get_scan_diff(
+    scan_id: str,
+    base: Optional[str] = Query(None, description="Scan to compare against; defaults to the previous completed scan"),
+    change: Optional[PageChange] = Query(None, description="Only return pages with this change kind"),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_read_db),
+):
+    head_scan = await db.get(ScanTask, scan_id)
+    if not head_scan:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Scan not found")
+
+    if base:
+        base_scan = await db.get(ScanTask, base)
+        if not base_scan:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Base scan not found")
+        if base_scan.siteId != head_scan.siteId:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Scans belong to different sites",
+            )
+    else:
+        result = await db.execute(
+            select(ScanTask)
+            .where(
+                ScanTask.siteId == head_scan.siteId,
+                ScanTask.status == "COMPLETED",
+                ScanTask.createdAt < head_scan.createdAt,
+            )
+            .order_by(ScanTask.createdAt.desc())
+            .limit(1)
+        )
+        base_scan = result.scalar_one_or_none()
+        if not base_scan:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No earlier completed scan to compare against",
+            )
+
+    if head_scan.archivedAt or base_scan.archivedAt:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Cannot diff an archived scan",
+        )
+
+    # Both sides are index range scans on (scanTaskId, url), full-outer-joined
+    # on url. The summary and total come from their own aggregate over the
+    # whole diff, so paging past the end or filtering by change leaves them intact.
+    b = _diff_side(base_scan).cte("b")
+    h = _diff_side(head_scan).cte("h")
+    change_expr = case(
+        (b.c.id.is_(None), "NEW"),
+        (h.c.id.is_(None), "REMOVED"),
+        (
+            (h.c.seoScore < b.c.seoScore) | ~h.c.codes.contained_by(b.c.codes),
+            "REGRESSED",
+        ),
+        (
+            (h.c.seoScore > b.c.seoScore) | ~b.c.codes.contained_by(h.c.codes),
+            "FIXED",
+        ),
+        else_="UNCHANGED",
+    )
+    diff = (
+        select(
+            func.coalesce(h.c.url, b.c.url).label("url"),
+            change_expr.label("change"),
+            b.c.id.label("base_id"),
+            h.c.id.label("head_id"),
+            b.c.seoScore.label("base_score"),
+            h.c.seoScore.label("head_score"),
+            (h.c.seoScore - b.c.seoScore).label("delta"),
+            b.c.codes.label("base_codes"),
+            h.c.codes.label("head_codes"),
+        )
+        .select_from(b.join(h, b.c.url == h.c.url, full=True))
+        .subquery("diff")
+    )
+
+    counts = (
+        await db.execute(
+            select(
+                *(
+                    func.count().filter(diff.c.change == kind).label(kind)
+                    for kind in ("NEW", "REMOVED", "REGRESSED", "FIXED", "UNCHANGED")
+                ),
+                func.count().label("total"),
+            )
+        )
+    ).one()
+    summary = ScanDiffSummary(
+        new=counts.NEW,
+        removed=counts.REMOVED,
+        regressed=counts.REGRESSED,
+        fixed=counts.FIXED,
+        unchanged=counts.UNCHANGED,
+    )
+    total = getattr(counts, change) if change else counts.total
+
+    query = select(diff)
+    if change:
+        query = query.where(diff.c.change == change)
+    query = (
+        query.order_by(diff.c.delta.asc().nulls_last(), diff.c.url)
+        .limit(limit)
+        .offset(offset)
+    )
+    rows = (await db.execute(query)).all()
+
+    return ScanDiffResponse(
+        baseScanId=base_scan.id,
+        headScanId=head_scan.id,
+        summary=summary,
+        total=total,
+        items=[
+            PageDiffResponse(
+                url=row.url,
+                change=row.change,
+                basePageId=row.base_id,
+                headPageId=row.head_id,
+                baseScore=row.base_score,
+                headScore=row.head_score,
+                scoreDelta=row.delta,
+                issuesAdded=sorted(set(row.head_codes or ()) - set(row.base_codes or ())),
+                issuesCleared=sorted(set(row.base_codes or ()) - set(row.head_codes or ())),
+            )
+            for row in rows
+        ],
+    )
+
+
+def _diff_side(scan: ScanTask):
+    """Pages of one scan with their sorted non-PASSED issue codes."""
+    if scan.compactIssues:
+        return select(
+            PageResult.id,
+            PageResult.url,
+            PageResult.seoScore,
+            compact_issue_codes().label("codes"),
+        ).where(PageResult.scanTaskId == scan.id)
+
+    codes = func.array_agg(aggregate_order_by(SeoIssue.code, SeoIssue.code)).filter(
+        SeoIssue.category != "PASSED"
+    )
+    return (
+        select(
+            PageResult.id,
+            PageResult.url,
+            PageResult.seoScore,
+            func.coalesce(
+                codes, literal_column("'{}'::varchar[]"), type_=ARRAY(String)
+            ).label("codes"),
+        )
+        .outerjoin(SeoIssue, SeoIssue.pageResultId == PageResult.id)
+        .where(PageResult.scanTaskId == scan.id)
+        .group_by(PageResult.id)
     )
-    return result.scalars().all()
@@ -1,24 +1,41 @@
+from datetime import datetime, timezone
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import array
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from models.orm import PageResult, ScanTask, SeoIssue, Site, ScoreHistory
+from models.orm import PageResult, ScanSchedule, ScanTask, SeoIssue, Site, ScoreHistory
 from models.schemas import (
     SiteCreate,
     SiteResponse,
+    ScanScheduleUpsert,
+    ScanScheduleResponse,
     ScanTaskResponse,
     ScoreHistoryResponse,
     SeoIssueWithPageResponse,
+    TrendBucket,
+    TrendPointResponse,
 )
-from utils.database import get_db
+from services.issues import compact_page_issues
+from services.scheduler import first_run_at
+from services.scoring import ISSUE_CATALOG
+from utils.database import get_db, get_read_db
+from utils.downsample import lttb
+from utils.responses import fast_json, fast_json_rows
 
 router = APIRouter(prefix="/sites", tags=["sites"])
 
+# get_site_issues selects exactly these columns, in this order
+_ISSUE_FIELDS = tuple(SeoIssueWithPageResponse.model_fields)
+_ISSUE_COLUMNS = [
+    PageResult.url if key == "pageUrl" else getattr(SeoIssue, key) for key in _ISSUE_FIELDS
+]
+
 
 @router.get("", response_model=list[SiteResponse])
-async def list_sites(db: AsyncSession = Depends(get_db)):
+async def list_sites(db: AsyncSession = Depends(get_read_db)):
     result = await db.execute(select(Site).order_by(Site.createdAt.desc()))
     return result.scalars().all()
 
@@ -31,13 +48,58 @@ async def create_site(payload: SiteCreate, db: AsyncSession = Depends(get_db)):
             status_code=status.HTTP_409_CONFLICT,
             detail=f"Site with domain '{payload.domain}' already exists",
         )
-    site = Site(name=payload.name, domain=payload.domain)
+    site = Site(name=payload.name, domain=payload.domain, tenantId=payload.tenantId)
     db.add(site)
     await db.flush()
     await db.refresh(site)
     return site
 
 
+@router.get("/{site_id}/schedule", response_model=ScanScheduleResponse)
+async def get_site_schedule(site_id: str, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(select(ScanSchedule).where(ScanSchedule.siteId == site_id))
+    schedule = result.scalar_one_or_none()
+    if not schedule:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Schedule not found")
+    return schedule
+
+
+@router.put("/{site_id}/schedule", response_model=ScanScheduleResponse)
+async def upsert_site_schedule(
+    site_id: str,
+    payload: ScanScheduleUpsert,
+    db: AsyncSession = Depends(get_db),
+):
+    site = await db.get(Site, site_id)
+    if not site:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Site not found")
+
+    result = await db.execute(select(ScanSchedule).where(ScanSchedule.siteId == site_id))
+    schedule = result.scalar_one_or_none()
+    if not schedule:
+        schedule = ScanSchedule(siteId=site_id)
+        db.add(schedule)
+    schedule.cron = payload.cron
+    schedule.intervalMinutes = payload.intervalMinutes
+    schedule.jitterSeconds = payload.jitterSeconds
+    schedule.mode = payload.mode
+    schedule.enabled = payload.enabled
+    schedule.nextRunAt = first_run_at(schedule, datetime.utcnow())
+
+    await db.flush()
+    await db.refresh(schedule)
+    return schedule
+
+
+@router.delete("/{site_id}/schedule", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_site_schedule(site_id: str, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(select(ScanSchedule).where(ScanSchedule.siteId == site_id))
+    schedule = result.scalar_one_or_none()
+    if not schedule:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Schedule not found")
+    await db.delete(schedule)
+
+
 @router.get("/{site_id}/scans", response_model=list[ScanTaskResponse])
 async def get_site_scans(site_id: str, db: AsyncSession = Depends(get_db)):
     site = await db.get(Site, site_id)
@@ -53,10 +115,15 @@ async def get_site_scans(site_id: str, db: AsyncSession = Depends(get_db)):
 
 @router.get("/{site_id}/issues", response_model=list[SeoIssueWithPageResponse])
 async def get_site_issues(
+    request: Request,
     site_id: str,
     category: Optional[str] = Query(None, description="Filter by CRITICAL, WARNING, or PASSED"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
+    """
+    Bulk path like get_scan_results: column tuples encoded with orjson, no
+    per-row SeoIssueWithPageResponse validation.
+    """
     site = await db.get(Site, site_id)
     if not site:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Site not found")
@@ -71,10 +138,12 @@ async def get_site_issues(
     latest_scan = scan_result.scalar_one_or_none()
     if not latest_scan:
         return []
+    if latest_scan.compactIssues:
+        return fast_json(request, await _compact_site_issues(db, latest_scan.id, category))
 
     # Join SeoIssue → PageResult filtered to that scan
     query = (
-        select(SeoIssue, PageResult.url)
+        select(*_ISSUE_COLUMNS)
         .join(PageResult, SeoIssue.pageResultId == PageResult.id)
         .where(PageResult.scanTaskId == latest_scan.id)
         .order_by(SeoIssue.category, SeoIssue.impact.desc())
@@ -82,24 +151,11 @@ async def get_site_issues(
     if category and category in ("CRITICAL", "WARNING", "PASSED"):
         query = query.where(SeoIssue.category == category)
 
-    rows = (await db.execute(query)).all()
-    return [
-        SeoIssueWithPageResponse(
-            id=issue.id,
-            pageResultId=issue.pageResultId,
-            pageUrl=url,
-            category=issue.category,
-            code=issue.code,
-            description=issue.description,
-            impact=issue.impact,
-            createdAt=issue.createdAt,
-        )
-        for issue, url in rows
-    ]
+    return fast_json_rows(request, _ISSUE_FIELDS, (await db.execute(query)).all())
 
 
 @router.get("/{site_id}/trends", response_model=list[ScoreHistoryResponse])
-async def get_site_trends(site_id: str, db: AsyncSession = Depends(get_db)):
+async def get_site_trends(site_id: str, db: AsyncSession = Depends(get_read_db)):
     site = await db.get(Site, site_id)
     if not site:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Site not found")
@@ -109,3 +165,90 @@ async def get_site_trends(site_id: str, db: AsyncSession = Depends(get_db)):
         .order_by(ScoreHistory.recordedAt.asc())
     )
     return result.scalars().all()
+
+
+@router.get("/{site_id}/trends/aggregate", response_model=list[TrendPointResponse])
+async def get_site_trends_aggregate(
+    site_id: str,
+    bucket: TrendBucket = Query("day"),
+    start: Optional[datetime] = Query(None, description="Inclusive lower bound on recordedAt"),
+    end: Optional[datetime] = Query(None, description="Exclusive upper bound on recordedAt"),
+    points: Optional[int] = Query(None, ge=3, le=10_000, description="Downsample to at most this many points (LTTB)"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    site = await db.get(Site, site_id)
+    if not site:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Site not found")
+
+    # Aggregated in SQL over the (siteId, recordedAt) index — at most one row
+    # per bucket leaves the database however dense the history is.
+    bucket_start = func.date_trunc(bucket, ScoreHistory.recordedAt).label("bucket")
+    query = (
+        select(
+            bucket_start,
+            func.avg(ScoreHistory.avgScore).label("avgScore"),
+            func.min(ScoreHistory.avgScore).label("minScore"),
+            func.max(ScoreHistory.avgScore).label("maxScore"),
+            func.avg(ScoreHistory.pagesCount).label("avgPagesCount"),
+            func.count().label("samples"),
+        )
+        .where(ScoreHistory.siteId == site_id)
+        .group_by(bucket_start)
+        .order_by(bucket_start)
+    )
+    if start:
+        query = query.where(ScoreHistory.recordedAt >= _naive_utc(start))
+    if end:
+        query = query.where(ScoreHistory.recordedAt < _naive_utc(end))
+
+    rows = (await db.execute(query)).all()
+    if points:
+        rows = lttb(rows, points, x=lambda r: r.bucket.timestamp(), y=lambda r: float(r.avgScore))
+    return [
+        TrendPointResponse(
+            bucket=row.bucket,
+            avgScore=row.avgScore,
+            minScore=row.minScore,
+            maxScore=row.maxScore,
+            avgPagesCount=row.avgPagesCount,
+            samples=row.samples,
+        )
+        for row in rows
+    ]
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """recordedAt is naive UTC; clients may send offsets (...Z, +02:00)."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+_CATEGORY_ORDER = ("CRITICAL", "WARNING", "PASSED")
+
+
+async def _compact_site_issues(
+    db: AsyncSession, scan_id: str, category: Optional[str]
+) -> list[dict]:
+    """get_site_issues for a scan with compact issue storage, as response dicts."""
+    query = select(
+        PageResult.id, PageResult.url, PageResult.crawledAt,
+        PageResult.issueMask, PageResult.issueParams,
+    ).where(PageResult.scanTaskId == scan_id)
+    # Narrow in SQL: PASSED pages are exactly those with no mask bits set;
+    # a category's pages have any of its codes as an issueParams key (?|,
+    # served by the GIN index)
+    if category == "PASSED":
+        query = query.where(PageResult.issueMask == 0)
+    elif category in ("CRITICAL", "WARNING"):
+        codes = [code for code, spec in ISSUE_CATALOG.items() if spec.category == category]
+        query = query.where(PageResult.issueParams.has_any(array(codes)))
+
+    issues = [
+        {**issue, "pageUrl": url}
+        for page_id, url, crawled_at, mask, params in (await db.execute(query)).all()
+        for issue in compact_page_issues(page_id, crawled_at, mask, params)
+        if category not in _CATEGORY_ORDER or issue["category"] == category
+    ]
+    issues.sort(key=lambda issue: (_CATEGORY_ORDER.index(issue["category"]), -issue["impact"]))
+    return issues
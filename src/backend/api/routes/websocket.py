@@ -1,3 +1,5 @@
+from typing import Optional
+
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
 from services.ws_manager import manager
@@ -6,8 +8,10 @@ router = APIRouter(tags=["websocket"])
 
 
 @router.websocket("/ws/scans/{scan_id}")
-async def websocket_scan(scan_id: str, websocket: WebSocket):
-    await manager.connect(scan_id, websocket)
+async def websocket_scan(scan_id: str, websocket: WebSocket, since: Optional[int] = None):
+    # ?since=<seq> resumes after the last event the client saw; otherwise the
+    # client gets a snapshot plus recent events before live updates
+    await manager.connect(scan_id, websocket, since)
     try:
         while True:
             # Keep connection alive; crawler broadcasts via manager.broadcast()
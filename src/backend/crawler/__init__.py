@@ -1,3 +1,3 @@
-from .engine import run_crawler
+from .engine import run_batch, run_crawler, run_sample, run_url_list
 
-__all__ = ["run_crawler"]
+__all__ = ["run_batch", "run_crawler", "run_sample", "run_url_list"]
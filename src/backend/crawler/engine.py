@@ -1,137 +1,232 @@
+import asyncio
 import logging
+import random
 import time
+from array import array
+from contextlib import AsyncExitStack, nullcontext
 from datetime import datetime
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urlparse
 
-from bs4 import BeautifulSoup
+import numpy as np
 from playwright.async_api import async_playwright, Browser
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 logger = logging.getLogger(__name__)
 
 from config import get_settings
-from models.orm import PageResult, ScanTask, SeoIssue, ScoreHistory
-from services.scoring import score_page
+from crawler.extract import extract_page
+from crawler.fair import FairPageGate
+from crawler.frontier import BfsFrontier, PriorityFrontier
+from crawler.guard import CANCELLED, ScanBudget, ScanGuard, ScanStopped, cancel_requested
+from crawler.page_weight import collect_page_weight, pack_page_weight
+from crawler.sampling import Estimate, discover_urls, draw_sample, estimate_site, stratify
+from crawler.sitemap import DEFAULT_SITEMAP_PRIORITY, fetch_sitemap_entries, fetch_sitemap_urls
+from models.orm import PageLink, PageResult, ScanTask, SeoIssue, ScoreHistory, generate_cuid
+from services.link_checker import check_links
+from services.link_graph import compute_link_metrics
+from services.scoring import (
+    broken_link_params,
+    issue_bits,
+    score_broken_links,
+    score_page,
+    score_page_compact,
+)
+from services.snapshots import store_snapshot
 from services.ws_manager import manager
-from utils.database import AsyncSessionLocal
+from utils.database import CrawlerSessionLocal
 
 settings = get_settings()
 
+EDGE_BATCH_SIZE = 5000
+LIST_COMMIT_EVERY = 25  # URL-list scans commit counters in batches, not per page
 
-async def run_crawler(scan_id: str, domain: str) -> None:
+# Batch members crawl (link check included) only while holding a slot, so a
+# batch runs at most max_concurrent_scans scans at once; the rest wait PENDING
+_batch_scan_slots = asyncio.Semaphore(settings.max_concurrent_scans)
+
+
+async def run_crawler(
+    scan_id: str,
+    domain: str,
+    browser: Browser | None = None,
+    gate: FairPageGate | None = None,
+) -> None:
     """
     Background task: crawl all internal pages for a scan.
-    Uses BFS traversal up to max_crawl_depth and max_pages_per_scan.
+    Traverses up to max_crawl_depth and max_pages_per_scan, breadth-first or,
+    with crawl_frontier="priority", most important URL first (crawler.frontier;
+    the sitemap is read in the background to supply priorities).
     Persists PageResult + SeoIssue rows and broadcasts WS progress events.
+    Batch runs pass a shared browser and a FairPageGate that every page
+    fetch must take a turn from.
+
+    A cancelled scan ends CANCELLED right away, also when the cancel arrives
+    during the link check. One that runs out of budget keeps its pages and
+    link metrics but skips the broken-link check and ScoreHistory, and ends
+    COMPLETED with its stopReason set.
     """
-    db = AsyncSessionLocal()
+    db = CrawlerSessionLocal()
+    sitemap_task: asyncio.Task | None = None
     try:
-        # ── Mark RUNNING ──────────────────────────────────────────────────────
-        scan = await db.get(ScanTask, scan_id)
-        scan.status = "RUNNING"
-        scan.startedAt = datetime.utcnow()
-        await db.commit()
-        await manager.broadcast(scan_id, {"type": "status", "status": "RUNNING"})
+        scan = await _mark_running(db, scan_id)
+        if scan is None:
+            return
+        compact = scan.compactIssues
 
         # ── Resolve base URL ──────────────────────────────────────────────────
-        base_url = domain if domain.startswith("http") else f"https://{domain}"
+        base_url = _base_url(domain)
         base_host = urlparse(base_url).netloc
 
         visited: set[str] = set()
-        queue: list[tuple[str, int]] = [(base_url, 0)]  # (url, depth)
+        if settings.crawl_frontier == "priority":
+            frontier = PriorityFrontier()
+            sitemap_task = asyncio.create_task(
+                fetch_sitemap_entries(base_url, settings.sitemap_max_urls)
+            )
+        else:
+            frontier = BfsFrontier()
+        frontier.push(base_url, _normalize_url(base_url), 0)
         pages_saved = 0
         total_score = 0
 
-        # ── Playwright session ────────────────────────────────────────────────
-        async with async_playwright() as pw:
-            browser: Browser = await pw.chromium.launch(headless=True)
-            try:
-                while queue and pages_saved < settings.max_pages_per_scan:
-                    url, depth = queue.pop(0)
-                    norm = _normalize_url(url)
-                    if norm in visited:
-                        continue
-                    visited.add(norm)
+        # ── Link graph: normalized URL → dense node id, edges as int arrays ───
+        node_ids: dict[str, int] = {_normalize_url(base_url): 0}
+        node_urls: list[str] = [base_url]  # node id → first-seen URL
+        page_nodes: dict[int, str] = {}  # node id → PageResult.id
+        page_status: dict[int, int] = {}  # node id → HTTP status
+        page_scores: dict[int, int] = {}  # node id → seoScore
+        edge_sources = array("q")
+        edge_targets = array("q")
+        pending_edges: list[dict] = []
+        external_sources: dict[str, list[int]] = {}  # URL → linking node ids
+
+        def node_for(link: str) -> int:
+            norm_link = _normalize_url(link)
+            found = node_ids.get(norm_link)
+            if found is None:
+                found = node_ids[norm_link] = len(node_urls)
+                node_urls.append(link)
+            return found
+
+        # ── Playwright session (shared browser when run as part of a batch) ───
+        async with AsyncExitStack() as stack:
+            if browser is None:
+                pw = await stack.enter_async_context(async_playwright())
+                browser = await pw.chromium.launch(headless=True)
+                stack.push_async_callback(browser.close)
+            guard = await stack.enter_async_context(
+                ScanGuard(scan_id, ScanBudget.for_scan(scan), browser)
+            )
 
-                    # ── Crawl single page ─────────────────────────────────────
-                    page_data = await _crawl_page(browser, url, base_host)
-                    if page_data is None:
+            async def fetch(url: str) -> dict | None:
+                async with gate.turn(scan_id) if gate else nullcontext():
+                    return await _crawl_page(browser, url, base_host, guard=guard)
+
+            while frontier and pages_saved < settings.max_pages_per_scan:
+                if sitemap_task is not None and sitemap_task.done():
+                    frontier.set_sitemap(_sitemap_priorities(sitemap_task))
+                    sitemap_task = None
+                url, depth = frontier.pop()
+                norm = _normalize_url(url)
+                if norm in visited:
+                    continue
+                visited.add(norm)
+                node_id = node_for(url)
+
+                # ── Crawl single page ─────────────────────────────────────────
+                try:
+                    page_data = await guard.run(fetch(url))
+                except ScanStopped:
+                    visited.discard(norm)
+                    break
+                if page_data is None:
+                    continue
+
+                # ── Score + persist ───────────────────────────────────────────
+                page_id, seo_score, _ = _add_page(db, scan_id, norm, page_data, node_id, compact)
+                page_nodes[node_id] = page_id
+                page_status[node_id] = page_data["http_status"]
+                page_scores[node_id] = seo_score
+
+                # ── Record outgoing link edges ────────────────────────────────
+                # Links that differ only in spelling (/about vs /about/, host
+                # case) map to one node; PageLink allows one row per pair
+                linked: set[int] = {node_id}
+                for link in page_data["internal_links"]:
+                    target_id = node_for(link)
+                    if target_id in linked:
                         continue
-
-                    # ── Score ─────────────────────────────────────────────────
-                    seo_score, issues = score_page(
-                        http_status=page_data["http_status"],
-                        title=page_data["title"],
-                        meta_description=page_data["meta_description"],
-                        h1_count=page_data["h1_count"],
-                        images_missing_alt=page_data["images_missing_alt"],
-                        load_time_ms=page_data["load_time_ms"],
-                    )
-
-                    # ── Persist PageResult ────────────────────────────────────
-                    page_result = PageResult(
-                        scanTaskId=scan_id,
-                        url=url,
-                        httpStatus=page_data["http_status"],
-                        title=page_data["title"],
-                        titleLength=len(page_data["title"]) if page_data["title"] else None,
-                        metaDescription=page_data["meta_description"],
-                        metaDescLength=(
-                            len(page_data["meta_description"])
-                            if page_data["meta_description"]
-                            else None
-                        ),
-                        h1Count=page_data["h1_count"],
-                        h2Count=page_data["h2_count"],
-                        h3Count=page_data["h3_count"],
-                        h1Text=page_data["h1_text"],
-                        imagesTotal=page_data["images_total"],
-                        imagesMissingAlt=page_data["images_missing_alt"],
-                        loadTimeMs=page_data["load_time_ms"],
-                        seoScore=seo_score,
-                    )
-                    db.add(page_result)
-                    await db.flush()  # populate page_result.id
-
-                    # ── Persist SeoIssues ─────────────────────────────────────
-                    for issue in issues:
-                        db.add(SeoIssue(
-                            pageResultId=page_result.id,
-                            category=issue.category,
-                            code=issue.code,
-                            description=issue.description,
-                            impact=issue.impact,
-                        ))
-
-                    pages_saved += 1
-                    total_score += seo_score
-
-                    # ── Update ScanTask counters ──────────────────────────────
-                    scan = await db.get(ScanTask, scan_id)
-                    scan.pagesFound = len(visited) + len(queue)
-                    scan.pagesScanned = pages_saved
-                    await db.commit()
-
-                    # ── Broadcast progress ────────────────────────────────────
-                    await manager.broadcast(scan_id, {
-                        "type": "page_crawled",
-                        "url": url,
-                        "seoScore": seo_score,
-                        "pagesScanned": pages_saved,
-                        "pagesFound": scan.pagesFound,
+                    linked.add(target_id)
+                    edge_sources.append(node_id)
+                    edge_targets.append(target_id)
+                    pending_edges.append({
+                        "scanTaskId": scan_id,
+                        "sourceNode": node_id,
+                        "targetNode": target_id,
                     })
+                if len(pending_edges) >= EDGE_BATCH_SIZE:
+                    await db.execute(insert(PageLink), pending_edges)
+                    pending_edges = []
+                if settings.link_check_external:
+                    for link in page_data["external_links"]:
+                        external_sources.setdefault(link, []).append(node_id)
+
+                pages_saved += 1
+                total_score += seo_score
+
+                # ── Update ScanTask counters ──────────────────────────────────
+                scan = await db.get(ScanTask, scan_id)
+                scan.pagesFound = len(visited) + len(frontier)
+                scan.pagesScanned = pages_saved
+                await db.commit()
 
-                    # ── Enqueue internal links ────────────────────────────────
-                    if depth < settings.max_crawl_depth:
-                        for link in page_data["internal_links"]:
-                            if _normalize_url(link) not in visited:
-                                queue.append((link, depth + 1))
+                # ── Broadcast progress ────────────────────────────────────────
+                await manager.broadcast(scan_id, {
+                    "type": "page_crawled",
+                    "url": url,
+                    "seoScore": seo_score,
+                    "pagesScanned": pages_saved,
+                    "pagesFound": scan.pagesFound,
+                })
+
+                # ── Enqueue internal links ────────────────────────────────────
+                if depth < settings.max_crawl_depth:
+                    for link in page_data["internal_links"]:
+                        norm_link = _normalize_url(link)
+                        if norm_link not in visited:
+                            frontier.push(link, norm_link, depth + 1)
+
+        stop_reason = guard.reason
+        if stop_reason == CANCELLED or await cancel_requested(db, scan_id):
+            await _mark_cancelled(db, scan_id, len(visited), pages_saved)
+            return
+
+        # ── Link graph metrics ────────────────────────────────────────────────
+        if pending_edges:
+            await db.execute(insert(PageLink), pending_edges)
+        if page_nodes:
+            await _store_link_metrics(
+                db, len(node_ids), page_nodes, edge_sources, edge_targets
+            )
+
+        # ── Broken-link check ─────────────────────────────────────────────────
+        if page_nodes and settings.link_check_enabled and stop_reason is None:
+            await manager.broadcast(scan_id, {"type": "link_check"})
+            await _report_broken_links(
+                db, node_urls, page_nodes, page_status, page_scores,
+                edge_sources, edge_targets, external_sources, compact,
+            )
+            total_score = sum(page_scores.values())
 
-            finally:
-                await browser.close()
+        # The link check can take minutes; honour a cancel sent meanwhile
+        if await cancel_requested(db, scan_id):
+            await _mark_cancelled(db, scan_id, len(visited), pages_saved)
+            return
 
-        # ── Save ScoreHistory ─────────────────────────────────────────────────
+        # ── Save ScoreHistory (full crawls only) ──────────────────────────────
         avg_score = total_score / pages_saved if pages_saved > 0 else 0.0
-        if pages_saved > 0:
+        if pages_saved > 0 and stop_reason is None:
             scan = await db.get(ScanTask, scan_id)
             db.add(ScoreHistory(
                 siteId=scan.siteId,
@@ -142,6 +237,7 @@ async def run_crawler(scan_id: str, domain: str) -> None:
         # ── Mark COMPLETED ────────────────────────────────────────────────────
         scan = await db.get(ScanTask, scan_id)
         scan.status = "COMPLETED"
+        scan.stopReason = stop_reason  # also drops a cancel that came in too late
         scan.completedAt = datetime.utcnow()
         scan.pagesFound = len(visited)
         scan.pagesScanned = pages_saved
@@ -151,32 +247,580 @@ async def run_crawler(scan_id: str, domain: str) -> None:
             "type": "completed",
             "pagesScanned": pages_saved,
             "avgScore": avg_score,
+            "stopReason": stop_reason,
         })
 
     except Exception as exc:
-        logger.exception("Crawler failed for scan %s: %s", scan_id, exc)
-        await db.rollback()
-        try:
-            scan = await db.get(ScanTask, scan_id)
-            if scan:
-                scan.status = "FAILED"
-                scan.completedAt = datetime.utcnow()
-                await db.commit()
-        except Exception:
-            pass
-        await manager.broadcast(scan_id, {"type": "error", "message": str(exc)})
+        await _mark_failed(db, scan_id, exc)
+
+    finally:
+        if sitemap_task is not None:
+            sitemap_task.cancel()
+        await db.close()
+
+
+async def run_url_list(scan_id: str, domain: str, urls: list[str] | None = None) -> None:
+    """
+    Background task for URL_LIST and SITEMAP scans: fetch a fixed set of pages
+    (`urls`, or the site's sitemap when None) with list_scan_concurrency pages
+    in flight. Nothing is discovered or enqueued, and the link-graph and
+    broken-link passes are skipped; each page is scored and persisted exactly
+    as in run_crawler, and cancellation and budgets behave the same.
+    """
+    db = CrawlerSessionLocal()
+    try:
+        scan = await _mark_running(db, scan_id)
+        if scan is None:
+            return
+
+        base_url = _base_url(domain)
+        base_host = urlparse(base_url).netloc
+        if urls is None:
+            urls = await fetch_sitemap_urls(base_url, settings.sitemap_max_urls)
+
+        # First spelling of each normalized URL on the site's host
+        targets: dict[str, str] = {}
+        for url in urls:
+            if urlparse(url).netloc == base_host:
+                targets.setdefault(_normalize_url(url), url)
+
+        await db.execute(
+            update(ScanTask).where(ScanTask.id == scan_id).values(pagesFound=len(targets))
+        )
+        await db.commit()
+
+        stop_reason, results = await _fetch_list(db, scan, base_host, targets, len(targets))
+        if stop_reason == CANCELLED or await cancel_requested(db, scan_id):
+            await _mark_cancelled(db, scan_id, len(targets), len(results))
+            return
+
+        # A partial page list isn't comparable with full crawls, so no
+        # ScoreHistory row is written for these scans.
+        await _mark_list_completed(db, scan_id, len(targets), results, stop_reason)
+
+    except Exception as exc:
+        await _mark_failed(db, scan_id, exc)
 
     finally:
         await db.close()
 
 
-async def _crawl_page(browser: Browser, url: str, base_host: str) -> dict | None:
+async def run_sample(scan_id: str, domain: str) -> None:
+    """
+    Background task for SAMPLE scans of sites too large to crawl daily. URLs
+    are discovered cheaply (crawler.sampling.discover_urls: sitemap plus links
+    in unrendered HTML), grouped into directory/template strata, and a
+    stratified random sample of scan.sampleSize pages is rendered, scored and
+    persisted as in run_url_list. The site's average score and each issue's
+    prevalence are estimated with sample_confidence intervals and recorded
+    in ScoreHistory, with pagesCount set to the number of URLs discovered.
+    A scan stopped by its budget records no estimate.
+    """
+    db = CrawlerSessionLocal()
+    try:
+        scan = await _mark_running(db, scan_id)
+        if scan is None:
+            return
+
+        base_url = _base_url(domain)
+        base_host = urlparse(base_url).netloc
+        found = await discover_urls(
+            base_url,
+            base_host,
+            _normalize_url,
+            settings.sample_discovery_max_urls,
+            settings.sample_discovery_max_fetches,
+        )
+        sample_size = scan.sampleSize or settings.sample_size
+        strata = stratify(found, sample_size)
+        sample = draw_sample(strata, sample_size, random.Random())
+        targets = {norm: found[norm] for norms in sample.values() for norm in norms}
+
+        await db.execute(
+            update(ScanTask).where(ScanTask.id == scan_id).values(pagesFound=len(found))
+        )
+        await db.commit()
+
+        stop_reason, results = await _fetch_list(db, scan, base_host, targets, len(found))
+        if stop_reason == CANCELLED or await cancel_requested(db, scan_id):
+            await _mark_cancelled(db, scan_id, len(found), len(results))
+            return
+
+        estimate = None
+        if stop_reason is None:
+            estimate = estimate_site(
+                {key: len(norms) for key, norms in strata.items()},
+                {
+                    key: [results[norm] for norm in norms if norm in results]
+                    for key, norms in sample.items()
+                },
+                settings.sample_confidence,
+            )
+        if estimate is not None:
+            score, prevalence = estimate
+            db.add(ScoreHistory(
+                siteId=scan.siteId,
+                avgScore=score.value,
+                pagesCount=len(found),
+                sampleSize=len(results),
+                avgScoreLow=score.low,
+                avgScoreHigh=score.high,
+                issuePrevalence={code: p.rounded(4) for code, p in prevalence.items()},
+            ))
+        await _mark_list_completed(
+            db, scan_id, len(found), results, stop_reason,
+            estimate=estimate[0] if estimate else None,
+        )
+
+    except Exception as exc:
+        await _mark_failed(db, scan_id, exc)
+
+    finally:
+        await db.close()
+
+
+async def _fetch_list(
+    db: AsyncSession,
+    scan: ScanTask,
+    base_host: str,
+    targets: dict[str, str],
+    pages_found: int,
+) -> tuple[str | None, dict[str, tuple[int, list[str]]]]:
+    """
+    Fetch, score and persist a fixed set of pages (normalized URL → URL) with
+    list_scan_concurrency in flight, committing counters every
+    LIST_COMMIT_EVERY pages. Returns the guard's stop reason (None if every
+    page was attempted) and normalized URL → (seoScore, issue codes) for the
+    pages saved.
+    """
+    scan_id = scan.id
+    compact = scan.compactIssues
+    results: dict[str, tuple[int, list[str]]] = {}
+    semaphore = asyncio.Semaphore(settings.list_scan_concurrency)
+
+    async with async_playwright() as pw:
+        browser = await pw.chromium.launch(headless=True)
+        tasks: list[asyncio.Task] = []
+        try:
+            async with ScanGuard(scan_id, ScanBudget.for_scan(scan), browser) as guard:
+                async def fetch(norm: str, url: str) -> tuple[str, str, dict | None]:
+                    async with semaphore:
+                        page_data = await _crawl_page(
+                            browser, url, base_host, extract_links=False, guard=guard
+                        )
+                    return norm, url, page_data
+
+                tasks = [
+                    asyncio.ensure_future(fetch(norm, url)) for norm, url in targets.items()
+                ]
+
+                # Persist in completion order; the session is only touched here
+                for next_page in asyncio.as_completed(tasks):
+                    try:
+                        norm, url, page_data = await guard.run(next_page)
+                    except ScanStopped:
+                        break
+                    if page_data is None:
+                        continue
+                    _, seo_score, codes = _add_page(db, scan_id, norm, page_data, compact=compact)
+                    results[norm] = (seo_score, codes)
+
+                    if len(results) % LIST_COMMIT_EVERY == 0:
+                        await db.execute(
+                            update(ScanTask)
+                            .where(ScanTask.id == scan_id)
+                            .values(pagesScanned=len(results))
+                        )
+                        await db.commit()
+
+                    await manager.broadcast(scan_id, {
+                        "type": "page_crawled",
+                        "url": url,
+                        "seoScore": seo_score,
+                        "pagesScanned": len(results),
+                        "pagesFound": pages_found,
+                    })
+        finally:
+            # Let abandoned fetches close their pages before the browser goes
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await browser.close()
+
+    return guard.reason, results
+
+
+async def _mark_list_completed(
+    db: AsyncSession,
+    scan_id: str,
+    pages_found: int,
+    results: dict[str, tuple[int, list[str]]],
+    stop_reason: str | None,
+    estimate: Estimate | None = None,
+) -> None:
+    """End a URL_LIST / SITEMAP / SAMPLE scan COMPLETED and broadcast it."""
+    pages_saved = len(results)
+    avg_score = sum(seo_score for seo_score, _ in results.values()) / pages_saved if pages_saved else 0.0
+    await db.execute(
+        update(ScanTask)
+        .where(ScanTask.id == scan_id)
+        .values(
+            status="COMPLETED",
+            stopReason=stop_reason,
+            completedAt=datetime.utcnow(),
+            pagesFound=pages_found,
+            pagesScanned=pages_saved,
+        )
+    )
+    await db.commit()
+
+    event = {
+        "type": "completed",
+        "pagesScanned": pages_saved,
+        "avgScore": avg_score,
+        "stopReason": stop_reason,
+    }
+    if estimate is not None:
+        event.update(avgScore=estimate.value, avgScoreLow=estimate.low, avgScoreHigh=estimate.high)
+    await manager.broadcast(scan_id, event)
+
+
+async def run_batch(batch_id: str, scans: list[tuple[str, str]]) -> None:
+    """
+    Run every (scan_id, domain) of a batch on one shared browser, at most
+    max_concurrent_scans at a time across all batches in the process. Page
+    fetches are capped at batch_page_concurrency and rotated fairly between
+    scans; batch-level progress is broadcast on the batch id.
+    """
+    gate = FairPageGate(settings.batch_page_concurrency)
+    finished = 0
+
+    async with async_playwright() as pw:
+        browser = await pw.chromium.launch(headless=True)
+
+        async def run_one(scan_id: str, domain: str) -> None:
+            nonlocal finished
+            async with _batch_scan_slots:
+                await run_crawler(scan_id, domain, browser=browser, gate=gate)
+            finished += 1
+            await manager.broadcast(batch_id, {
+                "type": "batch_progress",
+                "scanId": scan_id,
+                "scansFinished": finished,
+                "scansTotal": len(scans),
+            })
+
+        try:
+            await asyncio.gather(*(run_one(scan_id, domain) for scan_id, domain in scans))
+        finally:
+            await browser.close()
+
+    await manager.broadcast(batch_id, {"type": "completed", "scansTotal": len(scans)})
+
+
+def _sitemap_priorities(task: asyncio.Task) -> dict[str, float]:
+    """Normalized URL → sitemap priority; empty if the sitemap couldn't be read."""
+    if task.cancelled() or task.exception() is not None:
+        if not task.cancelled():
+            logger.warning("Sitemap read failed: %s", task.exception())
+        return {}
+    return {
+        _normalize_url(url): DEFAULT_SITEMAP_PRIORITY if priority is None else priority
+        for url, priority in task.result().items()
+    }
+
+
+def _base_url(domain: str) -> str:
+    return domain if domain.startswith("http") else f"https://{domain}"
+
+
+async def _mark_running(db: AsyncSession, scan_id: str) -> ScanTask | None:
+    """
+    Flag the scan RUNNING and return it, or None if it was cancelled or
+    deleted before it started. The row lock orders this against the cancel
+    endpoint.
+    """
+    scan = await db.get(ScanTask, scan_id, with_for_update=True)
+    if scan is None:
+        await db.commit()
+        return None
+    if scan.status != "PENDING":
+        await db.commit()
+        return None
+    scan.status = "RUNNING"
+    scan.startedAt = datetime.utcnow()
+    scan.compactIssues = settings.compact_issue_storage
+    await db.commit()
+    await manager.broadcast(scan_id, {"type": "status", "status": "RUNNING"})
+    return scan
+
+
+async def _mark_cancelled(
+    db: AsyncSession, scan_id: str, pages_found: int, pages_saved: int
+) -> None:
+    """Commit what was crawled and end the scan CANCELLED."""
+    await db.execute(
+        update(ScanTask)
+        .where(ScanTask.id == scan_id)
+        .values(
+            status="CANCELLED",
+            completedAt=datetime.utcnow(),
+            pagesFound=pages_found,
+            pagesScanned=pages_saved,
+        )
+    )
+    await db.commit()
+    await manager.broadcast(scan_id, {"type": "cancelled", "pagesScanned": pages_saved})
+
+
+async def _mark_failed(db: AsyncSession, scan_id: str, exc: Exception) -> None:
+    logger.exception("Crawler failed for scan %s: %s", scan_id, exc)
+    await db.rollback()
+    try:
+        scan = await db.get(ScanTask, scan_id)
+        if scan:
+            scan.status = "FAILED"
+            scan.completedAt = datetime.utcnow()
+            await db.commit()
+    except Exception:
+        pass
+    await manager.broadcast(scan_id, {"type": "error", "message": str(exc)})
+
+
+def _add_page(
+    db: AsyncSession,
+    scan_id: str,
+    norm_url: str,
+    page_data: dict,
+    node_id: int | None = None,
+    compact: bool = False,
+) -> tuple[str, int, list[str]]:
+    """
+    Score a crawled page and add its PageResult and SeoIssue rows to the
+    session — or, with compact storage, just the PageResult carrying the
+    issue mask and params. The id is assigned up front so no flush is needed
+    per page. Returns (PageResult id, seoScore, non-PASSED issue codes).
+    """
+    if compact:
+        seo_score, issue_mask, issue_params = score_page_compact(page_data)
+        issues = []
+    else:
+        seo_score, issues = score_page(page_data)
+        issue_mask = issue_params = None
+
+    page_id = generate_cuid()
+    db.add(PageResult(
+        id=page_id,
+        scanTaskId=scan_id,
+        url=norm_url,  # normalized so scans can be diffed on url
+        httpStatus=page_data["http_status"],
+        title=page_data["title"],
+        titleLength=len(page_data["title"]) if page_data["title"] else None,
+        metaDescription=page_data["meta_description"],
+        metaDescLength=(
+            len(page_data["meta_description"])
+            if page_data["meta_description"]
+            else None
+        ),
+        h1Count=page_data["h1_count"],
+        h2Count=page_data["h2_count"],
+        h3Count=page_data["h3_count"],
+        h1Text=page_data["h1_text"],
+        imagesTotal=page_data["images_total"],
+        imagesMissingAlt=page_data["images_missing_alt"],
+        loadTimeMs=page_data["load_time_ms"],
+        pageWeight=pack_page_weight(page_data),
+        seoScore=seo_score,
+        nodeId=node_id,
+        htmlHash=page_data["html_hash"],
+        issueMask=issue_mask,
+        issueParams=issue_params,
+    ))
+    for issue in issues:
+        db.add(SeoIssue(
+            pageResultId=page_id,
+            category=issue.category,
+            code=issue.code,
+            description=issue.description,
+            impact=issue.impact,
+        ))
+    if compact:
+        codes = list(issue_params or ())
+    else:
+        codes = [issue.code for issue in issues if issue.category != "PASSED"]
+    return page_id, seo_score, codes
+
+
+async def _store_link_metrics(
+    db: AsyncSession,
+    n_nodes: int,
+    page_nodes: dict[int, str],
+    edge_sources: array,
+    edge_targets: array,
+) -> None:
+    """
+    Compute PageRank, inlinks and click depth over the crawled pages and
+    bulk-update them onto PageResult. Links to pages that were discovered but
+    never crawled are left out so they don't leak rank.
+    """
+    crawled = np.fromiter(page_nodes.keys(), dtype=np.int64, count=len(page_nodes))
+    remap = np.full(n_nodes, -1, dtype=np.int64)
+    remap[crawled] = np.arange(len(crawled))
+
+    sources = remap[np.frombuffer(edge_sources, dtype=np.int64)]
+    targets = remap[np.frombuffer(edge_targets, dtype=np.int64)]
+    keep = (sources >= 0) & (targets >= 0)
+
+    root = int(remap[0]) if remap[0] >= 0 else int(np.argmin(crawled))
+    metrics = compute_link_metrics(len(crawled), sources[keep], targets[keep], root=root)
+
+    await db.execute(update(PageResult), [
+        {
+            "id": page_nodes[int(node)],
+            "pageRank": float(metrics.pagerank[i]),
+            "inlinks": int(metrics.inlinks[i]),
+            "clickDepth": int(metrics.click_depth[i]) if metrics.click_depth[i] >= 0 else None,
+        }
+        for i, node in enumerate(crawled)
+    ])
+
+
+async def _report_broken_links(
+    db: AsyncSession,
+    node_urls: list[str],
+    page_nodes: dict[int, str],
+    page_status: dict[int, int],
+    page_scores: dict[int, int],
+    edge_sources: array,
+    edge_targets: array,
+    external_sources: dict[str, list[int]],
+    compact: bool = False,
+) -> None:
+    """
+    Check every unique link target of the scan once and attach broken-link
+    issues to the pages that link to them. Crawled pages reuse the status
+    seen by the browser; everything else goes through the pooled checker.
+    Updates page_scores in place with the extra deductions.
+    """
+    sources = np.frombuffer(edge_sources, dtype=np.int64)
+    targets = np.frombuffer(edge_targets, dtype=np.int64)
+
+    unchecked_nodes = np.setdiff1d(
+        np.unique(targets),
+        np.fromiter(page_status.keys(), dtype=np.int64, count=len(page_status)),
+    )
+    to_check = {node_urls[node] for node in unchecked_nodes}
+    to_check.update(external_sources)
+    statuses = await check_links(to_check)
+
+    # Per-node broken mask over the internal graph
+    broken_nodes = np.zeros(len(node_urls), dtype=bool)
+    for node, http_status in page_status.items():
+        broken_nodes[node] = http_status >= 400
+    for node in unchecked_nodes:
+        broken_nodes[node] = statuses[node_urls[node]].is_broken
+
+    broken_internal: dict[int, list[str]] = {}
+    edge_is_broken = broken_nodes[targets]
+    for source, target in zip(sources[edge_is_broken], targets[edge_is_broken]):
+        broken_internal.setdefault(int(source), []).append(node_urls[target])
+
+    broken_external: dict[int, list[str]] = {}
+    for link, linking_nodes in external_sources.items():
+        if statuses[link].is_broken:
+            for node in linking_nodes:
+                broken_external.setdefault(node, []).append(link)
+
+    affected = broken_internal.keys() | broken_external.keys()
+    if not affected:
+        return
+    if compact:
+        await _merge_compact_link_issues(
+            db, page_nodes, page_scores, broken_internal, broken_external
+        )
+        return
+
+    issue_rows: list[dict] = []
+    score_rows: list[dict] = []
+    for node in affected:
+        issues = score_broken_links(
+            broken_internal.get(node, []), broken_external.get(node, [])
+        )
+        page_scores[node] = max(0, page_scores[node] - sum(i.impact for i in issues))
+        score_rows.append({"id": page_nodes[node], "seoScore": page_scores[node]})
+        issue_rows.extend(
+            {
+                "pageResultId": page_nodes[node],
+                "category": issue.category,
+                "code": issue.code,
+                "description": issue.description,
+                "impact": issue.impact,
+            }
+            for issue in issues
+        )
+
+    affected_ids = [page_nodes[node] for node in affected]
+    await db.execute(
+        delete(SeoIssue).where(
+            SeoIssue.pageResultId.in_(affected_ids),
+            SeoIssue.code == "ALL_PASSED",
+        )
+    )
+    await db.execute(insert(SeoIssue), issue_rows)
+    await db.execute(update(PageResult), score_rows)
+
+
+async def _merge_compact_link_issues(
+    db: AsyncSession,
+    page_nodes: dict[int, str],
+    page_scores: dict[int, int],
+    broken_internal: dict[int, list[str]],
+    broken_external: dict[int, list[str]],
+) -> None:
+    """_report_broken_links for compact storage: OR the bits into issueMask."""
+    node_of = {page_nodes[node]: node for node in broken_internal.keys() | broken_external.keys()}
+    ids = list(node_of)
+    rows: list[dict] = []
+    for i in range(0, len(ids), EDGE_BATCH_SIZE):
+        result = await db.execute(
+            select(PageResult.id, PageResult.issueMask, PageResult.issueParams)
+            .where(PageResult.id.in_(ids[i:i + EDGE_BATCH_SIZE]))
+        )
+        for page_id, issue_mask, issue_params in result:
+            node = node_of[page_id]
+            entries = broken_link_params(
+                broken_internal.get(node, []), broken_external.get(node, [])
+            )
+            page_scores[node] = max(0, page_scores[node] - sum(e[0] for e in entries.values()))
+            rows.append({
+                "id": page_id,
+                "seoScore": page_scores[node],
+                "issueMask": (issue_mask or 0) | issue_bits(entries),
+                "issueParams": {**(issue_params or {}), **entries},
+            })
+    await db.execute(update(PageResult), rows)
+
+
+async def _crawl_page(
+    browser: Browser,
+    url: str,
+    base_host: str,
+    extract_links: bool = True,
+    guard: ScanGuard | None = None,
+) -> dict | None:
     """
     Load a single page with Playwright, extract SEO data, and return a dict.
-    Returns None if the page cannot be loaded.
+    Returns None if the page cannot be loaded. URL-list scans pass
+    extract_links=False and get empty link lists. The rendered HTML is kept
+    in the snapshot store so later scoring changes can be re-applied offline.
+    With a byte budget, the page's downloads are counted on the guard.
+    With page_weight_enabled it also waits for the load event, within what is
+    left of the page timeout, and adds the fields of crawler.page_weight.
     """
     page = await browser.new_page()
     try:
+        if guard is not None and guard.budget.bytes:
+            await guard.track_bytes(page)
         start = time.monotonic()
         try:
             response = await page.goto(
@@ -194,59 +838,24 @@ async def _crawl_page(browser: Browser, url: str, base_host: str) -> dict | None
 
         http_status = response.status
         content = await page.content()
-        soup = BeautifulSoup(content, "lxml")
-
-        # ── Title ─────────────────────────────────────────────────────────────
-        title_tag = soup.find("title")
-        title = title_tag.get_text(strip=True) if title_tag else None
-
-        # ── Meta description ──────────────────────────────────────────────────
-        meta_tag = soup.find("meta", attrs={"name": "description"})
-        meta_description: str | None = None
-        if meta_tag:
-            val = meta_tag.get("content", "").strip()
-            if val:
-                meta_description = val
-
-        # ── Headings ──────────────────────────────────────────────────────────
-        h1_tags = soup.find_all("h1")
-        h2_tags = soup.find_all("h2")
-        h3_tags = soup.find_all("h3")
-        h1_text = h1_tags[0].get_text(strip=True) if h1_tags else None
-
-        # ── Images ────────────────────────────────────────────────────────────
-        images = soup.find_all("img")
-        images_missing_alt = sum(
-            1 for img in images if not img.get("alt", "").strip()
-        )
-
-        # ── Internal links ────────────────────────────────────────────────────
-        seen_links: set[str] = set()
-        internal_links: list[str] = []
-        for a_tag in soup.find_all("a", href=True):
-            href = a_tag["href"].strip()
-            if not href or href.startswith(("#", "mailto:", "tel:", "javascript:")):
-                continue
-            full_url = urljoin(url, href)
-            parsed = urlparse(full_url)
-            if parsed.netloc == base_host and parsed.scheme in ("http", "https"):
-                clean = parsed._replace(fragment="").geturl()
-                if clean not in seen_links:
-                    seen_links.add(clean)
-                    internal_links.append(clean)
+        if settings.snapshot_enabled:
+            html_hash = await asyncio.to_thread(store_snapshot, content)
+        else:
+            html_hash = None
+        if settings.page_weight_enabled:
+            remaining = settings.crawl_timeout_seconds - (time.monotonic() - start)
+            wait = min(settings.page_weight_load_timeout_seconds, remaining)
+            # Playwright reads a 0 timeout as "no timeout"
+            weight = await collect_page_weight(page, max(1, int(wait * 1000)))
+        else:
+            weight = {}
 
         return {
             "http_status": http_status,
-            "title": title,
-            "meta_description": meta_description,
-            "h1_count": len(h1_tags),
-            "h2_count": len(h2_tags),
-            "h3_count": len(h3_tags),
-            "h1_text": h1_text,
-            "images_total": len(images),
-            "images_missing_alt": images_missing_alt,
             "load_time_ms": load_time_ms,
-            "internal_links": internal_links,
+            "html_hash": html_hash,
+            **weight,
+            **extract_page(content, url, base_host, extract_links),
         }
 
     finally:
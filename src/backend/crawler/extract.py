@@ -0,0 +1,70 @@
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+
+def extract_page(content: str, url: str, base_host: str, extract_links: bool = True) -> dict:
+    """
+    Parse rendered HTML into the SEO fields stored on PageResult.
+    Pure function with no browser or network access, so the crawler and the
+    offline re-extraction job (services.reextract) share it.
+    """
+    soup = BeautifulSoup(content, "lxml")
+
+    # ── Title ─────────────────────────────────────────────────────────────────
+    title_tag = soup.find("title")
+    title = title_tag.get_text(strip=True) if title_tag else None
+
+    # ── Meta description ──────────────────────────────────────────────────────
+    meta_tag = soup.find("meta", attrs={"name": "description"})
+    meta_description: str | None = None
+    if meta_tag:
+        val = meta_tag.get("content", "").strip()
+        if val:
+            meta_description = val
+
+    # ── Headings ──────────────────────────────────────────────────────────────
+    h1_tags = soup.find_all("h1")
+    h2_tags = soup.find_all("h2")
+    h3_tags = soup.find_all("h3")
+    h1_text = h1_tags[0].get_text(strip=True) if h1_tags else None
+
+    # ── Images ────────────────────────────────────────────────────────────────
+    images = soup.find_all("img")
+    images_missing_alt = sum(
+        1 for img in images if not img.get("alt", "").strip()
+    )
+
+    # ── Links ─────────────────────────────────────────────────────────────────
+    seen_links: set[str] = set()
+    internal_links: list[str] = []
+    external_links: list[str] = []
+    for a_tag in soup.find_all("a", href=True) if extract_links else ():
+        href = a_tag["href"].strip()
+        if not href or href.startswith(("#", "mailto:", "tel:", "javascript:")):
+            continue
+        full_url = urljoin(url, href)
+        parsed = urlparse(full_url)
+        if parsed.scheme not in ("http", "https"):
+            continue
+        clean = parsed._replace(fragment="").geturl()
+        if clean in seen_links:
+            continue
+        seen_links.add(clean)
+        if parsed.netloc == base_host:
+            internal_links.append(clean)
+        else:
+            external_links.append(clean)
+
+    return {
+        "title": title,
+        "meta_description": meta_description,
+        "h1_count": len(h1_tags),
+        "h2_count": len(h2_tags),
+        "h3_count": len(h3_tags),
+        "h1_text": h1_text,
+        "images_total": len(images),
+        "images_missing_alt": images_missing_alt,
+        "internal_links": internal_links,
+        "external_links": external_links,
+    }
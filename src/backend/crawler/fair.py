@@ -0,0 +1,58 @@
+import asyncio
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+
+class FairPageGate:
+    """
+    Limits concurrent page fetches across many scans and hands freed slots to
+    waiting scans in round-robin order, so a scan with 10k pages gets one turn
+    per rotation just like a scan with ten.
+    """
+
+    def __init__(self, slots: int) -> None:
+        self._free = slots
+        # scan id → its waiting futures; key order is the rotation order
+        self._waiting: OrderedDict[str, deque[asyncio.Future]] = OrderedDict()
+
+    @asynccontextmanager
+    async def turn(self, scan_id: str) -> AsyncIterator[None]:
+        await self._acquire(scan_id)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, scan_id: str) -> None:
+        if self._free > 0 and not self._waiting:
+            self._free -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(scan_id, deque()).append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release()  # slot was granted just before cancellation
+            else:
+                self._discard(scan_id, future)
+            raise
+
+    def _release(self) -> None:
+        while self._waiting:
+            scan_id, futures = self._waiting.popitem(last=False)
+            future = futures.popleft()
+            if futures:
+                self._waiting[scan_id] = futures  # back of the rotation
+            if not future.done():
+                future.set_result(None)  # slot passes straight to the waiter
+                return
+        self._free += 1
+
+    def _discard(self, scan_id: str, future: asyncio.Future) -> None:
+        futures = self._waiting.get(scan_id)
+        if futures and future in futures:
+            futures.remove(future)
+            if not futures:
+                del self._waiting[scan_id]
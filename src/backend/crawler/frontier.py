@@ -0,0 +1,138 @@
+import heapq
+import math
+import re
+from collections import deque
+from dataclasses import dataclass
+from urllib.parse import parse_qsl, urlparse
+
+# Score weights: higher scores are crawled first
+DEPTH_WEIGHT = 1.0
+INLINK_WEIGHT = 1.5  # per doubling of inlinks seen so far
+SITEMAP_WEIGHT = 2.0  # times (1 + <priority>) for URLs listed in the sitemap
+PARAM_PENALTY = 1.0  # per query parameter, up to MAX_PARAM_PENALTIES
+MAX_PARAM_PENALTIES = 3
+FACET_PENALTY = 2.0  # once, for facet/sort/pagination/tracking params or paths
+
+FACET_PARAMS = frozenset({
+    "sort", "sortby", "order", "orderby", "dir", "filter", "filters", "facet",
+    "page", "p", "pg", "offset", "start", "limit", "per_page", "view",
+    "color", "colour", "size", "price", "brand", "rating",
+    "q", "query", "search", "s", "sessionid", "sid", "ref", "fbclid", "gclid",
+})
+FACET_PATH = re.compile(
+    r"/(page|tag|tags|filter|sort|search)/"  # pagination, tag clouds, faceted paths
+    r"|/\d{4}/\d{1,2}(/\d{1,2})?/?$"  # calendar archives
+    r"|/(print|share|feed|amp)/?$",
+    re.IGNORECASE,
+)
+
+
+def url_penalty(url: str) -> float:
+    """Score deduction for URLs that tend to be parameter or facet variants."""
+    parsed = urlparse(url)
+    params = parse_qsl(parsed.query, keep_blank_values=True)
+    penalty = PARAM_PENALTY * min(len(params), MAX_PARAM_PENALTIES)
+    if FACET_PATH.search(parsed.path) or any(
+        name.lower() in FACET_PARAMS or name.lower().startswith("utm_") for name, _ in params
+    ):
+        penalty += FACET_PENALTY
+    return penalty
+
+
+class BfsFrontier:
+    """Plain first-in first-out frontier: breadth-first discovery order."""
+
+    def __init__(self) -> None:
+        self._queue: deque[tuple[str, int]] = deque()
+
+    def push(self, url: str, norm: str, depth: int) -> None:
+        self._queue.append((url, depth))
+
+    def pop(self) -> tuple[str, int]:
+        return self._queue.popleft()
+
+    def set_sitemap(self, priorities: dict[str, float]) -> None:
+        pass
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+
+@dataclass(slots=True)
+class _Candidate:
+    url: str
+    depth: int
+    penalty: float
+    inlinks: int = 0
+    seq: int = 0  # seq of the candidate's live heap entry
+
+
+class PriorityFrontier:
+    """
+    Importance-ordered frontier. A URL's score rises with inlinks seen so far
+    and sitemap priority and falls with depth and parameter/facet patterns,
+    so a capped crawl spends its pages on the ones that matter.
+
+    Priorities change as links are discovered; instead of re-heapifying, each
+    change pushes a fresh heap entry and `pop` skips entries that are no
+    longer their URL's latest (lazy updates). Each URL is handed out once.
+    """
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[float, int, str]] = []
+        self._pending: dict[str, _Candidate] = {}  # normalized URL → candidate
+        self._sitemap: dict[str, float] = {}  # normalized URL → <priority>
+        self._done: set[str] = set()
+        self._seq = 0
+
+    def push(self, url: str, norm: str, depth: int) -> None:
+        """Record a link to `url`; new URLs are added, known ones re-scored."""
+        if norm in self._done:
+            return
+        candidate = self._pending.get(norm)
+        if candidate is None:
+            candidate = self._pending[norm] = _Candidate(url, depth, url_penalty(url))
+        else:
+            candidate.depth = min(candidate.depth, depth)
+        candidate.inlinks += 1
+        self._schedule(norm, candidate)
+
+    def pop(self) -> tuple[str, int]:
+        while True:
+            _, seq, norm = heapq.heappop(self._heap)
+            candidate = self._pending.get(norm)
+            if candidate is not None and candidate.seq == seq:
+                del self._pending[norm]
+                self._done.add(norm)
+                return candidate.url, candidate.depth
+
+    def set_sitemap(self, priorities: dict[str, float]) -> None:
+        """Apply sitemap priorities (keyed by normalized URL) once they arrive."""
+        self._sitemap = priorities
+        for norm, candidate in self._pending.items():
+            if norm in priorities:
+                self._schedule(norm, candidate)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _score(self, norm: str, candidate: _Candidate) -> float:
+        score = (
+            INLINK_WEIGHT * math.log2(1 + candidate.inlinks)
+            - DEPTH_WEIGHT * candidate.depth
+            - candidate.penalty
+        )
+        if norm in self._sitemap:
+            score += SITEMAP_WEIGHT * (1 + self._sitemap[norm])
+        return score
+
+    def _schedule(self, norm: str, candidate: _Candidate) -> None:
+        self._seq += 1
+        candidate.seq = self._seq
+        heapq.heappush(self._heap, (-self._score(norm, candidate), self._seq, norm))
+        if len(self._heap) > 4 * len(self._pending) + 1024:
+            # Mostly stale entries: rebuild from the live ones
+            self._heap = [
+                (-self._score(n, c), c.seq, n) for n, c in self._pending.items()
+            ]
+            heapq.heapify(self._heap)
@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Awaitable, TypeVar
+from weakref import WeakKeyDictionary
+
+from playwright.async_api import Browser, CDPSession, Page
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import get_settings
+from models.orm import ScanTask
+from utils.database import CrawlerSessionLocal
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+T = TypeVar("T")
+
+# ScanTask.stopReason values
+CANCELLED = "CANCELLED"
+WALL_TIME = "WALL_TIME"
+BYTES = "BYTES"
+BROWSER_MEMORY = "BROWSER_MEMORY"
+
+
+class ScanStopped(Exception):
+    """Raised out of ScanGuard.run once the scan has been told to stop."""
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+
+@dataclass(frozen=True)
+class ScanBudget:
+    """Per-scan limits; 0 means unlimited."""
+    wall_seconds: int = 0
+    bytes: int = 0
+    browser_memory_mb: int = 0
+
+    @classmethod
+    def for_scan(cls, scan: ScanTask) -> "ScanBudget":
+        """The scan's own limits, falling back to the scan_max_* settings."""
+        def pick(value: int | None, default: int) -> int:
+            return default if value is None else value
+
+        return cls(
+            wall_seconds=pick(scan.maxWallSeconds, settings.scan_max_wall_seconds),
+            bytes=pick(scan.maxBytes, settings.scan_max_bytes),
+            browser_memory_mb=pick(scan.maxBrowserMemoryMb, settings.scan_max_browser_memory_mb),
+        )
+
+
+class ScanGuard:
+    """
+    Stops a running scan on request or when it exceeds its budget.
+
+    Page fetches go through `run`, which abandons the fetch (closing its page)
+    as soon as a stop is signalled and raises ScanStopped; database writes
+    between fetches are never interrupted. While any guard is active, one
+    poller per process checks every scan_guard_interval_seconds for cancel
+    requests (ScanTask.stopReason set by the API), wall time and browser
+    memory. Downloaded bytes are counted per page through CDP.
+    """
+
+    def __init__(self, scan_id: str, budget: ScanBudget, browser: Browser) -> None:
+        self.scan_id = scan_id
+        self.budget = budget
+        self.browser = browser
+        self.reason: str | None = None
+        self.bytes = 0
+        self._started = time.monotonic()
+        self._stopped = asyncio.Event()
+
+    async def __aenter__(self) -> "ScanGuard":
+        global _poller
+        _active[self.scan_id] = self
+        if _poller is None or _poller.done():
+            _poller = asyncio.create_task(_poll())
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        _active.pop(self.scan_id, None)
+
+    def stop(self, reason: str) -> None:
+        if self.reason is None:
+            logger.info("Stopping scan %s: %s", self.scan_id, reason)
+            self.reason = reason
+            self._stopped.set()
+
+    async def run(self, aw: Awaitable[T]) -> T:
+        """Await `aw` unless the scan is stopped first."""
+        if self.reason is not None:
+            raise ScanStopped(self.reason)
+        task = asyncio.ensure_future(aw)
+        stopped = asyncio.ensure_future(self._stopped.wait())
+        try:
+            await asyncio.wait((task, stopped), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            stopped.cancel()
+            if not task.done():
+                task.cancel()
+                await asyncio.wait((task,))  # let the fetch close its page
+        if task.cancelled():
+            raise ScanStopped(self.reason)
+        return task.result()
+
+    async def track_bytes(self, page: Page) -> None:
+        """Count every response body the page downloads against the budget."""
+        session = await page.context.new_cdp_session(page)
+        session.on("Network.loadingFinished", self._on_loading_finished)
+        await session.send("Network.enable")
+
+    def _on_loading_finished(self, event: dict) -> None:
+        self.bytes += int(event["encodedDataLength"])
+        if self.budget.bytes and self.bytes > self.budget.bytes:
+            self.stop(BYTES)
+
+    def _check_wall_time(self, now: float) -> None:
+        if self.budget.wall_seconds and now - self._started > self.budget.wall_seconds:
+            self.stop(WALL_TIME)
+
+
+# scan id → guard of every scan running in this process
+_active: dict[str, ScanGuard] = {}
+_poller: asyncio.Task | None = None
+_browser_sessions: WeakKeyDictionary[Browser, CDPSession] = WeakKeyDictionary()
+
+
+async def _poll() -> None:
+    while _active:
+        await asyncio.sleep(settings.scan_guard_interval_seconds)
+        guards = list(_active.values())
+        now = time.monotonic()
+        for guard in guards:
+            guard._check_wall_time(now)
+        try:
+            await _check_cancelled(guards)
+            await _check_memory(guards)
+        except Exception:
+            logger.exception("Scan guard poll failed")
+
+
+async def cancel_requested(db: AsyncSession, scan_id: str) -> bool:
+    """
+    Whether the API has asked to cancel the scan. For the stages after the
+    guard is gone (link check, scoring history), which the poller no longer
+    covers.
+    """
+    stop_reason = await db.scalar(select(ScanTask.stopReason).where(ScanTask.id == scan_id))
+    return stop_reason == CANCELLED
+
+
+async def _check_cancelled(guards: list[ScanGuard]) -> None:
+    async with CrawlerSessionLocal() as db:
+        cancelled = (await db.scalars(
+            select(ScanTask.id).where(
+                ScanTask.id.in_([guard.scan_id for guard in guards]),
+                ScanTask.stopReason == CANCELLED,
+            )
+        )).all()
+    for scan_id in cancelled:
+        if scan_id in _active:
+            _active[scan_id].stop(CANCELLED)
+
+
+async def _check_memory(guards: list[ScanGuard]) -> None:
+    # Batch scans share a browser: sample each browser once, stop all its scans
+    by_browser: dict[Browser, list[ScanGuard]] = {}
+    for guard in guards:
+        if guard.budget.browser_memory_mb and guard.browser.is_connected():
+            by_browser.setdefault(guard.browser, []).append(guard)
+    for browser, sharing in by_browser.items():
+        rss_mb = await _browser_rss_mb(browser)
+        if rss_mb is None:
+            continue
+        for guard in sharing:
+            if rss_mb > guard.budget.browser_memory_mb:
+                guard.stop(BROWSER_MEMORY)
+
+
+async def _browser_rss_mb(browser: Browser) -> float | None:
+    """Resident memory of the browser's whole process tree; None where /proc is missing."""
+    if not os.path.isdir("/proc"):
+        return None
+    session = _browser_sessions.get(browser)
+    if session is None:
+        session = _browser_sessions[browser] = await browser.new_browser_cdp_session()
+    info = await session.send("SystemInfo.getProcessInfo")
+    return sum(_rss_bytes(process["id"]) for process in info["processInfo"]) / 2**20
+
+
+def _rss_bytes(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, IndexError, ValueError):
+        return 0  # exited between listing and reading
@@ -0,0 +1,97 @@
+from playwright.async_api import Page
+
+RENDER_BLOCKING_KEEP = 10  # render-blocking URLs kept per page
+
+# Runs in the page after the load event. Navigation Timing gives the
+# document's milestones and Resource Timing every subresource; cross-origin
+# entries without Timing-Allow-Origin report zero sizes, so their bytes are
+# missing from the totals, though they still count as requests.
+_COLLECT_JS = """() => {
+  const nav = performance.getEntriesByType('navigation')[0];
+  if (!nav) return null;
+  const kind = (entry) => {
+    let path = '';
+    try { path = new URL(entry.name).pathname.toLowerCase(); } catch (e) {}
+    const initiator = entry.initiatorType;
+    if (path.endsWith('.css')) return 'stylesheet';
+    if (/\\.m?js$/.test(path) || initiator === 'script') return 'script';
+    if (/\\.(woff2?|ttf|otf|eot)$/.test(path)) return 'font';
+    if (/\\.(png|jpe?g|gif|webp|avif|svg|ico|bmp)$/.test(path) || initiator === 'img' || initiator === 'image') return 'image';
+    if (/\\.(mp4|webm|mov|mp3|m4a|ogg|wav)$/.test(path) || initiator === 'video' || initiator === 'audio') return 'media';
+    if (initiator === 'fetch' || initiator === 'xmlhttprequest' || initiator === 'beacon') return 'xhr';
+    if (initiator === 'iframe') return 'document';
+    return 'other';
+  };
+  const size = (entry) => entry.transferSize || entry.encodedBodySize || 0;
+  const byType = {document: [1, size(nav)]};
+  const blocking = [];
+  for (const entry of performance.getEntriesByType('resource')) {
+    const type = kind(entry);
+    const slot = byType[type] || (byType[type] = [0, 0]);
+    slot[0] += 1;
+    slot[1] += size(entry);
+    if (entry.renderBlockingStatus === 'blocking') blocking.push(entry.name);
+  }
+  const ms = (value) => (value > 0 ? Math.round(value) : null);
+  let requests = 0, bytes = 0;
+  for (const [count, total] of Object.values(byType)) { requests += count; bytes += total; }
+  return {
+    ttfb_ms: ms(nav.responseStart),
+    dom_content_loaded_ms: ms(nav.domContentLoadedEventEnd),
+    load_event_ms: ms(nav.loadEventEnd),
+    request_count: requests,
+    transfer_bytes: bytes,
+    resource_weight: byType,
+    render_blocking: blocking,
+    render_blocking_count: blocking.length,
+  };
+}"""
+
+# page dict key → key in PageResult.pageWeight
+STORED_KEYS: dict[str, str] = {
+    "ttfb_ms": "ttfbMs",
+    "dom_content_loaded_ms": "domContentLoadedMs",
+    "load_event_ms": "loadEventMs",
+    "request_count": "requestCount",
+    "transfer_bytes": "transferBytes",
+    "resource_weight": "byType",
+    "render_blocking": "renderBlocking",
+    "render_blocking_count": "renderBlockingCount",
+}
+
+
+async def collect_page_weight(page: Page, load_timeout_ms: int) -> dict:
+    """
+    Page-dict fields for timing and weight: TTFB, DOMContentLoaded and load
+    (ms from navigation start), request count, transferred bytes in total
+    and per resource type as {type: [requests, bytes]}, and the number and
+    first RENDER_BLOCKING_KEEP URLs of render-blocking scripts and
+    stylesheets. Waits up to `load_timeout_ms`
+    for the load event; returns {} if the timings can't be read.
+    """
+    try:
+        await page.wait_for_load_state("load", timeout=load_timeout_ms)
+    except Exception:
+        pass  # still report what has loaded; load_event_ms stays None
+    try:
+        data = await page.evaluate(_COLLECT_JS)
+    except Exception:
+        return {}
+    if not data:
+        return {}
+    data["render_blocking"] = data["render_blocking"][:RENDER_BLOCKING_KEEP]
+    return data
+
+
+def pack_page_weight(page_data: dict) -> dict | None:
+    """The compact PageResult.pageWeight form of a page dict's weight fields."""
+    if page_data.get("request_count") is None:
+        return None
+    return {stored: page_data.get(key) for key, stored in STORED_KEYS.items()}
+
+
+def unpack_page_weight(page_weight: dict | None) -> dict:
+    """Page-dict fields back from PageResult.pageWeight, for re-scoring."""
+    if not page_weight:
+        return {}
+    return {key: page_weight[stored] for key, stored in STORED_KEYS.items()}
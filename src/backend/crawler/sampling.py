@@ -0,0 +1,250 @@
+import asyncio
+import logging
+import math
+import random
+import re
+import statistics
+from dataclasses import dataclass
+from typing import Callable, Iterable
+from urllib.parse import urljoin, urlparse
+
+import httpx
+import lxml.etree
+import lxml.html
+
+from crawler.sitemap import USER_AGENT, fetch_sitemap_urls
+
+logger = logging.getLogger(__name__)
+
+DISCOVERY_CONCURRENCY = 16
+DISCOVERY_TIMEOUT_SECONDS = 10
+MIN_PER_STRATUM = 2  # the fewest pages that still give a within-stratum variance
+STRATUM_TARGET = 5  # sample pages per stratum we aim for before lumping small ones
+OTHER_STRATUM = "(other)"
+
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-f]{8,}|[0-9a-f]{8}-[0-9a-f-]{27})$", re.IGNORECASE)
+
+
+# ── Discovery ─────────────────────────────────────────────────────────────────
+
+async def discover_urls(
+    base_url: str,
+    base_host: str,
+    normalize: Callable[[str], str],
+    limit: int,
+    max_fetches: int,
+) -> dict[str, str]:
+    """
+    Cheap URL discovery for sample scans: the sitemap, then a breadth-first
+    walk over raw HTML fetched with httpx (nothing is rendered, only <a href>s
+    are read). Stops at `limit` URLs or `max_fetches` page fetches. Returns
+    normalized URL → first-seen URL, on the site's host only.
+    """
+    found: dict[str, str] = {}
+
+    def add(url: str) -> bool:
+        """Record `url`; True if it is new."""
+        if urlparse(url).netloc != base_host or len(found) >= limit:
+            return False
+        norm = normalize(url)
+        if norm in found:
+            return False
+        found[norm] = url
+        return True
+
+    add(base_url)
+    try:
+        for url in await fetch_sitemap_urls(base_url, limit):
+            add(url)
+    except Exception as exc:
+        logger.warning("Sitemap read failed for %s: %s", base_url, exc)
+
+    queue = [base_url]
+    fetches = 0
+    async with httpx.AsyncClient(
+        headers={"User-Agent": USER_AGENT},
+        timeout=DISCOVERY_TIMEOUT_SECONDS,
+        follow_redirects=True,
+    ) as client:
+        while queue and fetches < max_fetches and len(found) < limit:
+            wave = queue[: min(DISCOVERY_CONCURRENCY, max_fetches - fetches)]
+            queue = queue[len(wave):]
+            fetches += len(wave)
+            for links in await asyncio.gather(*(_fetch_links(client, url) for url in wave)):
+                queue.extend(link for link in links if add(link))
+    return found
+
+
+async def _fetch_links(client: httpx.AsyncClient, url: str) -> list[str]:
+    try:
+        response = await client.get(url)
+    except httpx.HTTPError:
+        return []
+    if response.status_code != 200 or "html" not in response.headers.get("content-type", ""):
+        return []
+    try:
+        doc = lxml.html.fromstring(response.text)
+    except (ValueError, lxml.etree.ParserError):
+        return []
+    links = []
+    for href in doc.xpath("//a/@href"):
+        href = href.strip()
+        if not href or href.startswith(("#", "mailto:", "tel:", "javascript:")):
+            continue
+        try:
+            parsed = urlparse(urljoin(str(response.url), href))
+        except ValueError:
+            continue  # malformed href, e.g. an unclosed IPv6 bracket
+        if parsed.scheme in ("http", "https"):
+            links.append(parsed._replace(fragment="").geturl())
+    return links
+
+
+# ── Stratification ────────────────────────────────────────────────────────────
+
+def stratum(url: str) -> str:
+    """
+    Directory/template key: the first path segment, then the shape of the
+    rest, with id-like segments as {n} — /blog/2024/05/post → /blog/{n}/{n}/*.
+    Top-level pages share /*.
+    """
+    segments = [segment for segment in urlparse(url).path.split("/") if segment]
+    if not segments:
+        return "/"
+    if len(segments) == 1:
+        return "/*"
+    shape = ["{n}" if _ID_SEGMENT.match(segment) else "*" for segment in segments[1:]]
+    return "/" + "/".join([segments[0].lower(), *shape])
+
+
+def stratify(urls: Iterable[str], sample_size: int) -> dict[str, list[str]]:
+    """
+    Group URLs by stratum. A stratum keeps its own group only if a
+    proportional sample would give it at least one page, and at most as many
+    as can get about STRATUM_TARGET pages each; the rest share OTHER_STRATUM.
+    """
+    groups: dict[str, list[str]] = {}
+    for url in urls:
+        groups.setdefault(stratum(url), []).append(url)
+    total = sum(len(group) for group in groups.values())
+    ordered = sorted(groups, key=lambda key: len(groups[key]), reverse=True)
+    keep = [
+        key for key in ordered[: max(1, sample_size // STRATUM_TARGET)]
+        if sample_size * len(groups[key]) >= total
+    ]
+    if len(keep) >= len(groups) - 1:
+        return groups  # lumping a single stratum would only rename it
+    strata = {key: groups[key] for key in keep}
+    strata[OTHER_STRATUM] = [url for key in ordered if key not in strata for url in groups[key]]
+    return strata
+
+
+def allocate(sizes: dict[str, int], sample_size: int) -> dict[str, int]:
+    """
+    Proportional allocation of `sample_size` pages over strata of `sizes`,
+    with at least MIN_PER_STRATUM per stratum (or all of a smaller one) and
+    the rounding remainder going to the largest fractional parts.
+    """
+    total = sum(sizes.values())
+    if sample_size >= total:
+        return dict(sizes)
+    quotas = {key: sample_size * size / total for key, size in sizes.items()}
+    counts = {
+        key: min(size, max(MIN_PER_STRATUM, math.floor(quotas[key])))
+        for key, size in sizes.items()
+    }
+    by_remainder = sorted(sizes, key=lambda key: quotas[key] - math.floor(quotas[key]), reverse=True)
+    while sum(counts.values()) < sample_size:
+        room = [key for key in by_remainder if counts[key] < sizes[key]]
+        for key in room[: sample_size - sum(counts.values())]:
+            counts[key] += 1
+    # Minimums can overshoot; take the excess back from the largest allocations
+    while sum(counts.values()) > sample_size:
+        key = max((k for k in counts if counts[k] > MIN_PER_STRATUM), key=counts.get, default=None)
+        if key is None:
+            break
+        counts[key] -= 1
+    return counts
+
+
+def draw_sample(strata: dict[str, list[str]], sample_size: int, rng: random.Random) -> dict[str, list[str]]:
+    """A simple random sample within each stratum, sized by `allocate`."""
+    counts = allocate({key: len(urls) for key, urls in strata.items()}, sample_size)
+    return {key: rng.sample(strata[key], counts[key]) for key in strata}
+
+
+# ── Estimation ────────────────────────────────────────────────────────────────
+
+@dataclass(frozen=True, slots=True)
+class Estimate:
+    value: float
+    low: float
+    high: float
+
+    def rounded(self, digits: int) -> list[float]:
+        return [round(self.value, digits), round(self.low, digits), round(self.high, digits)]
+
+
+def stratified_estimate(
+    sizes: dict[str, int],
+    values: dict[str, list[float]],
+    confidence: float,
+    bounds: tuple[float, float],
+) -> Estimate | None:
+    """
+    Stratified mean with a normal-approximation confidence interval:
+    Σ W_h·ȳ_h, variance Σ W_h²·(1 − n_h/N_h)·s_h²/n_h. Strata without sampled
+    values are left out and the weights renormalized; a stratum with a single
+    value borrows the variance of the whole sample. The interval is clipped to
+    `bounds`. None when nothing was sampled.
+    """
+    sampled = {key: vals for key, vals in values.items() if vals}
+    if not sampled:
+        return None
+    covered = sum(sizes[key] for key in sampled)
+    every = [value for vals in sampled.values() for value in vals]
+    pooled = statistics.variance(every) if len(every) > 1 else 0.0
+
+    mean = variance = 0.0
+    for key, vals in sampled.items():
+        weight = sizes[key] / covered
+        n = len(vals)
+        spread = statistics.variance(vals) if n > 1 else pooled
+        mean += weight * statistics.fmean(vals)
+        variance += weight * weight * (1 - n / sizes[key]) * spread / n
+    half_width = statistics.NormalDist().inv_cdf(0.5 + confidence / 2) * math.sqrt(variance)
+    low, high = bounds
+    return Estimate(mean, max(low, mean - half_width), min(high, mean + half_width))
+
+
+def estimate_site(
+    sizes: dict[str, int],
+    pages: dict[str, list[tuple[int, list[str]]]],
+    confidence: float,
+) -> tuple[Estimate, dict[str, Estimate]] | None:
+    """
+    Site-wide average score and the prevalence (share of pages) of every
+    issue code seen in the sample, from per-stratum (seoScore, issue codes).
+    """
+    score = stratified_estimate(
+        sizes,
+        {key: [float(seo_score) for seo_score, _ in results] for key, results in pages.items()},
+        confidence,
+        (0.0, 100.0),
+    )
+    if score is None:
+        return None
+    codes = sorted({code for results in pages.values() for _, page_codes in results for code in page_codes})
+    prevalence = {
+        code: stratified_estimate(
+            sizes,
+            {
+                key: [1.0 if code in page_codes else 0.0 for _, page_codes in results]
+                for key, results in pages.items()
+            },
+            confidence,
+            (0.0, 1.0),
+        )
+        for code in codes
+    }
+    return score, prevalence
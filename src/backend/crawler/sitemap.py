@@ -0,0 +1,107 @@
+import asyncio
+import gzip
+import logging
+import zlib
+from itertools import islice
+from urllib.parse import urljoin
+
+import httpx
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "SEO-Analyzer-Crawler/0.1"
+MAX_SITEMAP_FILES = 50  # index fan-out cap so a runaway index can't stall a scan
+TIMEOUT_SECONDS = 15
+DEFAULT_SITEMAP_PRIORITY = 0.5  # sitemaps.org default when <priority> is absent
+
+
+async def fetch_sitemap_urls(base_url: str, limit: int) -> list[str]:
+    """
+    Collect page URLs from a site's sitemaps, following sitemap indexes.
+    Sitemaps come from robots.txt `Sitemap:` lines, falling back to
+    /sitemap.xml. Returns at most `limit` URLs in document order.
+    """
+    return list(await fetch_sitemap_entries(base_url, limit))
+
+
+async def fetch_sitemap_entries(base_url: str, limit: int) -> dict[str, float | None]:
+    """Like fetch_sitemap_urls, but maps each URL to its <priority> (None if absent)."""
+    async with httpx.AsyncClient(
+        headers={"User-Agent": USER_AGENT},
+        timeout=TIMEOUT_SECONDS,
+        follow_redirects=True,
+    ) as client:
+        pending = await _sitemaps_from_robots(client, base_url) or [
+            urljoin(base_url, "/sitemap.xml")
+        ]
+        seen_sitemaps: set[str] = set()
+        entries: dict[str, float | None] = {}
+
+        while pending and len(entries) < limit:
+            batch = [s for s in dict.fromkeys(pending) if s not in seen_sitemaps]
+            batch = batch[: MAX_SITEMAP_FILES - len(seen_sitemaps)]
+            seen_sitemaps.update(batch)
+            pending = []
+            # Child sitemaps of an index are independent, so fetch them together
+            for pages, children in await asyncio.gather(*(_read_sitemap(client, s) for s in batch)):
+                for url, priority in pages:
+                    entries.setdefault(url, priority)
+                pending.extend(children)
+
+    return dict(islice(entries.items(), limit))
+
+
+async def _sitemaps_from_robots(client: httpx.AsyncClient, base_url: str) -> list[str]:
+    try:
+        response = await client.get(urljoin(base_url, "/robots.txt"))
+    except httpx.HTTPError:
+        return []
+    if response.status_code != 200:
+        return []
+    return [
+        line.split(":", 1)[1].strip()
+        for line in response.text.splitlines()
+        if line.lower().startswith("sitemap:")
+    ]
+
+
+async def _read_sitemap(
+    client: httpx.AsyncClient, url: str
+) -> tuple[list[tuple[str, float | None]], list[str]]:
+    """Return ((page URL, priority) pairs, child sitemap URLs) for one sitemap file."""
+    try:
+        response = await client.get(url)
+    except httpx.HTTPError as exc:
+        logger.warning("Sitemap fetch failed for %s: %s", url, exc)
+        return [], []
+    if response.status_code != 200:
+        return [], []
+
+    content = response.content
+    if content[:2] == b"\x1f\x8b":  # .xml.gz served without Content-Encoding
+        try:
+            content = gzip.decompress(content)
+        except (OSError, EOFError, zlib.error) as exc:  # truncated or corrupt
+            logger.warning("Sitemap decompress failed for %s: %s", url, exc)
+            return [], []
+
+    soup = BeautifulSoup(content, "xml")
+    if soup.find("sitemapindex"):
+        return [], [loc.get_text(strip=True) for loc in soup.find_all("loc")]
+    pages: list[tuple[str, float | None]] = []
+    for entry in soup.find_all("url"):
+        loc = entry.find("loc")
+        if loc is None:
+            continue
+        pages.append((loc.get_text(strip=True), _priority(entry.find("priority"))))
+    return pages, []
+
+
+def _priority(tag) -> float | None:
+    if tag is None:
+        return None
+    try:
+        return min(max(float(tag.get_text(strip=True)), 0.0), 1.0)
+    except ValueError:
+        return None
@@ -7,8 +7,11 @@ from fastapi.responses import JSONResponse
 from sqlalchemy import text
 
 from config import get_settings
+from api.middleware import ProfilingMiddleware, instrument_engine, request_stats
 from api.routes import sites_router, scans_router, pages_router, websocket_router
-from utils.database import engine
+from services.scheduler import scheduler
+from services.ws_manager import manager
+from utils.database import dispose_engines, engine, pool_stats, read_engine
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -24,8 +27,13 @@ async def lifespan(app: FastAPI):
     except Exception as exc:
         logger.error("Cannot connect to database: %s", exc)
         sys.exit(1)
+    await manager.start()
+    if settings.scheduler_enabled:
+        scheduler.start()
     yield
-    await engine.dispose()
+    await scheduler.stop()
+    await manager.stop()
+    await dispose_engines()
 
 
 app = FastAPI(
@@ -43,6 +51,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.profiling_enabled:
+    # API engines only; crawler statements would be charged to whichever
+    # request happened to start the scan
+    for eng in {engine, read_engine}:
+        instrument_engine(eng.sync_engine)
+    app.add_middleware(ProfilingMiddleware)
+
 
 @app.exception_handler(Exception)
 async def unhandled_exception_handler(request: Request, exc: Exception) -> JSONResponse:
@@ -63,3 +78,15 @@ app.include_router(websocket_router)
 @app.get("/health")
 async def health():
     return {"status": "ok"}
+
+
+@app.get("/metrics/db")
+async def db_metrics():
+    """Connection pool saturation and checkout wait times per engine."""
+    return pool_stats()
+
+
+@app.get("/metrics/requests")
+async def request_metrics():
+    """Per-route latency, statement counts, DB time and response size."""
+    return request_stats()
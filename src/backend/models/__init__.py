@@ -1,4 +1,4 @@
-from models.orm import Base, Site, ScanTask, PageResult, SeoIssue, AiSuggestion, ScoreHistory
+from models.orm import Base, Site, ScanSchedule, ScanBatch, ScanTask, PageResult, PageLink, SeoIssue, AiSuggestion, ScoreHistory
 from models.schemas import (
     SiteCreate, SiteResponse,
     ScanCreate, ScanTaskResponse,
@@ -8,7 +8,7 @@ from models.schemas import (
 )
 
 __all__ = [
-    "Base", "Site", "ScanTask", "PageResult", "SeoIssue", "AiSuggestion", "ScoreHistory",
+    "Base", "Site", "ScanSchedule", "ScanBatch", "ScanTask", "PageResult", "PageLink", "SeoIssue", "AiSuggestion", "ScoreHistory",
     "SiteCreate", "SiteResponse",
     "ScanCreate", "ScanTaskResponse",
     "SeoIssueResponse", "AiSuggestionResponse",
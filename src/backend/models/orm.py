@@ -2,9 +2,10 @@ from datetime import datetime
 from typing import Optional
 import cuid
 from sqlalchemy import (
-    String, Integer, Float, Boolean, Text, DateTime,
+    String, Integer, BigInteger, Float, Boolean, Text, DateTime,
     ForeignKey, Enum as SAEnum, Index,
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import (
     DeclarativeBase, Mapped, mapped_column, relationship
 )
@@ -24,11 +25,22 @@ class Site(Base):
     id: Mapped[str] = mapped_column(String, primary_key=True, default=generate_cuid)
     name: Mapped[str] = mapped_column(String, nullable=False)
     domain: Mapped[str] = mapped_column(String, unique=True, nullable=False)
+    tenantId: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     createdAt: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     updatedAt: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     scanTasks: Mapped[list["ScanTask"]] = relationship("ScanTask", back_populates="site", cascade="all, delete-orphan")
     scores: Mapped[list["ScoreHistory"]] = relationship("ScoreHistory", back_populates="site", cascade="all, delete-orphan")
+    schedule: Mapped[Optional["ScanSchedule"]] = relationship("ScanSchedule", back_populates="site", cascade="all, delete-orphan", uselist=False)
+
+
+class ScanBatch(Base):
+    __tablename__ = "ScanBatch"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=generate_cuid)
+    createdAt: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    scanTasks: Mapped[list["ScanTask"]] = relationship("ScanTask", back_populates="batch")
 
 
 class ScanTask(Base):
@@ -36,20 +48,73 @@ class ScanTask(Base):
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=generate_cuid)
     siteId: Mapped[str] = mapped_column(String, ForeignKey("Site.id", ondelete="CASCADE"), nullable=False)
+    batchId: Mapped[Optional[str]] = mapped_column(String, ForeignKey("ScanBatch.id", ondelete="SET NULL"), nullable=True)
     status: Mapped[str] = mapped_column(
-        SAEnum("PENDING", "RUNNING", "COMPLETED", "FAILED", name="ScanStatus"),
+        SAEnum("PENDING", "RUNNING", "COMPLETED", "FAILED", "CANCELLED", name="ScanStatus"),
         default="PENDING",
         nullable=False,
     )
+    mode: Mapped[str] = mapped_column(
+        SAEnum("CRAWL", "URL_LIST", "SITEMAP", "SAMPLE", name="ScanMode"),
+        default="CRAWL",
+        nullable=False,
+    )
+    # Set by the cancel endpoint (CANCELLED) or the crawler when a budget runs
+    # out; a COMPLETED scan with a stopReason is partial
+    stopReason: Mapped[Optional[str]] = mapped_column(
+        SAEnum("CANCELLED", "WALL_TIME", "BYTES", "BROWSER_MEMORY", name="ScanStopReason"),
+        nullable=True,
+    )
+    # Budgets; NULL falls back to the scan_max_* settings, 0 is unlimited
+    maxWallSeconds: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    maxBytes: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    maxBrowserMemoryMb: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    # SAMPLE scans: pages to render; NULL falls back to the sample_size setting
+    sampleSize: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    # Issues stored as PageResult.issueMask/issueParams instead of SeoIssue rows
+    compactIssues: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     pagesFound: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     pagesScanned: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     startedAt: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     completedAt: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    archivedAt: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     createdAt: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     updatedAt: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     site: Mapped["Site"] = relationship("Site", back_populates="scanTasks")
+    batch: Mapped[Optional["ScanBatch"]] = relationship("ScanBatch", back_populates="scanTasks")
     pageResults: Mapped[list["PageResult"]] = relationship("PageResult", back_populates="scanTask", cascade="all, delete-orphan")
+    pageLinks: Mapped[list["PageLink"]] = relationship("PageLink", cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        Index("ix_scantask_batchid", "batchId"),
+    )
+
+
+class ScanSchedule(Base):
+    __tablename__ = "ScanSchedule"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=generate_cuid)
+    siteId: Mapped[str] = mapped_column(String, ForeignKey("Site.id", ondelete="CASCADE"), unique=True, nullable=False)
+    cron: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    intervalMinutes: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    jitterSeconds: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    mode: Mapped[str] = mapped_column(
+        SAEnum("CRAWL", "URL_LIST", "SITEMAP", "SAMPLE", name="ScanMode"),
+        default="CRAWL",
+        nullable=False,
+    )
+    enabled: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    nextRunAt: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    lastRunAt: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    createdAt: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    updatedAt: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    site: Mapped["Site"] = relationship("Site", back_populates="schedule")
+
+    __table_args__ = (
+        Index("ix_scanschedule_enabled_nextrunat", "enabled", "nextRunAt"),
+    )
 
 
 class PageResult(Base):
@@ -70,7 +135,18 @@ class PageResult(Base):
     imagesTotal: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     imagesMissingAlt: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     loadTimeMs: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    # Navigation/Resource Timing summary, keys as in crawler.page_weight.STORED_KEYS
+    pageWeight: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
     seoScore: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    nodeId: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    htmlHash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    # Compact issue storage (see services.scoring.ISSUE_CATALOG); NULL when
+    # the page's issues live in SeoIssue rows
+    issueMask: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    issueParams: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
+    pageRank: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    inlinks: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    clickDepth: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     crawledAt: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
 
     scanTask: Mapped["ScanTask"] = relationship("ScanTask", back_populates="pageResults")
@@ -78,11 +154,23 @@ class PageResult(Base):
     aiSuggestions: Mapped[list["AiSuggestion"]] = relationship("AiSuggestion", back_populates="pageResult", cascade="all, delete-orphan")
 
     __table_args__ = (
-        Index("ix_pageresult_scantaskid", "scanTaskId"),
+        Index("ix_pageresult_scantaskid_url", "scanTaskId", "url"),
         Index("ix_pageresult_seoscore", "seoScore"),
+        Index("ix_pageresult_htmlhash", "htmlHash"),
+        # Key-existence (?, ?&) lookups for "pages with issue X"
+        Index("ix_pageresult_issueparams", "issueParams", postgresql_using="gin"),
     )
 
 
+class PageLink(Base):
+    """Internal link edge between two pages of a scan, keyed by PageResult.nodeId."""
+    __tablename__ = "PageLink"
+
+    scanTaskId: Mapped[str] = mapped_column(String, ForeignKey("ScanTask.id", ondelete="CASCADE"), primary_key=True)
+    sourceNode: Mapped[int] = mapped_column(Integer, primary_key=True)
+    targetNode: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+
 class SeoIssue(Base):
     __tablename__ = "SeoIssue"
 
@@ -128,6 +216,12 @@ class ScoreHistory(Base):
     siteId: Mapped[str] = mapped_column(String, ForeignKey("Site.id", ondelete="CASCADE"), nullable=False)
     avgScore: Mapped[float] = mapped_column(Float, nullable=False)
     pagesCount: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Set by SAMPLE scans: avgScore is then an estimate from sampleSize pages,
+    # with its confidence interval and {code: [share of pages, low, high]}
+    sampleSize: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    avgScoreLow: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    avgScoreHigh: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    issuePrevalence: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
     recordedAt: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
 
     site: Mapped["Site"] = relationship("Site", back_populates="scores")
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional, Literal
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 
 # ─── Site ─────────────────────────────────────────────────────────────────────
@@ -8,6 +8,7 @@ from pydantic import BaseModel, ConfigDict
 class SiteCreate(BaseModel):
     name: str
     domain: str
+    tenantId: Optional[str] = None
 
 
 class SiteResponse(BaseModel):
@@ -16,6 +17,45 @@ class SiteResponse(BaseModel):
     id: str
     name: str
     domain: str
+    tenantId: Optional[str] = None
+    createdAt: datetime
+    updatedAt: datetime
+
+
+# ─── Scan Schedule ────────────────────────────────────────────────────────────
+
+class ScanScheduleUpsert(BaseModel):
+    cron: Optional[str] = None
+    intervalMinutes: Optional[int] = Field(None, ge=5)
+    jitterSeconds: int = Field(300, ge=0)
+    mode: Literal["CRAWL", "SAMPLE"] = "CRAWL"
+    enabled: bool = True
+
+    @model_validator(mode="after")
+    def _one_trigger(self) -> "ScanScheduleUpsert":
+        if (self.cron is None) == (self.intervalMinutes is None):
+            raise ValueError("Set exactly one of cron or intervalMinutes")
+        if self.cron is None:
+            return self
+        from croniter import croniter  # loaded lazily, off the startup path
+
+        if not croniter.is_valid(self.cron):
+            raise ValueError(f"Invalid cron expression: {self.cron!r}")
+        return self
+
+
+class ScanScheduleResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    siteId: str
+    cron: Optional[str]
+    intervalMinutes: Optional[int]
+    jitterSeconds: int
+    mode: Literal["CRAWL", "SAMPLE"] = "CRAWL"
+    enabled: bool
+    nextRunAt: datetime
+    lastRunAt: Optional[datetime]
     createdAt: datetime
     updatedAt: datetime
 
@@ -24,6 +64,25 @@ class SiteResponse(BaseModel):
 
 class ScanCreate(BaseModel):
     siteId: str
+    mode: Literal["CRAWL", "URL_LIST", "SITEMAP", "SAMPLE"] = "CRAWL"
+    urls: Optional[list[str]] = Field(None, min_length=1, max_length=10_000)
+    sampleSize: Optional[int] = Field(None, ge=10, le=10_000)
+    # Budgets; omitted → server defaults, 0 → unlimited
+    maxWallSeconds: Optional[int] = Field(None, ge=0)
+    maxBytes: Optional[int] = Field(None, ge=0)
+    maxBrowserMemoryMb: Optional[int] = Field(None, ge=0)
+
+    @model_validator(mode="after")
+    def _urls_match_mode(self) -> "ScanCreate":
+        if (self.mode == "URL_LIST") != (self.urls is not None):
+            raise ValueError("urls is required for URL_LIST scans and not allowed otherwise")
+        if self.sampleSize is not None and self.mode != "SAMPLE":
+            raise ValueError("sampleSize is only allowed for SAMPLE scans")
+        return self
+
+
+class ScanBatchCreate(BaseModel):
+    siteIds: list[str] = Field(..., min_length=1, max_length=1000)
 
 
 class ScanTaskResponse(BaseModel):
@@ -31,15 +90,41 @@ class ScanTaskResponse(BaseModel):
 
     id: str
     siteId: str
-    status: Literal["PENDING", "RUNNING", "COMPLETED", "FAILED"]
+    batchId: Optional[str] = None
+    status: Literal["PENDING", "RUNNING", "COMPLETED", "FAILED", "CANCELLED"]
+    mode: Literal["CRAWL", "URL_LIST", "SITEMAP", "SAMPLE"] = "CRAWL"
+    stopReason: Optional[Literal["CANCELLED", "WALL_TIME", "BYTES", "BROWSER_MEMORY"]] = None
+    maxWallSeconds: Optional[int] = None
+    maxBytes: Optional[int] = None
+    maxBrowserMemoryMb: Optional[int] = None
+    sampleSize: Optional[int] = None
     pagesFound: int
     pagesScanned: int
     startedAt: Optional[datetime]
     completedAt: Optional[datetime]
+    archivedAt: Optional[datetime] = None
     createdAt: datetime
     updatedAt: datetime
 
 
+class ScanBatchResponse(BaseModel):
+    id: str
+    createdAt: datetime
+    scans: list[ScanTaskResponse]
+
+
+class ScanBatchProgressResponse(BaseModel):
+    id: str
+    scansTotal: int
+    pending: int
+    running: int
+    completed: int
+    failed: int
+    cancelled: int
+    pagesScanned: int
+    pagesFound: int
+
+
 # ─── SEO Issue ────────────────────────────────────────────────────────────────
 
 class SeoIssueResponse(BaseModel):
@@ -68,6 +153,18 @@ class AiSuggestionResponse(BaseModel):
 
 # ─── Page Result ─────────────────────────────────────────────────────────────
 
+class PageWeight(BaseModel):
+    """Navigation/Resource Timing summary; times are ms from navigation start."""
+    ttfbMs: Optional[int] = None
+    domContentLoadedMs: Optional[int] = None
+    loadEventMs: Optional[int] = None
+    requestCount: int
+    transferBytes: int
+    byType: dict[str, tuple[int, int]] = {}  # resource type → (requests, bytes)
+    renderBlocking: list[str] = []  # the first few; renderBlockingCount has them all
+    renderBlockingCount: Optional[int] = None
+
+
 class PageResultResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -86,7 +183,11 @@ class PageResultResponse(BaseModel):
     imagesTotal: int
     imagesMissingAlt: int
     loadTimeMs: Optional[int]
+    pageWeight: Optional[PageWeight] = None
     seoScore: int
+    pageRank: Optional[float] = None
+    inlinks: Optional[int] = None
+    clickDepth: Optional[int] = None
     crawledAt: datetime
 
 
@@ -95,6 +196,42 @@ class PageDiagnosisResponse(PageResultResponse):
     aiSuggestions: list[AiSuggestionResponse] = []
 
 
+ExportFormat = Literal["csv", "jsonl", "parquet"]
+
+
+# ─── Scan Diff ────────────────────────────────────────────────────────────────
+
+PageChange = Literal["NEW", "REMOVED", "REGRESSED", "FIXED", "UNCHANGED"]
+
+
+class PageDiffResponse(BaseModel):
+    url: str
+    change: PageChange
+    basePageId: Optional[str]
+    headPageId: Optional[str]
+    baseScore: Optional[int]
+    headScore: Optional[int]
+    scoreDelta: Optional[int]
+    issuesAdded: list[str]
+    issuesCleared: list[str]
+
+
+class ScanDiffSummary(BaseModel):
+    new: int = 0
+    removed: int = 0
+    regressed: int = 0
+    fixed: int = 0
+    unchanged: int = 0
+
+
+class ScanDiffResponse(BaseModel):
+    baseScanId: str
+    headScanId: str
+    summary: ScanDiffSummary
+    total: int
+    items: list[PageDiffResponse]
+
+
 # ─── SEO Issue with Page URL ──────────────────────────────────────────────────
 
 class SeoIssueWithPageResponse(BaseModel):
@@ -117,4 +254,20 @@ class ScoreHistoryResponse(BaseModel):
     siteId: str
     avgScore: float
     pagesCount: int
+    sampleSize: Optional[int] = None
+    avgScoreLow: Optional[float] = None
+    avgScoreHigh: Optional[float] = None
+    issuePrevalence: Optional[dict[str, tuple[float, float, float]]] = None
     recordedAt: datetime
+
+
+TrendBucket = Literal["day", "week", "month"]
+
+
+class TrendPointResponse(BaseModel):
+    bucket: datetime
+    avgScore: float
+    minScore: float
+    maxScore: float
+    avgPagesCount: float
+    samples: int
@@ -0,0 +1,311 @@
+"""
+Read-path benchmark over generated datasets of increasing size.
+
+    uv run python scripts/api_benchmark.py --sizes 100,1000,5000 [--requests 100]
+        [--pages-per-scan 500] [--seq-scan-rows 10000] [--json results.json]
+
+For each size the database is grown to that many sites with
+scripts/seed_bench_data.py (COPY) and ANALYZEd. Then every read endpoint of
+api/routes/{sites,scans,pages}.py is called in-process through httpx's ASGI
+transport against a random sample of sites, scans and pages. Per endpoint it
+reports p50/p99 latency, SQL statements and DB time per request (from the
+profiling middleware's Server-Timing header), and peak Python allocation
+per request (tracemalloc, on a separate pass so it doesn't skew latency).
+
+Every distinct statement an endpoint ran is EXPLAINed with its captured
+parameters. Plans with a Seq Scan on a table larger than --seq-scan-rows are
+flagged, and the script then exits non-zero so CI can gate on it.
+
+Point DATABASE_URL at a disposable database: it is truncated first.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+import asyncpg
+import httpx
+from sqlalchemy import event
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Before the app reads its settings: no scheduler, Server-Timing on, no slow-request log
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+os.environ["PROFILING_ENABLED"] = "true"
+os.environ.setdefault("PROFILE_SLOW_REQUEST_MS", str(10**9))
+
+from main import app  # noqa: E402
+from seed_bench_data import dsn, seed, truncate  # noqa: E402
+from utils.database import engine, read_engine  # noqa: E402
+
+WARMUP_REQUESTS = 3
+MEMORY_REQUESTS = 20
+SERVER_TIMING_DB = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+
+@dataclass
+class Sample:
+    site_id: str
+    scan_id: str
+    page_id: str
+
+
+# (name, path for a sample); scan ids are each site's newest live scan, so
+# /diff compares it with the previous one
+ENDPOINTS: list[tuple[str, Callable[[Sample], str]]] = [
+    ("GET /sites", lambda s: "/api/v1/sites"),
+    ("GET /sites/{id}/scans", lambda s: f"/api/v1/sites/{s.site_id}/scans"),
+    ("GET /sites/{id}/issues", lambda s: f"/api/v1/sites/{s.site_id}/issues"),
+    ("GET /sites/{id}/issues?category=CRITICAL",
+     lambda s: f"/api/v1/sites/{s.site_id}/issues?category=CRITICAL"),
+    ("GET /sites/{id}/trends", lambda s: f"/api/v1/sites/{s.site_id}/trends"),
+    ("GET /sites/{id}/trends/aggregate?bucket=week",
+     lambda s: f"/api/v1/sites/{s.site_id}/trends/aggregate?bucket=week"),
+    ("GET /scans/{id}", lambda s: f"/api/v1/scans/{s.scan_id}"),
+    ("GET /scans/{id}/results", lambda s: f"/api/v1/scans/{s.scan_id}/results"),
+    ("GET /scans/{id}/results?issue=MISSING_H1",
+     lambda s: f"/api/v1/scans/{s.scan_id}/results?issue=MISSING_H1"),
+    ("GET /scans/{id}/diff", lambda s: f"/api/v1/scans/{s.scan_id}/diff"),
+    ("GET /scans/{id}/export?format=csv", lambda s: f"/api/v1/scans/{s.scan_id}/export?format=csv"),
+    ("GET /pages/{id}", lambda s: f"/api/v1/pages/{s.page_id}?scanId={s.scan_id}"),
+]
+
+
+@dataclass
+class EndpointResult:
+    name: str
+    latencies_ms: list[float] = field(default_factory=list)
+    statements: list[int] = field(default_factory=list)
+    db_ms: list[float] = field(default_factory=list)
+    peak_bytes: list[int] = field(default_factory=list)
+    errors: int = 0
+    seq_scans: list[dict] = field(default_factory=list)
+
+
+class StatementLog:
+    """Collects the distinct statements (with first-seen parameters) run while active."""
+
+    def __init__(self) -> None:
+        self.current: dict[str, tuple] | None = None
+        for eng in {engine, read_engine}:
+            event.listen(eng.sync_engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if self.current is not None and not executemany:
+            self.current.setdefault(statement, tuple(parameters or ()))
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def pick_samples(conn: asyncpg.Connection, count: int) -> list[Sample]:
+    rows = await conn.fetch(
+        """
+        SELECT s.id AS site_id, head.id AS scan_id, page.id AS page_id
+        FROM (SELECT id FROM "Site" ORDER BY random() LIMIT $1) s
+        CROSS JOIN LATERAL (
+            SELECT t.id FROM "ScanTask" t
+            WHERE t."siteId" = s.id AND t.status = 'COMPLETED' AND t."archivedAt" IS NULL
+            ORDER BY t."createdAt" DESC LIMIT 1
+        ) head
+        CROSS JOIN LATERAL (
+            SELECT p.id FROM "PageResult" p WHERE p."scanTaskId" = head.id LIMIT 1
+        ) page
+        """,
+        count,
+    )
+    return [Sample(row["site_id"], row["scan_id"], row["page_id"]) for row in rows]
+
+
+async def table_rows(conn: asyncpg.Connection) -> dict[str, int]:
+    rows = await conn.fetch(
+        "SELECT relname, reltuples::bigint AS n FROM pg_class "
+        "WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace"
+    )
+    return {row["relname"]: max(row["n"], 0) for row in rows}
+
+
+async def run_endpoint(
+    client: httpx.AsyncClient,
+    log: StatementLog,
+    name: str,
+    make_path: Callable[[Sample], str],
+    samples: list[Sample],
+    requests: int,
+) -> tuple[EndpointResult, dict[str, tuple]]:
+    result = EndpointResult(name)
+    paths = [make_path(samples[i % len(samples)]) for i in range(requests)]
+
+    for path in paths[:WARMUP_REQUESTS]:
+        await client.get(path)
+
+    log.current = {}
+    for path in paths:
+        start = time.perf_counter()
+        response = await client.get(path)
+        result.latencies_ms.append((time.perf_counter() - start) * 1000)
+        if response.status_code >= 400:
+            result.errors += 1
+        timing = SERVER_TIMING_DB.search(response.headers.get("server-timing", ""))
+        if timing:
+            result.db_ms.append(float(timing.group(1)))
+            result.statements.append(int(timing.group(2)))
+    statements, log.current = log.current, None
+
+    tracemalloc.start()
+    try:
+        for path in paths[:MEMORY_REQUESTS]:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            await client.get(path)
+            result.peak_bytes.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    return result, statements
+
+
+async def find_seq_scans(
+    conn: asyncpg.Connection,
+    statements: dict[str, tuple],
+    sizes: dict[str, int],
+    min_rows: int,
+) -> list[dict]:
+    """EXPLAIN each SELECT and return its Seq Scans over tables of min_rows or more."""
+    found: list[dict] = []
+    for statement, parameters in statements.items():
+        if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            continue
+        try:
+            raw = await conn.fetchval(f"EXPLAIN (FORMAT JSON) {statement}", *parameters)
+        except asyncpg.PostgresError as exc:
+            print(f"  (could not EXPLAIN: {exc})", file=sys.stderr)
+            continue
+        plan = json.loads(raw) if isinstance(raw, str) else raw
+        for node in _plan_nodes(plan[0]["Plan"]):
+            table = node.get("Relation Name")
+            if node["Node Type"] == "Seq Scan" and sizes.get(table, 0) >= min_rows:
+                found.append({
+                    "table": table,
+                    "tableRows": sizes[table],
+                    "filter": node.get("Filter"),
+                    "statement": " ".join(statement.split())[:300],
+                })
+    return found
+
+
+def _plan_nodes(node: dict):
+    yield node
+    for child in node.get("Plans", ()):
+        yield from _plan_nodes(child)
+
+
+def print_report(size: int, rows: dict[str, int], results: list[EndpointResult]) -> None:
+    print(
+        f"\n== {size:,} sites · {rows.get('PageResult', 0):,} PageResult · "
+        f"{rows.get('SeoIssue', 0):,} SeoIssue · {rows.get('ScoreHistory', 0):,} ScoreHistory =="
+    )
+    print(f"{'endpoint':<46} {'p50 ms':>8} {'p99 ms':>8} {'stmts':>6} {'db p50':>8} {'peak MB':>8}")
+    for r in results:
+        print(
+            f"{r.name:<46} {percentile(r.latencies_ms, 0.5):>8.1f} "
+            f"{percentile(r.latencies_ms, 0.99):>8.1f} {percentile(r.statements, 0.5):>6.0f} "
+            f"{percentile(r.db_ms, 0.5):>8.1f} {max(r.peak_bytes, default=0) / 2**20:>8.2f}"
+            + (f"  ({r.errors} errors)" if r.errors else "")
+        )
+        for scan in r.seq_scans:
+            print(f"    SEQ SCAN on {scan['table']} ({scan['tableRows']:,} rows): {scan['statement']}")
+
+
+async def _main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="100,1000,5000", help="comma-separated site counts")
+    parser.add_argument("--requests", type=int, default=100, help="timed requests per endpoint")
+    parser.add_argument("--samples", type=int, default=50, help="distinct sites to spread requests over")
+    parser.add_argument("--pages-per-scan", type=int, default=500)
+    parser.add_argument("--history-days", type=int, default=1095)
+    parser.add_argument("--compact-ratio", type=float, default=0.0)
+    parser.add_argument("--seq-scan-rows", type=int, default=10_000,
+                        help="flag Seq Scans on tables with at least this many rows")
+    parser.add_argument("--json", type=Path, help="also write results here")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+    random.seed(args.seed)
+
+    log = StatementLog()
+    report: list[dict] = []
+    conn = await asyncpg.connect(dsn())
+    try:
+        await truncate(conn)
+        seeded = 0
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for size in sizes:
+                start = time.perf_counter()
+                await seed(
+                    conn,
+                    sites=size,
+                    first_site=seeded,
+                    pages_per_scan=args.pages_per_scan,
+                    history_days=args.history_days,
+                    compact_ratio=args.compact_ratio,
+                    seed_value=args.seed,
+                )
+                seeded = size
+                await conn.execute("ANALYZE")
+                rows = await table_rows(conn)
+                print(f"\nseeded {size:,} sites in {time.perf_counter() - start:.0f} s", file=sys.stderr)
+
+                samples = await pick_samples(conn, args.samples)
+                results: list[EndpointResult] = []
+                for name, make_path in ENDPOINTS:
+                    result, statements = await run_endpoint(
+                        client, log, name, make_path, samples, args.requests
+                    )
+                    result.seq_scans = await find_seq_scans(
+                        conn, statements, rows, args.seq_scan_rows
+                    )
+                    results.append(result)
+                print_report(size, rows, results)
+
+                report.extend(
+                    {
+                        "sites": size,
+                        "tableRows": rows,
+                        "endpoint": r.name,
+                        "p50Ms": percentile(r.latencies_ms, 0.5),
+                        "p99Ms": percentile(r.latencies_ms, 0.99),
+                        "statements": percentile(r.statements, 0.5),
+                        "dbP50Ms": percentile(r.db_ms, 0.5),
+                        "peakMb": max(r.peak_bytes, default=0) / 2**20,
+                        "errors": r.errors,
+                        "seqScans": r.seq_scans,
+                    }
+                    for r in results
+                )
+    finally:
+        await conn.close()
+        await engine.dispose()
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+    flagged = sum(len(entry["seqScans"]) for entry in report)
+    if flagged:
+        print(f"\nFAIL: {flagged} sequential scan(s) on large tables")
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main()))
@@ -0,0 +1,292 @@
+"""
+Bulk-generate realistic benchmark data and load it with COPY.
+
+    uv run python scripts/seed_bench_data.py --sites 1000 [--pages-per-scan 500]
+        [--scans-per-site 12] [--live-scans 2] [--history-days 1095]
+        [--compact-ratio 0] [--seed 1] [--truncate]
+
+Each site gets a weekly scan history. The newest --live-scans scans keep
+their PageResult/SeoIssue rows; older scans are marked archived, as the
+archival job leaves them. Pages are drawn from per-site quality profiles
+and scored with the real scorer, so scores, issues and masks are consistent.
+ScoreHistory holds one sample per day over --history-days. Rows are streamed
+through asyncpg's binary COPY in chunks, so memory stays flat at any size.
+
+Point DATABASE_URL at a disposable database; --truncate empties every table.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import asyncpg
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import get_settings  # noqa: E402
+from services.scoring import score_pages, score_pages_compact  # noqa: E402
+
+settings = get_settings()
+
+CHUNK_ROWS = 50_000
+SCAN_INTERVAL = timedelta(days=7)
+
+# FK order: parents are always flushed before children
+COLUMNS: dict[str, tuple[str, ...]] = {
+    "Site": ("id", "name", "domain", "tenantId", "createdAt", "updatedAt"),
+    "ScanTask": (
+        "id", "siteId", "status", "mode", "compactIssues", "pagesFound", "pagesScanned",
+        "startedAt", "completedAt", "archivedAt", "createdAt", "updatedAt",
+    ),
+    "PageResult": (
+        "id", "scanTaskId", "url", "httpStatus", "title", "titleLength",
+        "metaDescription", "metaDescLength", "h1Count", "h2Count", "h3Count", "h1Text",
+        "imagesTotal", "imagesMissingAlt", "loadTimeMs", "seoScore", "nodeId",
+        "issueMask", "issueParams", "pageRank", "inlinks", "clickDepth", "crawledAt",
+    ),
+    "SeoIssue": ("id", "pageResultId", "category", "code", "description", "impact", "createdAt"),
+    "ScoreHistory": ("id", "siteId", "avgScore", "pagesCount", "recordedAt"),
+}
+TABLES = tuple(COLUMNS)
+
+SECTIONS = ("blog", "products", "docs", "category", "news", "help", "about", "pricing")
+WORDS = (
+    "guide", "best", "review", "how", "to", "pricing", "setup", "compare", "fast",
+    "free", "tutorial", "new", "top", "tips", "seo", "analytics", "report", "team",
+)
+
+
+def new_id() -> str:
+    """25-char random id shaped like the cuids the app generates."""
+    return "c" + uuid.uuid4().hex[:24]
+
+
+class CopyBuffer:
+    """Buffers rows per table and COPYs them out in FK order every CHUNK_ROWS rows."""
+
+    def __init__(self, conn: asyncpg.Connection) -> None:
+        self.conn = conn
+        self.rows: dict[str, list[tuple]] = {table: [] for table in TABLES}
+        self.counts: dict[str, int] = dict.fromkeys(TABLES, 0)
+        self._buffered = 0
+
+    async def add(self, table: str, row: tuple) -> None:
+        self.rows[table].append(row)
+        self._buffered += 1
+        if self._buffered >= CHUNK_ROWS:
+            await self.flush()
+
+    async def flush(self) -> None:
+        for table in TABLES:
+            rows = self.rows[table]
+            if rows:
+                await self.conn.copy_records_to_table(table, records=rows, columns=COLUMNS[table])
+                self.counts[table] += len(rows)
+                self.rows[table] = []
+        self._buffered = 0
+
+
+class SiteProfile:
+    """Per-site tendencies, so sites (and their trend lines) differ."""
+
+    def __init__(self, rng: random.Random) -> None:
+        self.quality = rng.betavariate(4, 2)  # 0 = neglected, 1 = well kept
+        self.slow = rng.random() < 0.2
+        self.image_heavy = rng.random() < 0.3
+
+
+def page_data(rng: random.Random, profile: SiteProfile, url: str) -> dict:
+    """A crawler-shaped page dict (what _crawl_page returns, minus links)."""
+    q = profile.quality
+    title = None
+    if rng.random() > 0.08 * (1 - q):
+        words = rng.randint(3, 8 if q > 0.5 else 16)
+        title = " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+    meta = None
+    if rng.random() > 0.35 * (1 - q):
+        length = max(20, int(rng.gauss(140 if q > 0.5 else 170, 35)))
+        meta = ("Lorem ipsum dolor sit amet " * 8)[:length]
+    h1_count = rng.choices((0, 1, 2, 3), weights=(0.15 * (1 - q), 1.0, 0.1, 0.03))[0]
+    images = rng.randint(0, 40 if profile.image_heavy else 12)
+    load_ms = int(rng.lognormvariate(7.6 if profile.slow else 6.9, 0.5))
+    status = rng.choices((200, 404, 500, 403), weights=(0.96, 0.03, 0.007, 0.003))[0]
+    return {
+        "url": url,
+        "http_status": status,
+        "load_time_ms": load_ms,
+        "title": title,
+        "meta_description": meta,
+        "h1_count": h1_count,
+        "h2_count": rng.randint(0, 8),
+        "h3_count": rng.randint(0, 12),
+        "h1_text": title.split(" ", 3)[0] if title and h1_count else None,
+        "images_total": images,
+        "images_missing_alt": int(images * rng.random() * (1 - q)),
+    }
+
+
+def site_urls(rng: random.Random, domain: str, count: int) -> list[str]:
+    urls = [f"https://{domain}/"]
+    while len(urls) < count:
+        section = rng.choice(SECTIONS)
+        slug = "-".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+        urls.append(f"https://{domain}/{section}/{slug}-{len(urls)}")
+    return urls
+
+
+async def seed(
+    conn: asyncpg.Connection,
+    *,
+    sites: int,
+    first_site: int = 0,
+    pages_per_scan: int = 500,
+    scans_per_site: int = 12,
+    live_scans: int = 2,
+    history_days: int = 1095,
+    compact_ratio: float = 0.0,
+    seed_value: int = 1,
+) -> dict[str, int]:
+    """
+    Add sites first_site … sites-1 (so datasets can grow step by step) and
+    return the rows written per table.
+    """
+    rng = random.Random(seed_value * 1_000_003 + first_site)
+    now = datetime.utcnow().replace(microsecond=0)
+    buffer = CopyBuffer(conn)
+
+    for n in range(first_site, sites):
+        profile = SiteProfile(rng)
+        site_id = new_id()
+        domain = f"bench-{n}.example"
+        site_created = now - timedelta(days=history_days)
+        await buffer.add("Site", (
+            site_id, f"Bench site {n}", domain, f"tenant-{n % 97}", site_created, site_created,
+        ))
+
+        # Page count drifts a little between scans; URLs are stable so diffs match
+        size = max(1, min(int(rng.lognormvariate(math.log(pages_per_scan), 0.6)), pages_per_scan * 5))
+        urls = site_urls(rng, domain, int(size * 1.1) + 1)
+        for i in range(scans_per_site):
+            created = now - SCAN_INTERVAL * (scans_per_site - i)
+            live = i >= scans_per_site - live_scans
+            status = "COMPLETED" if live or rng.random() > 0.03 else "FAILED"
+            compact = live and rng.random() < compact_ratio
+            scan_id = new_id()
+            pages = rng.sample(urls, min(len(urls), max(1, int(size * rng.uniform(0.95, 1.05)))))
+            await buffer.add("ScanTask", (
+                scan_id, site_id, status, "CRAWL", compact, len(pages),
+                len(pages) if status == "COMPLETED" else rng.randint(0, len(pages)),
+                created, created + timedelta(minutes=rng.randint(2, 90)),
+                None if live else now, created, created,
+            ))
+            if live:
+                await _add_pages(buffer, rng, profile, scan_id, pages, compact, created)
+
+        # One sample a day, random-walking around the site's quality
+        level = 40 + 50 * profile.quality
+        for day in range(history_days):
+            level = min(100.0, max(0.0, level + rng.gauss(0, 0.8)))
+            await buffer.add("ScoreHistory", (
+                new_id(), site_id, round(level, 2), size,
+                site_created + timedelta(days=day, seconds=rng.randint(0, 86_399)),
+            ))
+
+    await buffer.flush()
+    return buffer.counts
+
+
+async def _add_pages(
+    buffer: CopyBuffer,
+    rng: random.Random,
+    profile: SiteProfile,
+    scan_id: str,
+    urls: list[str],
+    compact: bool,
+    crawled_at: datetime,
+) -> None:
+    pages = [page_data(rng, profile, url) for url in urls]
+    scored = score_pages_compact(pages) if compact else score_pages(pages)
+    for node_id, (page, result) in enumerate(zip(pages, scored)):
+        page_id = new_id()
+        if compact:
+            seo_score, issue_mask, issue_params = result
+            issues = ()
+        else:
+            seo_score, issues = result
+            issue_mask = issue_params = None
+        title, meta = page["title"], page["meta_description"]
+        await buffer.add("PageResult", (
+            page_id, scan_id, page["url"], page["http_status"],
+            title, len(title) if title else None, meta, len(meta) if meta else None,
+            page["h1_count"], page["h2_count"], page["h3_count"], page["h1_text"],
+            page["images_total"], page["images_missing_alt"], page["load_time_ms"],
+            seo_score, node_id, issue_mask,
+            json.dumps(issue_params) if issue_params is not None else None,
+            rng.paretovariate(2.5) / len(pages), int(rng.paretovariate(1.5)) - 1,
+            0 if node_id == 0 else rng.randint(1, 4), crawled_at,
+        ))
+        for issue in issues:
+            await buffer.add("SeoIssue", (
+                new_id(), page_id, issue.category, issue.code, issue.description,
+                issue.impact, crawled_at,
+            ))
+
+
+async def truncate(conn: asyncpg.Connection) -> None:
+    await conn.execute(
+        'TRUNCATE "Site", "ScanBatch", "ScanTask", "PageResult", "PageLink", '
+        '"SeoIssue", "AiSuggestion", "ScoreHistory", "ScanSchedule"'
+    )
+
+
+def dsn() -> str:
+    return settings.database_url.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+async def _main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sites", type=int, required=True)
+    parser.add_argument("--pages-per-scan", type=int, default=500, help="median; log-normal spread")
+    parser.add_argument("--scans-per-site", type=int, default=12)
+    parser.add_argument("--live-scans", type=int, default=2, help="newest scans that keep their rows")
+    parser.add_argument("--history-days", type=int, default=1095)
+    parser.add_argument("--compact-ratio", type=float, default=0.0,
+                        help="share of live scans using compact issue storage")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--truncate", action="store_true", help="empty all tables first")
+    args = parser.parse_args()
+
+    conn = await asyncpg.connect(dsn())
+    try:
+        if args.truncate:
+            await truncate(conn)
+        start = time.perf_counter()
+        counts = await seed(
+            conn,
+            sites=args.sites,
+            pages_per_scan=args.pages_per_scan,
+            scans_per_site=args.scans_per_site,
+            live_scans=args.live_scans,
+            history_days=args.history_days,
+            compact_ratio=args.compact_ratio,
+            seed_value=args.seed,
+        )
+        await conn.execute("ANALYZE")
+    finally:
+        await conn.close()
+
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    for table, count in counts.items():
+        print(f"{table:>14}: {count:>12,}")
+    print(f"{total:,} rows in {elapsed:.1f} s ({total / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,164 @@
+"""
+Serialization benchmark for the bulk list endpoints: CPU per 10k rows.
+
+    uv run python scripts/serialization_benchmark.py [--rows 10000] [--repeat 20]
+
+Serves the same synthetic rows two ways through a FastAPI app over httpx's
+ASGI transport, so routing and response machinery are included:
+
+  before  handler returns ORM objects / response models; FastAPI validates
+          each row through the response_model and encodes with stdlib json
+  after   handler returns utils.responses.fast_json_rows over column tuples
+          (orjson, no per-row validation), uncompressed and gzip/br encoded
+
+Rows are built before timing, so database time and ORM hydration (which the
+old path also paid for) are left out and the gap shown is conservative.
+Both paths must decode to identical JSON, or the script exits non-zero.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI, Request
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api.routes.scans import _RESULT_FIELDS  # noqa: E402
+from api.routes.sites import _ISSUE_FIELDS  # noqa: E402
+from models.orm import PageResult, SeoIssue  # noqa: E402
+from models.schemas import PageResultResponse, SeoIssueWithPageResponse  # noqa: E402
+from utils.responses import brotli, fast_json_rows  # noqa: E402
+
+PER_ROWS = 10_000
+
+
+def make_rows(count: int, rng: random.Random) -> tuple[list[tuple], list[tuple]]:
+    """Page rows in _RESULT_FIELDS order and issue rows in _ISSUE_FIELDS order."""
+    crawled = datetime(2025, 1, 1, 12, 0, 0, 123456)
+    pages, issues = [], []
+    for i in range(count):
+        title = "Example page title number %d about things" % i
+        weight = {
+            "ttfbMs": rng.randint(50, 900), "domContentLoadedMs": rng.randint(300, 3000),
+            "loadEventMs": rng.randint(500, 6000), "requestCount": rng.randint(10, 150),
+            "transferBytes": rng.randint(50_000, 5_000_000),
+            "byType": {"document": [1, 40_000], "script": [12, 900_000], "image": [20, 1_200_000]},
+            "renderBlocking": ["https://example.com/static/app.css"], "renderBlockingCount": 1,
+        }
+        page = {
+            "id": f"c{i:024x}", "scanTaskId": "cscan0000000000000000000000",
+            "url": f"https://example.com/section/page-{i}", "httpStatus": 200,
+            "title": title, "titleLength": len(title),
+            "metaDescription": "A description of the page " * 4, "metaDescLength": 104,
+            "h1Count": 1, "h2Count": rng.randint(0, 8), "h3Count": rng.randint(0, 12),
+            "h1Text": "Example heading", "imagesTotal": rng.randint(0, 30),
+            "imagesMissingAlt": rng.randint(0, 3), "loadTimeMs": rng.randint(200, 4000),
+            "pageWeight": weight, "seoScore": rng.randint(30, 100),
+            "pageRank": rng.random() / count, "inlinks": rng.randint(0, 50),
+            "clickDepth": rng.randint(0, 4), "crawledAt": crawled + timedelta(seconds=i),
+        }
+        pages.append(tuple(page[key] for key in _RESULT_FIELDS))
+        issue = {
+            "id": f"i{i:024x}", "pageResultId": page["id"], "pageUrl": page["url"],
+            "category": rng.choice(("CRITICAL", "WARNING")), "code": "MISSING_META_DESC",
+            "description": "Page is missing a meta description", "impact": 15,
+            "createdAt": page["crawledAt"],
+        }
+        issues.append(tuple(issue[key] for key in _ISSUE_FIELDS))
+    return pages, issues
+
+
+def build_app(pages: list[tuple], issues: list[tuple]) -> FastAPI:
+    # What the old handlers returned: ORM instances, and response models
+    # built from (SeoIssue, url) rows
+    page_objects = [PageResult(**dict(zip(_RESULT_FIELDS, row))) for row in pages]
+    issue_pairs = []
+    for row in issues:
+        fields = dict(zip(_ISSUE_FIELDS, row))
+        url = fields.pop("pageUrl")
+        issue_pairs.append((SeoIssue(**fields), url))
+
+    app = FastAPI()
+
+    @app.get("/before/results", response_model=list[PageResultResponse])
+    async def results_before():
+        return page_objects
+
+    @app.get("/after/results", response_model=list[PageResultResponse])
+    async def results_after(request: Request):
+        return fast_json_rows(request, _RESULT_FIELDS, pages)
+
+    @app.get("/before/issues", response_model=list[SeoIssueWithPageResponse])
+    async def issues_before():
+        return [
+            SeoIssueWithPageResponse(
+                id=issue.id,
+                pageResultId=issue.pageResultId,
+                pageUrl=url,
+                category=issue.category,
+                code=issue.code,
+                description=issue.description,
+                impact=issue.impact,
+                createdAt=issue.createdAt,
+            )
+            for issue, url in issue_pairs
+        ]
+
+    @app.get("/after/issues", response_model=list[SeoIssueWithPageResponse])
+    async def issues_after(request: Request):
+        return fast_json_rows(request, _ISSUE_FIELDS, issues)
+
+    return app
+
+
+async def measure(client: httpx.AsyncClient, path: str, encoding: str, repeat: int) -> tuple[float, int, bytes]:
+    """CPU seconds per request, wire size and decoded body."""
+    headers = {"Accept-Encoding": encoding}
+    response = await client.get(path, headers=headers)  # warm-up
+    response.raise_for_status()
+    start = time.process_time()
+    for _ in range(repeat):
+        await client.get(path, headers=headers)
+    cpu = (time.process_time() - start) / repeat
+    wire = int(response.headers.get("content-length", len(response.content)))
+    return cpu, wire, response.content
+
+
+async def _main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=PER_ROWS)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    pages, issues = make_rows(args.rows, random.Random(1))
+    app = build_app(pages, issues)
+    scale = PER_ROWS / args.rows
+    compressed = "br" if brotli is not None else "gzip"
+    ok = True
+
+    print(f"{'endpoint':<10} {'variant':<18} {'CPU ms/10k rows':>16} {'KB on wire':>11} {'speedup':>8}")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for name in ("results", "issues"):
+            base_cpu, base_wire, base_body = await measure(client, f"/before/{name}", "identity", args.repeat)
+            print(f"{name:<10} {'before (json)':<18} {base_cpu * 1000 * scale:>16.1f} {base_wire / 1024:>11.0f} {'':>8}")
+            for encoding in ("identity", compressed):
+                cpu, wire, body = await measure(client, f"/after/{name}", encoding, args.repeat)
+                label = f"after ({'orjson' if encoding == 'identity' else 'orjson+' + encoding})"
+                print(
+                    f"{name:<10} {label:<18} {cpu * 1000 * scale:>16.1f} "
+                    f"{wire / 1024:>11.0f} {base_cpu / cpu:>7.1f}x"
+                )
+                if json.loads(body) != json.loads(base_body):
+                    print(f"MISMATCH: {name} responses differ ({encoding})")
+                    ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main()))
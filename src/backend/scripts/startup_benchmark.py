@@ -0,0 +1,101 @@
+"""
+API startup benchmark: import time and RSS after booting `main`.
+
+    uv run python scripts/startup_benchmark.py [--import-budget-ms 1500] [--rss-budget-mb 150]
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter, reports
+the slowest top-level imports, measures resident memory once the app object
+exists, and checks that crawler/AI-only dependencies were not loaded.
+Exits non-zero when a budget is exceeded, so CI can gate on it.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Only the crawler / AI / archive code paths may load these
+LAZY_MODULES = ("playwright", "bs4", "lxml", "anthropic", "pyarrow", "numpy", "scipy", "httpx", "croniter")
+
+_RSS_PROBE = """
+import json, resource, sys
+import main
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":
+    rss_kb //= 1024
+print(json.dumps({
+    "rss_mb": rss_kb / 1024,
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+""" % (LAZY_MODULES,)
+
+
+def measure_import_time() -> tuple[float, list[tuple[str, float]]]:
+    """Cumulative import time of `main` in ms, plus its slowest direct children."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    total_ms = 0.0
+    children: list[tuple[str, float]] = []
+    pending: list[tuple[str, float]] = []  # depth-1 imports since the last top-level one
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, raw_name = line[len("import time:"):].split("|")
+        # One space after the bar, then two per nesting level
+        depth = (len(raw_name) - len(raw_name.lstrip()) - 1) // 2
+        cumulative_ms = int(cumulative) / 1000
+        name = raw_name.strip()
+        if depth == 1:
+            pending.append((name, cumulative_ms))
+        elif depth == 0:
+            # importtime prints children before their parent
+            if name == "main":
+                total_ms, children = cumulative_ms, pending
+            pending = []
+    children.sort(key=lambda item: item[1], reverse=True)
+    return total_ms, children
+
+
+def measure_rss() -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-c", _RSS_PROBE],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--import-budget-ms", type=float, default=1500)
+    parser.add_argument("--rss-budget-mb", type=float, default=150)
+    parser.add_argument("--runs", type=int, default=3, help="best-of-N import timing")
+    args = parser.parse_args()
+
+    runs = [measure_import_time() for _ in range(args.runs)]
+    import_ms, children = min(runs, key=lambda run: run[0])
+    probe = measure_rss()
+
+    print(f"import main: {import_ms:.0f} ms (best of {args.runs}, budget {args.import_budget_ms:.0f} ms)")
+    for name, ms in children[:10]:
+        print(f"  {ms:8.1f} ms  {name}")
+    print(f"RSS after boot: {probe['rss_mb']:.1f} MB (budget {args.rss_budget_mb:.0f} MB)")
+
+    failures = []
+    if import_ms > args.import_budget_ms:
+        failures.append(f"import time {import_ms:.0f} ms > {args.import_budget_ms:.0f} ms")
+    if probe["rss_mb"] > args.rss_budget_mb:
+        failures.append(f"RSS {probe['rss_mb']:.1f} MB > {args.rss_budget_mb:.0f} MB")
+    if probe["loaded"]:
+        failures.append(f"heavy modules imported at startup: {', '.join(probe['loaded'])}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,6 +5,7 @@ import anthropic
 
 from config import get_settings
 from models.orm import AiSuggestion, PageResult, SeoIssue
+from services.scoring import IssueResult
 
 settings = get_settings()
 
@@ -19,7 +20,7 @@ def _get_client() -> anthropic.AsyncAnthropic:
 
 
 async def generate_suggestions(
-    page: PageResult, issues: list[SeoIssue]
+    page: PageResult, issues: list[SeoIssue] | list[IssueResult]
 ) -> list[AiSuggestion]:
     """
     Call Claude API to generate actionable fix suggestions for each non-PASSED SEO issue.
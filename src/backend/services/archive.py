@@ -0,0 +1,208 @@
+import asyncio
+import json
+import logging
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from sqlalchemy import Boolean, DateTime, Enum, Float, Integer, delete, exists, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from config import get_settings
+from models.orm import AiSuggestion, PageLink, PageResult, ScanTask, SeoIssue
+from services.issues import compact_page_issues
+from services.scoring import issue_bits
+from utils.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+CHUNK_ROWS = 10_000
+
+
+def archive_path(scan: ScanTask) -> Path:
+    """archive_dir/<siteId>/<scanId>/ — one Parquet file per table."""
+    return Path(settings.archive_dir) / scan.siteId / scan.id
+
+
+async def archive_old_scans(db: AsyncSession) -> int:
+    """
+    Archive every finished scan older than the retention window, except each
+    site's latest completed scan (the dashboard reads it). Returns the count.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=settings.archive_after_days)
+    newer = aliased(ScanTask)
+    has_newer_completed = exists().where(
+        newer.siteId == ScanTask.siteId,
+        newer.status == "COMPLETED",
+        newer.createdAt > ScanTask.createdAt,
+    )
+    result = await db.execute(
+        select(ScanTask)
+        .where(
+            ScanTask.status.in_(("COMPLETED", "FAILED", "CANCELLED")),
+            ScanTask.archivedAt.is_(None),
+            ScanTask.completedAt < cutoff,
+            has_newer_completed,
+        )
+        .order_by(ScanTask.completedAt)
+    )
+    scans = result.scalars().all()
+    for scan in scans:
+        await archive_scan(db, scan)
+        await db.commit()
+        logger.info("Archived scan %s to %s", scan.id, archive_path(scan))
+    return len(scans)
+
+
+async def archive_scan(db: AsyncSession, scan: ScanTask) -> None:
+    """Write one scan's detail rows to Parquet, then delete them."""
+    target = archive_path(scan)
+    staging = target.with_name(f"{target.name}.tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+
+    page_ids = select(PageResult.id).where(PageResult.scanTaskId == scan.id)
+    await _write_parquet(db, staging / "pages.parquet", PageResult,
+                         PageResult.scanTaskId == scan.id)
+    await _write_parquet(db, staging / "issues.parquet", SeoIssue,
+                         SeoIssue.pageResultId.in_(page_ids))
+    await _write_parquet(db, staging / "suggestions.parquet", AiSuggestion,
+                         AiSuggestion.pageResultId.in_(page_ids))
+    await _write_parquet(db, staging / "links.parquet", PageLink,
+                         PageLink.scanTaskId == scan.id)
+
+    shutil.rmtree(target, ignore_errors=True)
+    staging.rename(target)
+
+    # SeoIssue / AiSuggestion rows go with their PageResult via ON DELETE CASCADE
+    await db.execute(delete(PageLink).where(PageLink.scanTaskId == scan.id))
+    await db.execute(delete(PageResult).where(PageResult.scanTaskId == scan.id))
+    scan.archivedAt = datetime.utcnow()
+
+
+async def _write_parquet(db: AsyncSession, path: Path, model, criterion) -> None:
+    """Stream rows through a server-side cursor so memory stays bounded."""
+    schema = _arrow_schema(model)
+    columns = list(model.__table__.columns)
+    # JSONB values are stored as their JSON text
+    is_json = [isinstance(c.type, JSONB) for c in columns]
+    query = select(*columns).where(criterion)
+    stream = await db.stream(query.execution_options(yield_per=CHUNK_ROWS))
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        async for rows in stream.partitions():
+            batch = pa.RecordBatch.from_arrays(
+                [
+                    pa.array(
+                        [None if v is None else json.dumps(v) for v in col] if is_json[i] else col,
+                        type=schema.field(i).type,
+                    )
+                    for i, col in enumerate(zip(*rows))
+                ],
+                schema=schema,
+            )
+            writer.write_batch(batch)
+
+
+def _arrow_schema(model) -> pa.Schema:
+    def arrow_type(column):
+        if isinstance(column.type, Integer):
+            return pa.int64()
+        if isinstance(column.type, Float):
+            return pa.float64()
+        if isinstance(column.type, Boolean):
+            return pa.bool_()
+        if isinstance(column.type, DateTime):
+            return pa.timestamp("us")
+        if isinstance(column.type, Enum):
+            return pa.dictionary(pa.int8(), pa.string())
+        return pa.string()
+
+    return pa.schema(
+        [pa.field(c.name, arrow_type(c), nullable=c.nullable) for c in model.__table__.columns]
+    )
+
+
+# ─── Read path ────────────────────────────────────────────────────────────────
+
+async def read_archived_pages(scan: ScanTask, issue_codes: list[str] | None = None) -> list[dict]:
+    """
+    Archived PageResult rows of a scan, lowest score first — optionally only
+    pages that have all of `issue_codes`. Parquet is read off the event loop.
+    """
+    return await asyncio.to_thread(
+        _read_pages, archive_path(scan), scan.compactIssues, issue_codes
+    )
+
+
+async def read_archived_page(scan: ScanTask, page_id: str) -> dict | None:
+    """One archived page with its issues and AI suggestions attached."""
+    return await asyncio.to_thread(_read_page, archive_path(scan), page_id)
+
+
+def _read_pages(folder: Path, compact: bool, issue_codes: list[str] | None) -> list[dict]:
+    # The issue filter goes into the Parquet read, so only matching pages
+    # are decoded: a mask test for compact scans, else the page ids that
+    # have every wanted code in issues.parquet
+    filters = None
+    if issue_codes and compact:
+        bits = pa.scalar(issue_bits(issue_codes), pa.int64())
+        filters = pc.equal(pc.bit_wise_and(pc.field("issueMask"), bits), bits)
+    elif issue_codes:
+        wanted = set(issue_codes)
+        row_codes: dict[str, set[str]] = {}
+        for issue in pq.read_table(
+            folder / "issues.parquet", columns=["pageResultId", "code"],
+            filters=[("code", "in", list(wanted))],
+        ).to_pylist():
+            row_codes.setdefault(issue["pageResultId"], set()).add(issue["code"])
+        page_ids = [page_id for page_id, codes in row_codes.items() if codes >= wanted]
+        if not page_ids:
+            return []
+        filters = [("id", "in", page_ids)]
+    pages = pq.read_table(folder / "pages.parquet", filters=filters).to_pylist()
+    return sorted((_decode_json(page) for page in pages), key=lambda row: row["seoScore"])
+
+
+def _read_page(folder: Path, page_id: str) -> dict | None:
+    rows = pq.read_table(folder / "pages.parquet", filters=[("id", "=", page_id)]).to_pylist()
+    if not rows:
+        return None
+    page = _decode_json(rows[0])
+    if page.get("issueMask") is not None:
+        page["issues"] = compact_page_issues(
+            page_id, page["crawledAt"], page["issueMask"], page["issueParams"]
+        )
+    else:
+        page["issues"] = pq.read_table(
+            folder / "issues.parquet", filters=[("pageResultId", "=", page_id)]
+        ).to_pylist()
+    page["aiSuggestions"] = pq.read_table(
+        folder / "suggestions.parquet", filters=[("pageResultId", "=", page_id)]
+    ).to_pylist()
+    return page
+
+
+def _decode_json(page: dict) -> dict:
+    """Parse the JSONB columns _write_parquet stored as text."""
+    for name in ("issueParams", "pageWeight"):
+        if page[name] is not None:
+            page[name] = json.loads(page[name])
+    return page
+
+
+# Run periodically, e.g. from cron:  python -m services.archive
+async def _main() -> None:
+    async with AsyncSessionLocal() as db:
+        count = await archive_old_scans(db)
+    logger.info("Archived %d scan(s)", count)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main())
@@ -0,0 +1,214 @@
+import csv
+import io
+import json
+import zlib
+from typing import AsyncIterator
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import case, func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+from models.orm import PageResult, SeoIssue
+from models.schemas import ExportFormat
+from services.issues import compact_issue_codes
+from utils.database import ReadSessionLocal
+
+CHUNK_ROWS = 5_000
+
+MEDIA_TYPES: dict[str, str] = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+_PAGE_COLUMNS = [
+    PageResult.id,
+    PageResult.url,
+    PageResult.httpStatus,
+    PageResult.title,
+    PageResult.titleLength,
+    PageResult.metaDescription,
+    PageResult.metaDescLength,
+    PageResult.h1Count,
+    PageResult.h2Count,
+    PageResult.h3Count,
+    PageResult.h1Text,
+    PageResult.imagesTotal,
+    PageResult.imagesMissingAlt,
+    PageResult.loadTimeMs,
+    PageResult.pageWeight["ttfbMs"].as_integer().label("ttfbMs"),
+    PageResult.pageWeight["requestCount"].as_integer().label("requestCount"),
+    PageResult.pageWeight["transferBytes"].as_integer().label("transferBytes"),
+    PageResult.seoScore,
+    PageResult.pageRank,
+    PageResult.inlinks,
+    PageResult.clickDepth,
+    PageResult.crawledAt,
+]
+
+_PARQUET_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("url", pa.string()),
+    ("httpStatus", pa.int32()),
+    ("title", pa.string()),
+    ("titleLength", pa.int32()),
+    ("metaDescription", pa.string()),
+    ("metaDescLength", pa.int32()),
+    ("h1Count", pa.int32()),
+    ("h2Count", pa.int32()),
+    ("h3Count", pa.int32()),
+    ("h1Text", pa.string()),
+    ("imagesTotal", pa.int32()),
+    ("imagesMissingAlt", pa.int32()),
+    ("loadTimeMs", pa.int32()),
+    ("ttfbMs", pa.int32()),
+    ("requestCount", pa.int32()),
+    ("transferBytes", pa.int64()),
+    ("seoScore", pa.int32()),
+    ("pageRank", pa.float64()),
+    ("inlinks", pa.int32()),
+    ("clickDepth", pa.int32()),
+    ("crawledAt", pa.timestamp("us")),
+    ("issueCodes", pa.list_(pa.string())),
+])
+
+FIELD_NAMES = _PARQUET_SCHEMA.names
+
+
+async def stream_scan_export(
+    scan_id: str, fmt: ExportFormat, compress: bool = False
+) -> AsyncIterator[bytes]:
+    """
+    Yield a scan's pages, each with its non-PASSED issue codes, as CSV, JSONL
+    or Parquet bytes. Rows come from a server-side cursor in CHUNK_ROWS
+    batches, so memory use does not grow with the size of the scan.
+    Opens its own session because it outlives the request handler.
+    """
+    encoder = {"csv": _CsvEncoder, "jsonl": _JsonlEncoder, "parquet": _ParquetEncoder}[fmt]()
+    gzip = zlib.compressobj(wbits=zlib.MAX_WBITS | 16) if compress else None
+
+    def emit(data: bytes) -> bytes:
+        return gzip.compress(data) if gzip else data
+
+    # Correlated subquery rather than JOIN + GROUP BY so the first rows stream
+    # out immediately instead of waiting for a full aggregate.
+    # Compact-storage pages read their codes from issueParams instead.
+    issue_codes = case(
+        (PageResult.issueMask.is_not(None), compact_issue_codes(order_by_impact=True)),
+        else_=(
+            select(func.array_agg(aggregate_order_by(SeoIssue.code, SeoIssue.impact.desc())))
+            .where(SeoIssue.pageResultId == PageResult.id, SeoIssue.category != "PASSED")
+            .scalar_subquery()
+        ),
+    )
+    query = (
+        select(*_PAGE_COLUMNS, issue_codes.label("issueCodes"))
+        .where(PageResult.scanTaskId == scan_id)
+        .order_by(PageResult.url)
+        .execution_options(yield_per=CHUNK_ROWS)
+    )
+
+    async with ReadSessionLocal() as db:
+        header = encoder.header()
+        if header:
+            yield emit(header)
+        stream = await db.stream(query)
+        async for rows in stream.partitions():
+            chunk = emit(encoder.encode(rows))
+            if chunk:
+                yield chunk
+
+    tail = encoder.finish()
+    if gzip:
+        tail = gzip.compress(tail) + gzip.flush()
+    if tail:
+        yield tail
+
+
+class _CsvEncoder:
+    def __init__(self) -> None:
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def _drain(self) -> bytes:
+        data = self._buffer.getvalue().encode("utf-8")
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def header(self) -> bytes:
+        self._writer.writerow(FIELD_NAMES)
+        return self._drain()
+
+    def encode(self, rows) -> bytes:
+        for row in rows:
+            *values, codes = row
+            self._writer.writerow([*values, ";".join(codes or ())])
+        return self._drain()
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class _JsonlEncoder:
+    def header(self) -> bytes:
+        return b""
+
+    def encode(self, rows) -> bytes:
+        lines = []
+        for row in rows:
+            record = dict(zip(FIELD_NAMES, row))
+            record["crawledAt"] = record["crawledAt"].isoformat()
+            record["issueCodes"] = record["issueCodes"] or []
+            lines.append(json.dumps(record, ensure_ascii=False))
+        return ("\n".join(lines) + "\n").encode("utf-8") if lines else b""
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class _ParquetEncoder:
+    """Writes one row group per chunk into a sink that is drained after each write."""
+
+    def __init__(self) -> None:
+        self._sink = _DrainableSink()
+        self._writer = pq.ParquetWriter(self._sink, _PARQUET_SCHEMA, compression="zstd")
+
+    def header(self) -> bytes:
+        return self._sink.drain()
+
+    def encode(self, rows) -> bytes:
+        columns = list(zip(*rows))
+        batch = pa.RecordBatch.from_arrays(
+            [pa.array(col, type=field.type) for col, field in zip(columns, _PARQUET_SCHEMA)],
+            schema=_PARQUET_SCHEMA,
+        )
+        self._writer.write_batch(batch)
+        return self._sink.drain()
+
+    def finish(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+class _DrainableSink(io.RawIOBase):
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
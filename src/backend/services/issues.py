@@ -0,0 +1,47 @@
+from datetime import datetime
+
+from sqlalchemy import Integer, String, column, func, literal_column, select
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, aggregate_order_by
+
+from models.orm import PageResult
+from services.scoring import decode_issues
+
+_entries = func.jsonb_each(PageResult.issueParams).table_valued(
+    column("key", String), column("value", JSONB)
+)
+
+
+def compact_page_issues(
+    page_id: str, crawled_at: datetime, mask: int, params: dict | None
+) -> list[dict]:
+    """
+    SeoIssue-shaped dicts for a page using compact issue storage. Ids are
+    synthetic (<pageId>:<code>) and createdAt is the crawl time.
+    """
+    return [
+        {
+            "id": f"{page_id}:{issue.code}",
+            "pageResultId": page_id,
+            "category": issue.category,
+            "code": issue.code,
+            "description": issue.description,
+            "impact": issue.impact,
+            "createdAt": crawled_at,
+        }
+        for issue in decode_issues(mask, params)
+    ]
+
+
+def compact_issue_codes(order_by_impact: bool = False):
+    """
+    Correlated scalar subquery: a compact page's non-PASSED issue codes as an
+    array — sorted by code, or by impact descending. Empty when clean.
+    """
+    impact = _entries.c.value[0].astext.cast(Integer)
+    ordering = (impact.desc(), _entries.c.key) if order_by_impact else (_entries.c.key,)
+    return func.coalesce(
+        select(func.array_agg(aggregate_order_by(_entries.c.key, *ordering)))
+        .scalar_subquery(),
+        literal_column("'{}'::varchar[]"),
+        type_=ARRAY(String),
+    )
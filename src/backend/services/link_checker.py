@@ -0,0 +1,123 @@
+import asyncio
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from urllib.parse import urlparse
+
+import httpx
+
+from config import get_settings
+
+settings = get_settings()
+
+CACHE_MAX_ENTRIES = 100_000
+USER_AGENT = "SEO-Analyzer-LinkChecker/0.1"
+# Statuses that say "try later" rather than anything about the link itself
+TRANSIENT_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+@dataclass(frozen=True)
+class LinkStatus:
+    url: str
+    http_status: int | None  # None when the request failed outright
+    error: str | None = None
+    transient: bool = False  # never cached or reported; the next scan checks again
+
+    @property
+    def is_broken(self) -> bool:
+        # A timeout, dropped connection, 429 or 5xx says nothing about the link
+        if self.transient:
+            return False
+        return self.http_status is None or self.http_status >= 400
+
+
+# url → (checked_at monotonic seconds, status); shared by every scan in-process
+_cache: OrderedDict[str, tuple[float, LinkStatus]] = OrderedDict()
+
+
+def _cache_get(url: str) -> LinkStatus | None:
+    entry = _cache.get(url)
+    if entry is None:
+        return None
+    checked_at, status = entry
+    if time.monotonic() - checked_at > settings.link_check_cache_ttl_seconds:
+        del _cache[url]
+        return None
+    _cache.move_to_end(url)
+    return status
+
+
+def _cache_put(status: LinkStatus) -> None:
+    _cache[status.url] = (time.monotonic(), status)
+    _cache.move_to_end(status.url)
+    while len(_cache) > CACHE_MAX_ENTRIES:
+        _cache.popitem(last=False)
+
+
+async def check_links(urls: set[str]) -> dict[str, LinkStatus]:
+    """
+    Check each URL once with a pooled HTTP client and return its status.
+    Uses HEAD first and falls back to GET when HEAD is rejected. Concurrency is
+    capped globally and per host; fresh results are served from the TTL cache.
+    """
+    results: dict[str, LinkStatus] = {}
+    pending: list[str] = []
+    for url in urls:
+        cached = _cache_get(url)
+        if cached is not None:
+            results[url] = cached
+        else:
+            pending.append(url)
+
+    if not pending:
+        return results
+
+    host_limits: dict[str, asyncio.Semaphore] = defaultdict(
+        lambda: asyncio.Semaphore(settings.link_check_per_host)
+    )
+    global_limit = asyncio.Semaphore(settings.link_check_concurrency)
+    limits = httpx.Limits(
+        max_connections=settings.link_check_concurrency,
+        max_keepalive_connections=settings.link_check_concurrency,
+    )
+
+    async with httpx.AsyncClient(
+        limits=limits,
+        timeout=settings.link_check_timeout_seconds,
+        follow_redirects=True,
+        headers={"User-Agent": USER_AGENT},
+    ) as client:
+
+        async def _check(url: str) -> None:
+            async with global_limit, host_limits[urlparse(url).netloc]:
+                status = await _fetch_status(client, url)
+            if not status.transient:
+                _cache_put(status)
+            results[url] = status
+
+        await asyncio.gather(*(_check(url) for url in pending))
+
+    return results
+
+
+async def _fetch_status(client: httpx.AsyncClient, url: str) -> LinkStatus:
+    try:
+        response = await client.head(url)
+        if response.status_code < 400:
+            return LinkStatus(url=url, http_status=response.status_code)
+        # Plenty of servers reject HEAD outright — confirm with a GET whose
+        # body is never read.
+        async with client.stream("GET", url) as response:
+            return LinkStatus(
+                url=url,
+                http_status=response.status_code,
+                transient=response.status_code in TRANSIENT_STATUSES,
+            )
+    except (httpx.TimeoutException, httpx.NetworkError) as exc:
+        return LinkStatus(url=url, http_status=None, error=type(exc).__name__, transient=True)
+    except httpx.HTTPError as exc:
+        return LinkStatus(url=url, http_status=None, error=type(exc).__name__)
+    except (httpx.InvalidURL, ValueError) as exc:
+        # Hrefs that httpx can't even turn into a request (bad port, stray
+        # characters, IDNA failures) are broken links, not crawler errors
+        return LinkStatus(url=url, http_status=None, error=type(exc).__name__)
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable
+
+import asyncpg
+
+from config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+MessageHandler = Callable[[str, dict], Awaitable[None]]
+
+CHANNEL = "seo_scan_events"
+RECONNECT_DELAY_SECONDS = 2
+
+
+class PubSubBackend:
+    """
+    Carries scan events between processes. Publishers call `publish`; each
+    process registers one handler via `start` and fans messages out locally.
+    """
+
+    async def start(self, handler: MessageHandler) -> None:
+        raise NotImplementedError
+
+    async def publish(self, scan_id: str, message: dict) -> None:
+        raise NotImplementedError
+
+    async def stop(self) -> None:
+        pass
+
+
+class InMemoryBackend(PubSubBackend):
+    """Single-process delivery — the handler is called directly."""
+
+    def __init__(self) -> None:
+        self._handler: MessageHandler | None = None
+
+    async def start(self, handler: MessageHandler) -> None:
+        self._handler = handler
+
+    async def publish(self, scan_id: str, message: dict) -> None:
+        if self._handler is not None:
+            await self._handler(scan_id, message)
+
+
+class PostgresBackend(PubSubBackend):
+    """
+    Postgres LISTEN/NOTIFY. One listening connection per process, plus one
+    connection for NOTIFY opened lazily so crawler-only processes can publish
+    without subscribing. A process receives its own notifications, so local
+    delivery always goes through the listener; a single pump task hands them
+    to the handler in arrival order.
+    """
+
+    def __init__(self, dsn: str) -> None:
+        self._dsn = dsn
+        self._handler: MessageHandler | None = None
+        self._listen_conn: asyncpg.Connection | None = None
+        self._notify_conn: asyncpg.Connection | None = None
+        self._notify_lock = asyncio.Lock()
+        self._queue: asyncio.Queue[tuple[str, dict]] = asyncio.Queue()
+        self._pump_task: asyncio.Task | None = None
+        self._reconnect_task: asyncio.Task | None = None
+        self._stopping = False
+
+    async def start(self, handler: MessageHandler) -> None:
+        self._handler = handler
+        self._stopping = False
+        await self._listen()
+        self._pump_task = asyncio.create_task(self._pump())
+
+    async def _pump(self) -> None:
+        while True:
+            scan_id, message = await self._queue.get()
+            try:
+                await self._handler(scan_id, message)
+            except Exception:
+                logger.exception("Pub/sub handler failed for scan %s", scan_id)
+
+    async def _listen(self) -> None:
+        conn = await asyncpg.connect(self._dsn)
+        conn.add_termination_listener(self._on_terminated)
+        await conn.add_listener(CHANNEL, self._on_notify)
+        self._listen_conn = conn
+
+    def _on_notify(self, conn, pid, channel, payload: str) -> None:
+        try:
+            envelope = json.loads(payload)
+        except json.JSONDecodeError:
+            logger.warning("Dropping malformed pub/sub payload")
+            return
+        self._queue.put_nowait((envelope["scanId"], envelope["message"]))
+
+    def _on_terminated(self, conn) -> None:
+        if not self._stopping and self._reconnect_task is None:
+            self._reconnect_task = asyncio.ensure_future(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        try:
+            while not self._stopping:
+                try:
+                    await self._listen()
+                    logger.info("Pub/sub listener reconnected")
+                    return
+                except (OSError, asyncpg.PostgresError) as exc:
+                    logger.warning("Pub/sub listener reconnect failed: %s", exc)
+                    await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+        finally:
+            self._reconnect_task = None
+
+    async def publish(self, scan_id: str, message: dict) -> None:
+        payload = json.dumps({"scanId": scan_id, "message": message})
+        async with self._notify_lock:
+            if self._notify_conn is None or self._notify_conn.is_closed():
+                self._notify_conn = await asyncpg.connect(self._dsn)
+            await self._notify_conn.execute("SELECT pg_notify($1, $2)", CHANNEL, payload)
+
+    async def stop(self) -> None:
+        self._stopping = True
+        for task in (self._reconnect_task, self._pump_task):
+            if task is not None:
+                task.cancel()
+        for conn in (self._listen_conn, self._notify_conn):
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+        self._listen_conn = self._notify_conn = None
+
+
+def create_backend() -> PubSubBackend:
+    if settings.ws_pubsub_backend == "postgres":
+        dsn = settings.database_url.replace("postgresql+asyncpg://", "postgresql://", 1)
+        return PostgresBackend(dsn)
+    return InMemoryBackend()
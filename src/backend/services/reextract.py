@@ -0,0 +1,184 @@
+import argparse
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import delete, func, insert, select, update
+
+from crawler.extract import extract_page
+from crawler.page_weight import unpack_page_weight
+from models.orm import PageResult, SeoIssue
+from services.scoring import IssueResult, issue_bits, score_pages, score_pages_compact
+from services.snapshots import load_snapshot
+from utils.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+CHUNK_ROWS = 2_000
+TASK_ROWS = 50  # pages per worker call, to amortize pickling overhead
+
+# Added by the crawl-time link check, which re-extraction can't redo
+LINK_ISSUE_CODES = ("BROKEN_INTERNAL_LINKS", "BROKEN_EXTERNAL_LINKS")
+
+# id, htmlHash, url, httpStatus, loadTimeMs, compact, issueParams (None unless
+# compact), pageWeight
+Row = tuple[str, str, str, int, int, bool, dict | None, dict | None]
+# id, page fields, seoScore, SeoIssue results (None if compact), issueMask, issueParams
+Result = tuple[str, dict, int, list[IssueResult] | None, int | None, dict | None]
+
+
+def _reextract_rows(rows: list[Row]) -> list[Result]:
+    """Worker: rerun extraction and scoring over stored snapshots, no network."""
+    loaded: list[tuple[Row, dict]] = []
+    for row in rows:
+        page_id, html_hash, url, http_status, load_time_ms, compact, old_params, weight = row
+        html = load_snapshot(html_hash)
+        if html is None:
+            continue  # pruned since the query ran
+        loaded.append((row, {
+            "http_status": http_status,
+            "load_time_ms": load_time_ms,
+            **unpack_page_weight(weight),
+            **extract_page(html, url, base_host="", extract_links=False),
+        }))
+
+    by_rows = [(row, data) for row, data in loaded if not row[5]]
+    by_mask = [(row, data) for row, data in loaded if row[5]]
+    results: list[Result] = []
+    for (row, data), (seo_score, issues) in zip(by_rows, score_pages([d for _, d in by_rows])):
+        results.append((row[0], _page_fields(data), seo_score, issues, None, None))
+    for (row, data), (seo_score, mask, params) in zip(
+        by_mask, score_pages_compact([d for _, d in by_mask])
+    ):
+        old_params = row[6] or {}
+        kept = {code: old_params[code] for code in LINK_ISSUE_CODES if code in old_params}
+        if kept:
+            seo_score = max(0, seo_score - sum(entry[0] for entry in kept.values()))
+            mask |= issue_bits(kept)
+            params = {**(params or {}), **kept}
+        results.append((row[0], _page_fields(data), seo_score, None, mask, params))
+    return results
+
+
+def _page_fields(data: dict) -> dict:
+    return {
+        "title": data["title"],
+        "titleLength": len(data["title"]) if data["title"] else None,
+        "metaDescription": data["meta_description"],
+        "metaDescLength": (
+            len(data["meta_description"]) if data["meta_description"] else None
+        ),
+        "h1Count": data["h1_count"],
+        "h2Count": data["h2_count"],
+        "h3Count": data["h3_count"],
+        "h1Text": data["h1_text"],
+        "imagesTotal": data["images_total"],
+        "imagesMissingAlt": data["images_missing_alt"],
+    }
+
+
+async def reextract_pages(scan_ids: list[str] | None = None, workers: int | None = None) -> int:
+    """
+    Re-run the extractor and scorer over the stored HTML of every live page
+    (optionally only those of `scan_ids`) and rewrite its fields, seoScore and
+    issues. Broken-link issues from the original crawl are kept and still
+    count against the score. ScoreHistory is left as recorded. Returns the
+    number of pages updated.
+    """
+    query = (
+        select(PageResult.id, PageResult.htmlHash, PageResult.url,
+               PageResult.httpStatus, PageResult.loadTimeMs,
+               PageResult.issueMask.is_not(None), PageResult.issueParams,
+               PageResult.pageWeight)
+        .where(PageResult.htmlHash.is_not(None))  # archived pages aren't in the table
+        .order_by(PageResult.id)
+        .execution_options(yield_per=CHUNK_ROWS)
+    )
+    if scan_ids:
+        query = query.where(PageResult.scanTaskId.in_(scan_ids))
+
+    loop = asyncio.get_running_loop()
+    updated = 0
+    # The read cursor and the writes need separate connections
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        async with AsyncSessionLocal() as reader, AsyncSessionLocal() as writer:
+            stream = await reader.stream(query)
+            async for rows in stream.partitions():
+                rows = [tuple(row) for row in rows]
+                parts = await asyncio.gather(*(
+                    loop.run_in_executor(pool, _reextract_rows, rows[i:i + TASK_ROWS])
+                    for i in range(0, len(rows), TASK_ROWS)
+                ))
+                results = [result for part in parts for result in part]
+                if results:
+                    await _write_results(writer, results)
+                    await writer.commit()
+                    updated += len(results)
+                    logger.info("Re-extracted %d page(s)", updated)
+    return updated
+
+
+async def _write_results(db, results: list[Result]) -> None:
+    row_page_ids = [page_id for page_id, _, _, issues, *_ in results if issues is not None]
+    link_deductions = dict((await db.execute(
+        select(SeoIssue.pageResultId, func.sum(SeoIssue.impact))
+        .where(SeoIssue.pageResultId.in_(row_page_ids), SeoIssue.code.in_(LINK_ISSUE_CODES))
+        .group_by(SeoIssue.pageResultId)
+    )).all()) if row_page_ids else {}
+
+    page_rows: list[dict] = []
+    compact_rows: list[dict] = []
+    issue_rows: list[dict] = []
+    for page_id, fields, seo_score, issues, issue_mask, issue_params in results:
+        if issues is None:
+            # Compact storage; link issues were already carried over by the worker
+            compact_rows.append({
+                "id": page_id, "seoScore": seo_score, **fields,
+                "issueMask": issue_mask, "issueParams": issue_params,
+            })
+            continue
+        deduction = link_deductions.get(page_id)
+        if deduction is not None:
+            seo_score = max(0, seo_score - deduction)
+            issues = [issue for issue in issues if issue.code != "ALL_PASSED"]
+        page_rows.append({"id": page_id, "seoScore": seo_score, **fields})
+        issue_rows.extend(
+            {
+                "pageResultId": page_id,
+                "category": issue.category,
+                "code": issue.code,
+                "description": issue.description,
+                "impact": issue.impact,
+            }
+            for issue in issues
+        )
+
+    # Separate executemany batches: the two kinds update different columns
+    for rows in (page_rows, compact_rows):
+        if rows:
+            await db.execute(update(PageResult), rows)
+    if row_page_ids:
+        await db.execute(
+            delete(SeoIssue).where(
+                SeoIssue.pageResultId.in_(row_page_ids),
+                SeoIssue.code.not_in(LINK_ISSUE_CODES),
+            )
+        )
+    if issue_rows:
+        await db.execute(insert(SeoIssue), issue_rows)
+
+
+# After changing extraction or scoring:  python -m services.reextract [--scan ID ...]
+async def _main() -> None:
+    parser = argparse.ArgumentParser(description="Re-score stored HTML snapshots offline")
+    parser.add_argument("--scan", action="append", dest="scan_ids", help="limit to a scan id")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes")
+    args = parser.parse_args()
+    count = await reextract_pages(args.scan_ids, args.workers)
+    logger.info("Re-extracted %d page(s) in total", count)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main())
@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import random
+import zlib
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import get_settings
+from models.orm import ScanSchedule, ScanTask, Site
+from utils.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+ACTIVE_STATUSES = ("PENDING", "RUNNING")
+# pg advisory lock key held for the length of a tick ("SCHD" in ASCII)
+TICK_LOCK_KEY = 0x53434844
+
+
+def first_run_at(schedule: ScanSchedule, now: datetime) -> datetime:
+    """
+    Initial run time for a new or edited schedule. Interval schedules get a
+    stable per-site phase offset so sites sharing an interval spread out
+    across it instead of all firing together.
+    """
+    if schedule.cron:
+        return next_run_at(schedule, now)
+    interval = schedule.intervalMinutes * 60
+    phase = zlib.crc32(schedule.siteId.encode()) % interval
+    return now + timedelta(seconds=phase)
+
+
+def next_run_at(schedule: ScanSchedule, after: datetime) -> datetime:
+    """Next cron/interval fire time after `after`, plus random jitter."""
+    if schedule.cron:
+        from croniter import croniter  # loaded lazily, off the startup path
+
+        base = croniter(schedule.cron, after).get_next(datetime)
+    else:
+        base = after + timedelta(minutes=schedule.intervalMinutes)
+    jitter = random.uniform(0, schedule.jitterSeconds) if schedule.jitterSeconds else 0
+    return base + timedelta(seconds=jitter)
+
+
+class ScanScheduler:
+    """
+    Periodically starts scans for due ScanSchedules.
+
+    Every tick first takes a transaction-scoped advisory lock, so when several
+    API workers run the scheduler only one ticks at a time and the capacity
+    counts it reads can't be raced by another worker's launches; a worker
+    that finds the lock taken skips that tick. It then claims due schedules,
+    skips sites whose previous scan is still active, and starts at most as
+    many scans as the global and per-tenant concurrency caps allow. Schedules
+    left over because of a cap stay due and are picked up on a later tick.
+    Scans left PENDING or RUNNING by a worker that crashed or restarted are
+    failed once older than scheduler_stale_scan_seconds, so they don't hold
+    their site or a concurrency slot forever.
+    """
+
+    def __init__(self) -> None:
+        self._task: asyncio.Task | None = None
+        self._running: set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await self.tick(db)
+            except Exception:
+                logger.exception("Scan scheduler tick failed")
+            await asyncio.sleep(settings.scheduler_tick_seconds)
+
+    async def tick(self, db: AsyncSession) -> int:
+        """Start every due scan the caps allow. Returns how many were started."""
+        now = datetime.utcnow()
+
+        # Released on commit/rollback; counts below are read under it
+        if not await db.scalar(select(func.pg_try_advisory_xact_lock(TICK_LOCK_KEY))):
+            return 0
+        await self._fail_stale_scans(db, now)
+
+        active_total = await db.scalar(
+            select(func.count()).select_from(ScanTask).where(ScanTask.status.in_(ACTIVE_STATUSES))
+        )
+        capacity = settings.max_concurrent_scans - active_total
+        if capacity <= 0:
+            await db.commit()  # keep any stale scans just failed
+            return 0
+
+        tenant_key = func.coalesce(Site.tenantId, Site.id)
+        active_by_tenant: dict[str, int] = dict((await db.execute(
+            select(tenant_key, func.count())
+            .join(ScanTask, ScanTask.siteId == Site.id)
+            .where(ScanTask.status.in_(ACTIVE_STATUSES))
+            .group_by(tenant_key)
+        )).all())
+        busy_sites = set((await db.execute(
+            select(ScanTask.siteId).where(ScanTask.status.in_(ACTIVE_STATUSES)).distinct()
+        )).scalars())
+
+        due = (await db.execute(
+            select(ScanSchedule, Site)
+            .join(Site, Site.id == ScanSchedule.siteId)
+            .where(ScanSchedule.enabled.is_(True), ScanSchedule.nextRunAt <= now)
+            .order_by(ScanSchedule.nextRunAt)
+            .with_for_update(of=ScanSchedule, skip_locked=True)
+        )).all()
+
+        launches: list[tuple[str, str, str]] = []
+        for schedule, site in due:
+            if schedule.siteId in busy_sites:
+                logger.info("Skipping scheduled scan for site %s: previous scan still active", site.id)
+                schedule.nextRunAt = next_run_at(schedule, now)
+                continue
+
+            tenant = site.tenantId or site.id
+            if capacity <= 0 or active_by_tenant.get(tenant, 0) >= settings.max_concurrent_scans_per_tenant:
+                continue  # stays due; retried next tick
+
+            scan = ScanTask(siteId=site.id, status="PENDING", mode=schedule.mode)
+            db.add(scan)
+            await db.flush()
+            launches.append((scan.id, site.domain, schedule.mode))
+
+            schedule.lastRunAt = now
+            schedule.nextRunAt = next_run_at(schedule, now)
+            busy_sites.add(site.id)
+            active_by_tenant[tenant] = active_by_tenant.get(tenant, 0) + 1
+            capacity -= 1
+
+        await db.commit()
+
+        # Launch only after commit so the crawler sees its ScanTask row.
+        # Imported here so API workers don't load Playwright at startup.
+        from crawler import run_crawler, run_sample
+
+        for scan_id, domain, mode in launches:
+            run = run_sample if mode == "SAMPLE" else run_crawler
+            task = asyncio.create_task(run(scan_id, domain))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+        return len(launches)
+
+    async def _fail_stale_scans(self, db: AsyncSession, now: datetime) -> None:
+        if not settings.scheduler_stale_scan_seconds:
+            return
+        cutoff = now - timedelta(seconds=settings.scheduler_stale_scan_seconds)
+        stale = (await db.scalars(
+            update(ScanTask)
+            .where(
+                ScanTask.status.in_(ACTIVE_STATUSES),
+                func.coalesce(ScanTask.startedAt, ScanTask.createdAt) < cutoff,
+            )
+            .values(status="FAILED", completedAt=now)
+            .returning(ScanTask.id)
+        )).all()
+        for scan_id in stale:
+            logger.warning("Failing stale scan %s: active for over %ss",
+                           scan_id, settings.scheduler_stale_scan_seconds)
+
+
+scheduler = ScanScheduler()
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
-from typing import Literal
+from string import Formatter
+from typing import Any, Callable, Iterable, Literal, Mapping
 
 IssueCategory = Literal["CRITICAL", "WARNING", "PASSED"]
 
@@ -18,6 +19,14 @@ DEDUCTIONS: dict[str, int] = {
     "IMAGE_MISSING_ALT_MAX": 20,
     "LOAD_TIME_SLOW": 10,
     "LOAD_TIME_VERY_SLOW": 20,
+    "PAGE_WEIGHT_HEAVY": 5,
+    "PAGE_WEIGHT_VERY_HEAVY": 15,
+    "TOO_MANY_REQUESTS": 5,
+    "SLOW_TTFB": 5,
+    "RENDER_BLOCKING": 5,
+    "BROKEN_INTERNAL_LINK": 5,
+    "BROKEN_EXTERNAL_LINK": 2,
+    "BROKEN_LINKS_MAX": 20,
 }
 
 THRESHOLDS: dict[str, int] = {
@@ -25,6 +34,11 @@ THRESHOLDS: dict[str, int] = {
     "META_DESC_MAX_LENGTH": 160,
     "LOAD_TIME_SLOW_MS": 3000,
     "LOAD_TIME_VERY_SLOW_MS": 5000,
+    "PAGE_WEIGHT_HEAVY_KB": 3000,
+    "PAGE_WEIGHT_VERY_HEAVY_KB": 6000,
+    "MAX_REQUESTS": 100,
+    "TTFB_SLOW_MS": 800,
+    "RENDER_BLOCKING_MAX": 2,
 }
 
 
@@ -36,142 +50,366 @@ class IssueResult:
     category: IssueCategory
 
 
-def score_page(
-    http_status: int,
-    title: str | None,
-    meta_description: str | None,
-    h1_count: int,
-    images_missing_alt: int,
-    load_time_ms: int | None,
-) -> tuple[int, list[IssueResult]]:
+# ─── Rule registry ────────────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    One page check. `when` and `deduction` are Python expressions over the
+    declared `fields` (keys of the crawler's page dict, None when absent) and
+    the DEDUCTIONS / THRESHOLDS names; `message` is an f-string body over the
+    same names. `bit` is the issue's permanent position in compact issue
+    masks. Consecutive rules sharing a `group` are exclusive — the first that
+    fires wins, like an if/elif chain.
+    """
+    code: str
+    fields: tuple[str, ...]
+    when: str
+    deduction: str
+    category: IssueCategory
+    message: str
+    bit: int
+    group: str | None = None
+
+
+RULES: list[Rule] = [
+    Rule("STATUS_ERROR", ("http_status",),
+         when="http_status >= 400",
+         deduction="STATUS_4XX_5XX",
+         category="CRITICAL",
+         message="Page returned HTTP {http_status}",
+         bit=0),
+    Rule("MISSING_TITLE", ("title",),
+         when="not title",
+         deduction="MISSING_TITLE",
+         category="CRITICAL",
+         message="Page is missing a <title> tag",
+         bit=1,
+         group="title"),
+    Rule("TITLE_TOO_LONG", ("title",),
+         when="len(title) > TITLE_MAX_LENGTH",
+         deduction="TITLE_TOO_LONG",
+         category="WARNING",
+         message="Title is {len(title)} chars (max {TITLE_MAX_LENGTH})",
+         bit=2,
+         group="title"),
+    Rule("MISSING_META_DESC", ("meta_description",),
+         when="not meta_description",
+         deduction="MISSING_META_DESC",
+         category="WARNING",
+         message="Page is missing a meta description",
+         bit=3,
+         group="meta_description"),
+    Rule("META_DESC_TOO_LONG", ("meta_description",),
+         when="len(meta_description) > META_DESC_MAX_LENGTH",
+         deduction="META_DESC_TOO_LONG",
+         category="WARNING",
+         message="Meta description is {len(meta_description)} chars (max {META_DESC_MAX_LENGTH})",
+         bit=4,
+         group="meta_description"),
+    Rule("MISSING_H1", ("h1_count",),
+         when="h1_count == 0",
+         deduction="MISSING_H1",
+         category="CRITICAL",
+         message="Page is missing an H1 tag",
+         bit=5,
+         group="h1"),
+    Rule("MULTIPLE_H1", ("h1_count",),
+         when="h1_count > 1",
+         deduction="MULTIPLE_H1",
+         category="WARNING",
+         message="Page has {h1_count} H1 tags (should have exactly 1)",
+         bit=6,
+         group="h1"),
+    Rule("IMAGES_MISSING_ALT", ("images_missing_alt",),
+         when="images_missing_alt > 0",
+         deduction="min(images_missing_alt * IMAGE_MISSING_ALT, IMAGE_MISSING_ALT_MAX)",
+         category="WARNING",
+         message="{images_missing_alt} image(s) are missing alt text",
+         bit=7),
+    Rule("LOAD_TIME_VERY_SLOW", ("load_time_ms",),
+         when="load_time_ms is not None and load_time_ms > LOAD_TIME_VERY_SLOW_MS",
+         deduction="LOAD_TIME_VERY_SLOW",
+         category="CRITICAL",
+         message="Page load time is {load_time_ms}ms (very slow, >{LOAD_TIME_VERY_SLOW_MS}ms)",
+         bit=8,
+         group="load_time"),
+    Rule("LOAD_TIME_SLOW", ("load_time_ms",),
+         when="load_time_ms is not None and load_time_ms > LOAD_TIME_SLOW_MS",
+         deduction="LOAD_TIME_SLOW",
+         category="WARNING",
+         message="Page load time is {load_time_ms}ms (slow, >{LOAD_TIME_SLOW_MS}ms)",
+         bit=9,
+         group="load_time"),
+    # Bits 10 and 11 are the broken-link issues (ISSUE_CATALOG)
+    Rule("PAGE_VERY_HEAVY", ("transfer_bytes",),
+         when="transfer_bytes is not None and transfer_bytes > PAGE_WEIGHT_VERY_HEAVY_KB * 1024",
+         deduction="PAGE_WEIGHT_VERY_HEAVY",
+         category="CRITICAL",
+         message="Page transfers {transfer_bytes // 1024} KB (very heavy, >{PAGE_WEIGHT_VERY_HEAVY_KB} KB)",
+         bit=12,
+         group="page_weight"),
+    Rule("PAGE_HEAVY", ("transfer_bytes",),
+         when="transfer_bytes is not None and transfer_bytes > PAGE_WEIGHT_HEAVY_KB * 1024",
+         deduction="PAGE_WEIGHT_HEAVY",
+         category="WARNING",
+         message="Page transfers {transfer_bytes // 1024} KB (heavy, >{PAGE_WEIGHT_HEAVY_KB} KB)",
+         bit=13,
+         group="page_weight"),
+    Rule("TOO_MANY_REQUESTS", ("request_count",),
+         when="request_count is not None and request_count > MAX_REQUESTS",
+         deduction="TOO_MANY_REQUESTS",
+         category="WARNING",
+         message="Page makes {request_count} requests (max {MAX_REQUESTS})",
+         bit=14),
+    Rule("SLOW_TTFB", ("ttfb_ms",),
+         when="ttfb_ms is not None and ttfb_ms > TTFB_SLOW_MS",
+         deduction="SLOW_TTFB",
+         category="WARNING",
+         message="Time to first byte is {ttfb_ms}ms (slow, >{TTFB_SLOW_MS}ms)",
+         bit=15),
+    Rule("RENDER_BLOCKING_RESOURCES", ("render_blocking_count", "render_blocking"),
+         when="render_blocking_count is not None and render_blocking_count > RENDER_BLOCKING_MAX",
+         deduction="RENDER_BLOCKING",
+         category="WARNING",
+         message="{render_blocking_count} render-blocking scripts/stylesheets (max {RENDER_BLOCKING_MAX}), e.g. {render_blocking[0]}",
+         bit=16),
+]
+
+_BUILTINS = {"len": len, "min": min, "max": max, "any": any, "all": all}
+
+_compiled: dict[str, Callable] | None = None
+
+
+def register_rule(rule: Rule) -> None:
+    """Add a check; the evaluator is recompiled on next use."""
+    global _compiled
+    if rule.code in ISSUE_CATALOG:
+        raise ValueError(f"Issue {rule.code} is already registered")
+    if any(spec.bit == rule.bit for spec in ISSUE_CATALOG.values()):
+        raise ValueError(f"Issue bit {rule.bit} is already taken")
+    _compile_rules([*RULES, rule])  # fail fast on a bad expression
+    RULES.append(rule)
+    ISSUE_CATALOG[rule.code] = _rule_spec(rule)
+    _compiled = None
+
+
+def score_page(page: Mapping[str, Any]) -> tuple[int, list[IssueResult]]:
+    """
+    Score a single page dict (as produced by the crawler) and return
+    (score, issues). Score is clamped to [0, 100].
+    """
+    return _evaluators()["score_one"](page)
+
+
+def score_pages(pages: Iterable[Mapping[str, Any]]) -> list[tuple[int, list[IssueResult]]]:
+    """score_page over many pages in one call, without per-page call overhead."""
+    return _evaluators()["score_many"](pages)
+
+
+def score_page_compact(page: Mapping[str, Any]) -> tuple[int, int, dict | None]:
     """
-    Score a single page and return (score, issues).
-    Score is clamped to [0, 100].
+    score_page for compact issue storage: returns (score, issue mask, params)
+    without building IssueResult objects or formatting any description.
     """
-    score = BASE_SCORE
-    issues: list[IssueResult] = []
-
-    # HTTP status error
-    if http_status >= 400:
-        deduction = DEDUCTIONS["STATUS_4XX_5XX"]
-        score -= deduction
-        issues.append(IssueResult(
-            code="STATUS_ERROR",
-            description=f"Page returned HTTP {http_status}",
-            impact=deduction,
-            category="CRITICAL",
-        ))
-
-    # Title checks
-    if not title:
-        deduction = DEDUCTIONS["MISSING_TITLE"]
-        score -= deduction
-        issues.append(IssueResult(
-            code="MISSING_TITLE",
-            description="Page is missing a <title> tag",
-            impact=deduction,
-            category="CRITICAL",
-        ))
-    elif len(title) > THRESHOLDS["TITLE_MAX_LENGTH"]:
-        deduction = DEDUCTIONS["TITLE_TOO_LONG"]
-        score -= deduction
-        issues.append(IssueResult(
-            code="TITLE_TOO_LONG",
-            description=f"Title is {len(title)} chars (max {THRESHOLDS['TITLE_MAX_LENGTH']})",
-            impact=deduction,
-            category="WARNING",
-        ))
-
-    # Meta description checks
-    if not meta_description:
-        deduction = DEDUCTIONS["MISSING_META_DESC"]
-        score -= deduction
-        issues.append(IssueResult(
-            code="MISSING_META_DESC",
-            description="Page is missing a meta description",
-            impact=deduction,
-            category="WARNING",
-        ))
-    elif len(meta_description) > THRESHOLDS["META_DESC_MAX_LENGTH"]:
-        deduction = DEDUCTIONS["META_DESC_TOO_LONG"]
-        score -= deduction
-        issues.append(IssueResult(
-            code="META_DESC_TOO_LONG",
-            description=(
-                f"Meta description is {len(meta_description)} chars "
-                f"(max {THRESHOLDS['META_DESC_MAX_LENGTH']})"
-            ),
-            impact=deduction,
-            category="WARNING",
-        ))
-
-    # H1 checks
-    if h1_count == 0:
-        deduction = DEDUCTIONS["MISSING_H1"]
-        score -= deduction
-        issues.append(IssueResult(
-            code="MISSING_H1",
-            description="Page is missing an H1 tag",
-            impact=deduction,
-            category="CRITICAL",
-        ))
-    elif h1_count > 1:
-        deduction = DEDUCTIONS["MULTIPLE_H1"]
-        score -= deduction
-        issues.append(IssueResult(
-            code="MULTIPLE_H1",
-            description=f"Page has {h1_count} H1 tags (should have exactly 1)",
-            impact=deduction,
-            category="WARNING",
-        ))
-
-    # Images missing alt text
-    if images_missing_alt > 0:
+    return _evaluators()["score_one_compact"](page)
+
+
+def score_pages_compact(pages: Iterable[Mapping[str, Any]]) -> list[tuple[int, int, dict | None]]:
+    return _evaluators()["score_many_compact"](pages)
+
+
+def _evaluators() -> dict[str, Callable]:
+    global _compiled
+    if _compiled is None:
+        _compiled = _compile_rules(RULES)
+    return _compiled
+
+
+def _message_args(message: str) -> tuple[str, list[str]]:
+    """Split an f-string body into a positional str.format template and its expressions."""
+    template: list[str] = []
+    args: list[str] = []
+    for literal, expression, spec, conversion in Formatter().parse(message):
+        template.append(literal.replace("{", "{{").replace("}", "}}"))
+        if expression is not None:
+            template.append(
+                "{" + str(len(args))
+                + (f"!{conversion}" if conversion else "")
+                + (f":{spec}" if spec else "") + "}"
+            )
+            args.append(expression)
+    return "".join(template), args
+
+
+def _compile_rules(rules: list[Rule]) -> dict[str, Callable]:
+    """
+    Generate straight-line functions from the registry: each declared field
+    is read from the page once, thresholds and deductions are globals of the
+    generated code, and messages are only formatted for rules that fire.
+    Returns the four score_one / score_many (× _compact) evaluators by name.
+    """
+    constants = {**DEDUCTIONS, **THRESHOLDS}
+    fields = sorted({field for rule in rules for field in rule.fields})
+    closed_groups: set[str] = set()
+
+    prologue = [f"{field} = page.get({field!r})" for field in fields]
+    body = prologue + ["score = BASE_SCORE", "issues = []"]
+    compact_body = prologue + ["score = BASE_SCORE", "mask = 0", "params = {}"]
+    previous_group = None
+    for rule in rules:
+        allowed = set(rule.fields) | constants.keys() | _BUILTINS.keys()
+        for source in (rule.when, rule.deduction, f"f{rule.message!r}"):
+            names = set(compile(source, rule.code, "eval").co_names)
+            if not names <= allowed:
+                raise ValueError(
+                    f"Rule {rule.code} uses undeclared names: {sorted(names - allowed)}"
+                )
+
+        chained = rule.group is not None and rule.group == previous_group
+        if rule.group is not None and not chained:
+            if rule.group in closed_groups:
+                raise ValueError(f"Rules of group {rule.group!r} must be consecutive")
+            closed_groups.add(rule.group)
+        previous_group = rule.group
+        test = [
+            f"{'elif' if chained else 'if'} {rule.when}:",
+            f"    deduction = {rule.deduction}",
+            "    score -= deduction",
+        ]
+        body += test + [
+            f"    issues.append(IssueResult({rule.code!r}, f{rule.message!r}, "
+            f"deduction, {rule.category!r}))",
+        ]
+        compact_body += test + [
+            f"    mask |= {1 << rule.bit}",
+            f"    params[{rule.code!r}] = [deduction, {', '.join(_message_args(rule.message)[1])}]",
+        ]
+    # If no issues found, add a PASSED marker
+    body += [
+        "if not issues:",
+        "    issues.append(IssueResult('ALL_PASSED', 'All SEO checks passed', 0, 'PASSED'))",
+    ]
+
+    def indent(lines: list[str], depth: int) -> str:
+        return "\n".join("    " * depth + line for line in lines)
+
+    source = (
+        "def score_one(page):\n"
+        f"{indent(body, 1)}\n"
+        "    return max(0, score), issues\n"
+        "\n"
+        "def score_many(pages):\n"
+        "    results = []\n"
+        "    for page in pages:\n"
+        f"{indent(body, 2)}\n"
+        "        results.append((max(0, score), issues))\n"
+        "    return results\n"
+        "\n"
+        "def score_one_compact(page):\n"
+        f"{indent(compact_body, 1)}\n"
+        "    return max(0, score), mask, params or None\n"
+        "\n"
+        "def score_many_compact(pages):\n"
+        "    results = []\n"
+        "    for page in pages:\n"
+        f"{indent(compact_body, 2)}\n"
+        "        results.append((max(0, score), mask, params or None))\n"
+        "    return results\n"
+    )
+    namespace = {**constants, **_BUILTINS, "BASE_SCORE": BASE_SCORE, "IssueResult": IssueResult}
+    exec(compile(source, "<scoring rules>", "exec"), namespace)
+    return {
+        name: namespace[name]
+        for name in ("score_one", "score_many", "score_one_compact", "score_many_compact")
+    }
+
+
+def score_broken_links(
+    broken_internal: list[str],
+    broken_external: list[str],
+) -> list[IssueResult]:
+    """
+    Issues for links on a page whose targets are broken (4xx/5xx or unreachable).
+    The combined deduction is capped at BROKEN_LINKS_MAX.
+    """
+    entries = broken_link_params(broken_internal, broken_external)
+    return [_render(code, entry) for code, entry in entries.items()]
+
+
+def broken_link_params(
+    broken_internal: list[str],
+    broken_external: list[str],
+) -> dict[str, list]:
+    """score_broken_links as compact issueParams entries, {code: [impact, *args]}."""
+    entries: dict[str, list] = {}
+    budget = DEDUCTIONS["BROKEN_LINKS_MAX"]
+
+    if broken_internal:
         deduction = min(
-            images_missing_alt * DEDUCTIONS["IMAGE_MISSING_ALT"],
-            DEDUCTIONS["IMAGE_MISSING_ALT_MAX"],
+            len(broken_internal) * DEDUCTIONS["BROKEN_INTERNAL_LINK"], budget
         )
-        score -= deduction
-        issues.append(IssueResult(
-            code="IMAGES_MISSING_ALT",
-            description=f"{images_missing_alt} image(s) are missing alt text",
-            impact=deduction,
-            category="WARNING",
-        ))
-
-    # Load time checks
-    if load_time_ms is not None:
-        if load_time_ms > THRESHOLDS["LOAD_TIME_VERY_SLOW_MS"]:
-            deduction = DEDUCTIONS["LOAD_TIME_VERY_SLOW"]
-            score -= deduction
-            issues.append(IssueResult(
-                code="LOAD_TIME_VERY_SLOW",
-                description=f"Page load time is {load_time_ms}ms (very slow, >5000ms)",
-                impact=deduction,
-                category="CRITICAL",
-            ))
-        elif load_time_ms > THRESHOLDS["LOAD_TIME_SLOW_MS"]:
-            deduction = DEDUCTIONS["LOAD_TIME_SLOW"]
-            score -= deduction
-            issues.append(IssueResult(
-                code="LOAD_TIME_SLOW",
-                description=f"Page load time is {load_time_ms}ms (slow, >3000ms)",
-                impact=deduction,
-                category="WARNING",
-            ))
-
-    score = max(0, score)
+        budget -= deduction
+        entries["BROKEN_INTERNAL_LINKS"] = [deduction, len(broken_internal), broken_internal[0]]
 
-    # If no issues found, add a PASSED marker
-    if not issues:
-        issues.append(IssueResult(
-            code="ALL_PASSED",
-            description="All SEO checks passed",
-            impact=0,
-            category="PASSED",
-        ))
-
-    return score, issues
+    if broken_external:
+        deduction = min(
+            len(broken_external) * DEDUCTIONS["BROKEN_EXTERNAL_LINK"], budget
+        )
+        entries["BROKEN_EXTERNAL_LINKS"] = [deduction, len(broken_external), broken_external[0]]
+
+    return entries
+
+
+# ─── Issue catalog / compact encoding ─────────────────────────────────────────
+# In compact storage a page keeps its issues as PageResult.issueMask (one bit
+# per code) plus issueParams, {code: [impact, *message args]}. Descriptions
+# are rendered from this catalog at read time; bits must never be reused.
+
+@dataclass(frozen=True)
+class IssueSpec:
+    bit: int
+    category: IssueCategory
+    template: str  # str.format template over the stored message args
+
+
+def _rule_spec(rule: Rule) -> IssueSpec:
+    return IssueSpec(rule.bit, rule.category, _message_args(rule.message)[0])
+
+
+ISSUE_CATALOG: dict[str, IssueSpec] = {
+    **{rule.code: _rule_spec(rule) for rule in RULES},
+    "BROKEN_INTERNAL_LINKS": IssueSpec(
+        10, "CRITICAL", "{0} internal link(s) are broken, e.g. {1}"
+    ),
+    "BROKEN_EXTERNAL_LINKS": IssueSpec(
+        11, "WARNING", "{0} external link(s) are broken, e.g. {1}"
+    ),
+}
+
+def _render(code: str, entry: list) -> IssueResult:
+    spec = ISSUE_CATALOG[code]
+    impact, *args = entry
+    return IssueResult(code, spec.template.format(*args), impact, spec.category)
+
+
+def decode_issues(mask: int, params: Mapping[str, list] | None) -> list[IssueResult]:
+    """Issues of a compact-stored page, in catalog order; ALL_PASSED when clean."""
+    if not mask:
+        return [IssueResult("ALL_PASSED", "All SEO checks passed", 0, "PASSED")]
+    return [
+        _render(code, params[code])
+        for code, spec in ISSUE_CATALOG.items()
+        if mask >> spec.bit & 1
+    ]
+
+
+def issue_bits(codes: Iterable[str]) -> int:
+    """Mask with the bits of the given issue codes set."""
+    mask = 0
+    for code in codes:
+        mask |= 1 << ISSUE_CATALOG[code].bit
+    return mask
 
 
 def get_category(score: int) -> IssueCategory:
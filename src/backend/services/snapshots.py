@@ -0,0 +1,114 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+import zstandard
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import get_settings
+from models.orm import PageResult
+from utils.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+SUFFIX = ".html.zst"
+UNLINK_CHUNK = 1000
+
+# zstd (de)compressor objects are not safe to share between threads
+_local = threading.local()
+
+
+def snapshot_path(html_hash: str) -> Path:
+    """snapshot_dir/<first two hex chars>/<sha256>.html.zst"""
+    return Path(settings.snapshot_dir) / html_hash[:2] / f"{html_hash}{SUFFIX}"
+
+
+def store_snapshot(html: str) -> str:
+    """
+    Store rendered HTML under its SHA-256 and return the hash. Identical pages
+    (across scans and sites) share one file; storing an existing snapshot only
+    refreshes its mtime, which is what the retention policy looks at.
+    Blocking — call via asyncio.to_thread from async code.
+    """
+    data = html.encode("utf-8")
+    html_hash = hashlib.sha256(data).hexdigest()
+    path = snapshot_path(html_hash)
+    if path.exists():
+        os.utime(path)
+        return html_hash
+
+    compressor = getattr(_local, "compressor", None)
+    if compressor is None:
+        compressor = _local.compressor = zstandard.ZstdCompressor(
+            level=settings.snapshot_compression_level
+        )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write-then-rename so readers never see a partial file
+    staging = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    staging.write_bytes(compressor.compress(data))
+    os.replace(staging, path)
+    return html_hash
+
+
+def load_snapshot(html_hash: str) -> str | None:
+    """Decompressed HTML for a hash, or None if it has been pruned."""
+    try:
+        data = snapshot_path(html_hash).read_bytes()
+    except FileNotFoundError:
+        return None
+    decompressor = getattr(_local, "decompressor", None)
+    if decompressor is None:
+        decompressor = _local.decompressor = zstandard.ZstdDecompressor()
+    return decompressor.decompress(data).decode("utf-8")
+
+
+async def prune_snapshots(db: AsyncSession) -> int:
+    """
+    Delete snapshots not stored or re-stored within snapshot_retention_days
+    and clear PageResult.htmlHash for them. Returns the number of files removed.
+    """
+    cutoff = time.time() - settings.snapshot_retention_days * 86400
+    removed = await asyncio.to_thread(_unlink_older_than, cutoff)
+    for i in range(0, len(removed), UNLINK_CHUNK):
+        await db.execute(
+            update(PageResult)
+            .where(PageResult.htmlHash.in_(removed[i:i + UNLINK_CHUNK]))
+            .values(htmlHash=None)
+        )
+    await db.commit()
+    return len(removed)
+
+
+def _unlink_older_than(cutoff: float) -> list[str]:
+    root = Path(settings.snapshot_dir)
+    if not root.is_dir():
+        return []
+    removed: list[str] = []
+    for shard in os.scandir(root):
+        if not shard.is_dir():
+            continue
+        for entry in os.scandir(shard.path):
+            if not entry.name.endswith(SUFFIX):
+                continue
+            if entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+                removed.append(entry.name[: -len(SUFFIX)])
+    return removed
+
+
+# Run periodically, e.g. from cron:  python -m services.snapshots
+async def _main() -> None:
+    async with AsyncSessionLocal() as db:
+        count = await prune_snapshots(db)
+    logger.info("Pruned %d snapshot(s)", count)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main())
@@ -1,31 +1,142 @@
+import asyncio
 import json
-from collections import defaultdict
+from collections import OrderedDict, defaultdict, deque
+from dataclasses import dataclass, field
 from fastapi import WebSocket
 
+from config import get_settings
+from services.pubsub import PubSubBackend, create_backend
+
+settings = get_settings()
+
+# Event type → scan status it implies, for the snapshot
+_STATUS_BY_EVENT = {"completed": "COMPLETED", "error": "FAILED", "cancelled": "CANCELLED"}
+
+
+@dataclass
+class ScanState:
+    """Latest known state of one scan plus a ring buffer of recent events."""
+    seq: int = 0
+    snapshot: dict = field(default_factory=dict)
+    events: deque = field(default_factory=lambda: deque(maxlen=settings.ws_replay_buffer_size))
+
+    def apply(self, message: dict) -> None:
+        self.seq = message.get("seq", self.seq)
+        self.events.append(message)
+        self.snapshot.update(
+            (k, v) for k, v in message.items() if k not in ("type", "seq", "message")
+        )
+        if message["type"] in _STATUS_BY_EVENT:
+            self.snapshot["status"] = _STATUS_BY_EVENT[message["type"]]
+
 
 class ConnectionManager:
-    def __init__(self) -> None:
+    """
+    Per-process registry of scan WebSockets. `broadcast` publishes through the
+    pub/sub backend; the process's single subscription delivers each event to
+    the sockets connected here, so any worker can serve any scan.
+
+    Every delivered event also updates an in-memory ScanState, so a client
+    that joins late (or reconnects with ?since=<seq>) catches up from memory
+    instead of polling the database.
+    """
+
+    def __init__(self, backend: PubSubBackend | None = None) -> None:
         self._connections: dict[str, list[WebSocket]] = defaultdict(list)
+        self._backend = backend or create_backend()
+        self._started = False
+        self._start_lock = asyncio.Lock()
+        self._states: OrderedDict[str, ScanState] = OrderedDict()
+        self._next_seq: dict[str, int] = defaultdict(int)
+        # Sockets still receiving replay; live events queue here meanwhile
+        self._catching_up: dict[WebSocket, list[str]] = {}
 
-    async def connect(self, scan_id: str, websocket: WebSocket) -> None:
+    async def start(self) -> None:
+        async with self._start_lock:
+            if not self._started:
+                await self._backend.start(self._deliver)
+                self._started = True
+
+    async def stop(self) -> None:
+        if self._started:
+            await self._backend.stop()
+            self._started = False
+
+    async def connect(self, scan_id: str, websocket: WebSocket, since: int | None = None) -> None:
+        # Subscribe lazily: processes that only publish (crawlers) never listen
+        await self.start()
         await websocket.accept()
+
+        # Register and capture catch-up data without awaiting in between, so
+        # no event can fall into the gap; events arriving during replay are
+        # queued and flushed in order afterwards.
+        pending: list[str] = []
+        self._catching_up[websocket] = pending
         self._connections[scan_id].append(websocket)
+        catch_up = self._catch_up(scan_id, since)
+
+        try:
+            for text in catch_up:
+                await websocket.send_text(text)
+            while pending:
+                await websocket.send_text(pending.pop(0))
+        finally:
+            self._catching_up.pop(websocket, None)
+
+    def _catch_up(self, scan_id: str, since: int | None) -> list[str]:
+        state = self._states.get(scan_id)
+        if state is None:
+            return []
+        events = list(state.events)
+        if since is not None and (not events or events[0]["seq"] <= since + 1):
+            # Contiguous resume: only what the client missed
+            return [json.dumps(e) for e in events if e["seq"] > since]
+        snapshot = {"type": "snapshot", "seq": state.seq, "scanId": scan_id, **state.snapshot}
+        return [json.dumps(snapshot)] + [json.dumps({**e, "replay": True}) for e in events]
 
     def disconnect(self, scan_id: str, websocket: WebSocket) -> None:
+        self._catching_up.pop(websocket, None)
         self._connections[scan_id].remove(websocket)
         if not self._connections[scan_id]:
             del self._connections[scan_id]
 
     async def broadcast(self, scan_id: str, message: dict) -> None:
-        connections = self._connections.get(scan_id, [])
+        # The crawler running a scan is its only publisher, so it numbers events
+        self._next_seq[scan_id] += 1
+        message = {**message, "seq": self._next_seq[scan_id]}
+        if message["type"] in _STATUS_BY_EVENT:
+            del self._next_seq[scan_id]
+        await self._backend.publish(scan_id, message)
+
+    async def _deliver(self, scan_id: str, message: dict) -> None:
+        self._state_for(scan_id).apply(message)
+
+        connections = self._connections.get(scan_id)
+        if not connections:
+            return
+        text = json.dumps(message)
         dead: list[WebSocket] = []
-        for ws in connections:
+        for ws in list(connections):
+            pending = self._catching_up.get(ws)
+            if pending is not None:
+                pending.append(text)
+                continue
             try:
-                await ws.send_text(json.dumps(message))
+                await ws.send_text(text)
             except Exception:
                 dead.append(ws)
         for ws in dead:
             self.disconnect(scan_id, ws)
 
+    def _state_for(self, scan_id: str) -> ScanState:
+        state = self._states.get(scan_id)
+        if state is None:
+            state = self._states[scan_id] = ScanState()
+            while len(self._states) > settings.ws_tracked_scans:
+                self._states.popitem(last=False)
+        else:
+            self._states.move_to_end(scan_id)
+        return state
+
 
 manager = ConnectionManager()
@@ -1,13 +1,84 @@
+import time
+from collections import deque
 from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from config import get_settings
 
 settings = get_settings()
 
-engine = create_async_engine(
-    settings.async_database_url,
-    echo=settings.debug,
-    pool_pre_ping=True,
+WAIT_SAMPLES = 1000
+
+
+class PoolMetrics:
+    """Checkout wait times for one engine's pool, for /metrics/db."""
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.total_wait_s = 0.0
+        self.max_wait_s = 0.0
+        self.recent_waits: deque[float] = deque(maxlen=WAIT_SAMPLES)
+
+    def record(self, wait_s: float) -> None:
+        self.checkouts += 1
+        self.total_wait_s += wait_s
+        self.max_wait_s = max(self.max_wait_s, wait_s)
+        self.recent_waits.append(wait_s)
+
+
+class _TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.metrics.record(time.perf_counter() - start)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def _create_engine(url: str, pool_size: int, max_overflow: int) -> AsyncEngine:
+    # asyncpg's prepared-statement cache lets repeated ORM queries skip
+    # server-side parse/plan on every execution
+    url = make_url(url).update_query_dict(
+        {"prepared_statement_cache_size": str(settings.db_statement_cache_size)}
+    )
+    return create_async_engine(
+        url,
+        echo=settings.debug,
+        poolclass=_TimedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        # Recycling stale connections replaces the per-checkout ping round-trip
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+
+
+# API request traffic
+engine = _create_engine(
+    settings.async_database_url, settings.db_pool_size, settings.db_max_overflow
+)
+# Crawlers get their own pool so long scans can't starve API requests
+crawler_engine = _create_engine(
+    settings.async_database_url, settings.crawler_db_pool_size, settings.crawler_db_max_overflow
+)
+# Dashboard reads go to the replica when one is configured
+read_engine = (
+    _create_engine(settings.async_read_database_url, settings.db_pool_size, settings.db_max_overflow)
+    if settings.database_read_url
+    else engine
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -16,6 +87,18 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False,
 )
 
+CrawlerSessionLocal = async_sessionmaker(
+    crawler_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
+ReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
@@ -25,3 +108,45 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         except Exception:
             await session.rollback()
             raise
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Read-only session for dashboard queries; uses the replica if configured."""
+    async with ReadSessionLocal() as session:
+        yield session
+
+
+def pool_stats() -> dict[str, dict]:
+    # engine and its configured max_overflow (not exposed by the pool API)
+    engines = {
+        "api": (engine, settings.db_max_overflow),
+        "crawler": (crawler_engine, settings.crawler_db_max_overflow),
+    }
+    if read_engine is not engine:
+        engines["read"] = (read_engine, settings.db_max_overflow)
+
+    stats: dict[str, dict] = {}
+    for name, (eng, max_overflow) in engines.items():
+        pool = eng.pool
+        capacity = pool.size() + max_overflow
+        waits = sorted(pool.metrics.recent_waits)
+        stats[name] = {
+            "size": pool.size(),
+            "maxOverflow": max_overflow,
+            "checkedOut": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "saturation": pool.checkedout() / capacity if capacity else 0.0,
+            "checkouts": pool.metrics.checkouts,
+            "avgWaitMs": (
+                pool.metrics.total_wait_s / pool.metrics.checkouts * 1000
+                if pool.metrics.checkouts else 0.0
+            ),
+            "maxWaitMs": pool.metrics.max_wait_s * 1000,
+            "p99WaitMs": waits[int(len(waits) * 0.99)] * 1000 if waits else 0.0,
+        }
+    return stats
+
+
+async def dispose_engines() -> None:
+    for eng in {engine, crawler_engine, read_engine}:
+        await eng.dispose()
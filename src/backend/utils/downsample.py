@@ -0,0 +1,44 @@
+from typing import Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+def lttb(points: Sequence[T], threshold: int, x=lambda p: p[0], y=lambda p: p[1]) -> list[T]:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+    Keeps the first and last point and, for every bucket in between, the point
+    forming the largest triangle with its neighbours — preserving the visual
+    shape of a series with far fewer points. `x`/`y` extract numeric coordinates.
+    """
+    n = len(points)
+    if threshold >= n or threshold < 3:
+        return list(points)
+
+    sampled = [points[0]]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0  # index of the previously selected point
+
+    for i in range(threshold - 2):
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+
+        # Average of the next bucket is the third triangle vertex
+        next_start = end
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        next_points = points[next_start:next_end]
+        avg_x = sum(x(p) for p in next_points) / len(next_points)
+        avg_y = sum(y(p) for p in next_points) / len(next_points)
+
+        ax, ay = x(points[a]), y(points[a])
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs(
+                (ax - avg_x) * (y(points[j]) - ay) - (ax - x(points[j])) * (avg_y - ay)
+            )
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append(points[best])
+        a = best
+
+    sampled.append(points[-1])
+    return sampled
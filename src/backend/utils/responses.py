@@ -0,0 +1,59 @@
+import gzip
+from typing import Any, Iterable, Sequence
+
+import orjson
+from fastapi import Request, Response
+
+try:
+    import brotli  # optional; without it responses fall back to gzip
+except ImportError:
+    brotli = None
+
+MIN_COMPRESS_BYTES = 1024  # smaller bodies aren't worth the CPU
+GZIP_LEVEL = 3  # about half the CPU of level 6 for ~10% larger JSON
+BROTLI_QUALITY = 4  # a fast level; higher ones cost far more CPU for little gain on JSON
+
+
+def fast_json(request: Request, content: Any, status_code: int = 200) -> Response:
+    """
+    JSON encoded with orjson and compressed per the request's Accept-Encoding
+    (br when brotli is installed, else gzip). Returned from a handler it also
+    skips FastAPI's response_model validation, so callers must shape the
+    content to match the declared model themselves.
+    """
+    body = orjson.dumps(content)
+    headers = {"Vary": "Accept-Encoding"}
+    if len(body) >= MIN_COMPRESS_BYTES:
+        encoding = _negotiate(request.headers.get("accept-encoding", ""))
+        if encoding == "br":
+            body = brotli.compress(body, quality=BROTLI_QUALITY)
+        elif encoding == "gzip":
+            body = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+    return Response(body, status_code=status_code, media_type="application/json", headers=headers)
+
+
+def fast_json_rows(request: Request, keys: Sequence[str], rows: Iterable[Sequence]) -> Response:
+    """fast_json for a list endpoint: rows are tuples in `keys` order, sent as objects."""
+    return fast_json(request, [dict(zip(keys, row)) for row in rows])
+
+
+def _negotiate(accept_encoding: str) -> str | None:
+    """The best of br / gzip the client accepts (q > 0), or None for identity."""
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip()] = q
+    wildcard = accepted.get("*", 0.0)
+    candidates = (["br"] if brotli is not None else []) + ["gzip"]
+    scored = [(accepted.get(name, wildcard), name) for name in candidates]
+    best_q, best = max(scored, key=lambda pair: pair[0])  # ties keep br first
+    return best if best_q > 0 else None
@@ -1,6 +1,6 @@
 'use client';
 
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { Shell } from '@/components/layout/Shell';
 import { MetricCard } from '@/components/ui/MetricCard';
 import { ScoreBadge } from '@/components/ui/ScoreBadge';
@@ -28,6 +28,7 @@ export default function DashboardPage() {
   const { messages } = useWebSocket(
     scanning && activeScan ? activeScan.id : null,
   );
+  const handledRef = useRef(0);
 
   // Load sites on mount
   useEffect(() => {
@@ -57,7 +58,7 @@ export default function DashboardPage() {
         if (scans.length === 0) return;
         const latest = scans[0];
         setActiveScan(latest);
-        if (latest.status === 'COMPLETED') {
+        if (latest.status === 'COMPLETED' || latest.status === 'CANCELLED') {
           scansApi.results(latest.id).then(setResults).catch(console.error);
         } else if (latest.status === 'RUNNING') {
           setScanning(true);
@@ -66,33 +67,69 @@ export default function DashboardPage() {
       .catch(console.error);
   }, [selectedSite]);
 
-  // Handle WebSocket messages
+  // Handle WebSocket messages. A (re)connect delivers a snapshot plus
+  // replayed events in one burst, so every message not yet handled is
+  // processed, not just the latest
   useEffect(() => {
-    if (messages.length === 0) return;
-    const last = messages[messages.length - 1];
+    if (messages.length < handledRef.current) handledRef.current = 0;
+    const unhandled = messages.slice(handledRef.current);
+    handledRef.current = messages.length;
 
-    if (last.type === 'page_crawled') {
-      setActiveScan((prev) =>
-        prev
-          ? {
-              ...prev,
-              pagesScanned: (last.pagesScanned as number) ?? prev.pagesScanned,
-              pagesFound: (last.pagesFound as number) ?? prev.pagesFound,
-            }
-          : prev,
-      );
-    } else if (last.type === 'completed' && activeScan) {
-      setScanning(false);
-      scansApi.results(activeScan.id).then(setResults).catch(console.error);
-      if (selectedSite) {
-        sitesApi.trends(selectedSite.id).then(setTrends).catch(console.error);
+    for (const msg of unhandled) {
+      if (msg.type === 'snapshot') {
+        // Sent on connect and on a resume the server can't replay contiguously:
+        // the scan's whole current state, which replaces whatever we had
+        const status = msg.status as ScanTask['status'] | undefined;
+        setActiveScan((prev) =>
+          prev
+            ? {
+                ...prev,
+                status: status ?? prev.status,
+                stopReason: (msg.stopReason as ScanTask['stopReason']) ?? prev.stopReason,
+                pagesScanned: (msg.pagesScanned as number) ?? prev.pagesScanned,
+                pagesFound: (msg.pagesFound as number) ?? prev.pagesFound,
+              }
+            : prev,
+        );
+        if (status === 'COMPLETED' || status === 'CANCELLED' || status === 'FAILED') {
+          setScanning(false);
+          if (status !== 'FAILED' && activeScan) {
+            scansApi.results(activeScan.id).then(setResults).catch(console.error);
+          }
+        }
+      } else if (msg.type === 'page_crawled') {
+        setActiveScan((prev) =>
+          prev
+            ? {
+                ...prev,
+                pagesScanned: (msg.pagesScanned as number) ?? prev.pagesScanned,
+                pagesFound: (msg.pagesFound as number) ?? prev.pagesFound,
+              }
+            : prev,
+        );
+      } else if (msg.type === 'completed' && activeScan) {
+        setScanning(false);
+        scansApi.results(activeScan.id).then(setResults).catch(console.error);
+        if (selectedSite) {
+          sitesApi.trends(selectedSite.id).then(setTrends).catch(console.error);
+        }
+        setActiveScan((prev) =>
+          prev
+            ? {
+                ...prev,
+                status: 'COMPLETED',
+                stopReason: (msg.stopReason as ScanTask['stopReason']) ?? null,
+              }
+            : prev,
+        );
+      } else if (msg.type === 'cancelled' && activeScan) {
+        setScanning(false);
+        scansApi.results(activeScan.id).then(setResults).catch(console.error);
+        setActiveScan((prev) => (prev ? { ...prev, status: 'CANCELLED' } : prev));
+      } else if (msg.type === 'error') {
+        setScanning(false);
+        setActiveScan((prev) => (prev ? { ...prev, status: 'FAILED' } : prev));
       }
-      setActiveScan((prev) =>
-        prev ? { ...prev, status: 'COMPLETED' } : prev,
-      );
-    } else if (last.type === 'error') {
-      setScanning(false);
-      setActiveScan((prev) => (prev ? { ...prev, status: 'FAILED' } : prev));
     }
   // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [messages]);
@@ -110,6 +147,15 @@ export default function DashboardPage() {
     }
   };
 
+  const cancelScan = async () => {
+    if (!activeScan || !scanning) return;
+    try {
+      await scansApi.cancel(activeScan.id);
+    } catch (err) {
+      console.error(err);
+    }
+  };
+
   const handleAddSite = async (e: React.FormEvent) => {
     e.preventDefault();
     if (!newSiteName || !newSiteDomain) return;
@@ -272,6 +318,11 @@ export default function DashboardPage() {
                     }`}
                   >
                     {scanStatus}
+                    {scanStatus === 'COMPLETED' && activeScan.stopReason && (
+                      <span className="text-gray-400 font-normal ml-1">
+                        (partial: {activeScan.stopReason.toLowerCase().replace('_', ' ')} budget)
+                      </span>
+                    )}
                     {scanning && (
                       <span className="text-gray-400 font-normal ml-1">
                         ({activeScan.pagesScanned}/{activeScan.pagesFound} pages)
@@ -280,13 +331,23 @@ export default function DashboardPage() {
                   </span>
                 )}
               </div>
-              <button
-                onClick={startScan}
-                disabled={scanning}
-                className="px-4 py-2 bg-brand-600 text-white rounded-lg text-sm hover:bg-brand-700 disabled:opacity-50 transition-colors"
-              >
-                {scanning ? 'Scanning…' : 'Start Scan'}
-              </button>
+              <div className="flex items-center gap-2">
+                {scanning && activeScan && (
+                  <button
+                    onClick={cancelScan}
+                    className="px-4 py-2 border border-gray-300 dark:border-gray-600 text-gray-700 dark:text-gray-300 rounded-lg text-sm hover:bg-gray-50 dark:hover:bg-gray-800 transition-colors"
+                  >
+                    Cancel
+                  </button>
+                )}
+                <button
+                  onClick={startScan}
+                  disabled={scanning}
+                  className="px-4 py-2 bg-brand-600 text-white rounded-lg text-sm hover:bg-brand-700 disabled:opacity-50 transition-colors"
+                >
+                  {scanning ? 'Scanning…' : 'Start Scan'}
+                </button>
+              </div>
             </div>
 
             {/* Metrics row */}
@@ -130,6 +130,27 @@ export function PageDiagnosisDrawer({
                     {page.imagesMissingAlt} / {page.imagesTotal}
                   </p>
                 </div>
+                {page.pageWeight && (
+                  <>
+                    <div>
+                      <p className="text-xs text-gray-400 dark:text-gray-500 mb-0.5">
+                        TTFB
+                      </p>
+                      <p className="font-medium text-gray-800 dark:text-gray-200">
+                        {page.pageWeight.ttfbMs != null ? `${page.pageWeight.ttfbMs}ms` : '—'}
+                      </p>
+                    </div>
+                    <div>
+                      <p className="text-xs text-gray-400 dark:text-gray-500 mb-0.5">
+                        Page Weight
+                      </p>
+                      <p className="font-medium text-gray-800 dark:text-gray-200">
+                        {Math.round(page.pageWeight.transferBytes / 1024)} KB ·{' '}
+                        {page.pageWeight.requestCount} requests
+                      </p>
+                    </div>
+                  </>
+                )}
               </div>
 
               {/* Issues */}
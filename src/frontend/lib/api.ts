@@ -40,6 +40,8 @@ export const scansApi = {
   create: (payload: { siteId: string }): Promise<ScanTask> =>
     request('/scans', { method: 'POST', body: JSON.stringify(payload) }),
   get: (scanId: string): Promise<ScanTask> => request(`/scans/${scanId}`),
+  cancel: (scanId: string): Promise<ScanTask> =>
+    request(`/scans/${scanId}/cancel`, { method: 'POST' }),
   results: (scanId: string): Promise<PageResult[]> =>
     request(`/scans/${scanId}/results`),
 };
@@ -14,6 +14,9 @@ export function createWebSocketClient(scanId: string): WebSocketClient {
   let ws: WebSocket | null = null;
   let messageHandler: ((msg: WsMessage) => void) | null = null;
   let statusHandler: ((status: WsStatus) => void) | null = null;
+  // Last event sequence seen — reconnects resume from here instead of
+  // re-fetching scan state over REST
+  let lastSeq: number | null = null;
 
   const setStatus = (s: WsStatus) => statusHandler?.(s);
 
@@ -21,13 +24,15 @@ export function createWebSocketClient(scanId: string): WebSocketClient {
     connect() {
       if (ws) return;
       setStatus('connecting');
-      ws = new WebSocket(`${WS_BASE}/ws/scans/${scanId}`);
+      const since = lastSeq !== null ? `?since=${lastSeq}` : '';
+      ws = new WebSocket(`${WS_BASE}/ws/scans/${scanId}${since}`);
 
       ws.onopen = () => setStatus('open');
 
       ws.onmessage = (event) => {
         try {
           const msg = JSON.parse(event.data as string) as WsMessage;
+          if (typeof msg.seq === 'number') lastSeq = msg.seq;
           messageHandler?.(msg);
         } catch {
           // ignore malformed frames
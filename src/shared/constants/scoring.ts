@@ -12,12 +12,25 @@ export const SEO_SCORE = {
     IMAGE_MISSING_ALT_MAX: 20,
     LOAD_TIME_SLOW: 10,
     LOAD_TIME_VERY_SLOW: 20,
+    PAGE_WEIGHT_HEAVY: 5,
+    PAGE_WEIGHT_VERY_HEAVY: 15,
+    TOO_MANY_REQUESTS: 5,
+    SLOW_TTFB: 5,
+    RENDER_BLOCKING: 5,
+    BROKEN_INTERNAL_LINK: 5,
+    BROKEN_EXTERNAL_LINK: 2,
+    BROKEN_LINKS_MAX: 20,
   },
   THRESHOLDS: {
     TITLE_MAX_LENGTH: 60,
     META_DESC_MAX_LENGTH: 160,
     LOAD_TIME_SLOW_MS: 3000,
     LOAD_TIME_VERY_SLOW_MS: 5000,
+    PAGE_WEIGHT_HEAVY_KB: 3000,
+    PAGE_WEIGHT_VERY_HEAVY_KB: 6000,
+    MAX_REQUESTS: 100,
+    TTFB_SLOW_MS: 800,
+    RENDER_BLOCKING_MAX: 2,
   },
   CATEGORIES: {
     CRITICAL_BELOW: 50,
@@ -26,4 +39,6 @@ export const SEO_SCORE = {
 } as const;
 
 export type IssueCategory = 'CRITICAL' | 'WARNING' | 'PASSED';
-export type ScanStatus = 'PENDING' | 'RUNNING' | 'COMPLETED' | 'FAILED';
+export type ScanStatus = 'PENDING' | 'RUNNING' | 'COMPLETED' | 'FAILED' | 'CANCELLED';
+export type ScanStopReason = 'CANCELLED' | 'WALL_TIME' | 'BYTES' | 'BROWSER_MEMORY';
+export type ScanMode = 'CRAWL' | 'URL_LIST' | 'SITEMAP' | 'SAMPLE';
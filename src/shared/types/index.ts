@@ -1,11 +1,12 @@
-import type { IssueCategory, ScanStatus } from '../constants/scoring';
+import type { IssueCategory, ScanMode, ScanStatus, ScanStopReason } from '../constants/scoring';
 
-export type { IssueCategory, ScanStatus };
+export type { IssueCategory, ScanMode, ScanStatus, ScanStopReason };
 
 export interface Site {
   id: string;
   name: string;
   domain: string;
+  tenantId: string | null;
   createdAt: string;
   updatedAt: string;
 }
@@ -13,15 +14,35 @@ export interface Site {
 export interface ScanTask {
   id: string;
   siteId: string;
+  batchId: string | null;
   status: ScanStatus;
+  mode: ScanMode;
+  stopReason: ScanStopReason | null; // set on a COMPLETED scan = partial
+  maxWallSeconds: number | null;
+  maxBytes: number | null;
+  maxBrowserMemoryMb: number | null;
+  sampleSize: number | null;
   pagesFound: number;
   pagesScanned: number;
   startedAt: string | null;
   completedAt: string | null;
+  archivedAt: string | null;
   createdAt: string;
   updatedAt: string;
 }
 
+/** Navigation/Resource Timing summary; times are ms from navigation start. */
+export interface PageWeight {
+  ttfbMs: number | null;
+  domContentLoadedMs: number | null;
+  loadEventMs: number | null;
+  requestCount: number;
+  transferBytes: number;
+  byType: Record<string, [requests: number, bytes: number]>;
+  renderBlocking: string[];
+  renderBlockingCount: number | null;
+}
+
 export interface PageResult {
   id: string;
   scanTaskId: string;
@@ -38,7 +59,11 @@ export interface PageResult {
   imagesTotal: number;
   imagesMissingAlt: number;
   loadTimeMs: number | null;
+  pageWeight: PageWeight | null;
   seoScore: number;
+  pageRank: number | null;
+  inlinks: number | null;
+  clickDepth: number | null;
   crawledAt: string;
 }
 
@@ -65,6 +90,11 @@ export interface ScoreHistory {
   siteId: string;
   avgScore: number;
   pagesCount: number;
+  /** Set for SAMPLE scans: avgScore is an estimate from this many pages. */
+  sampleSize: number | null;
+  avgScoreLow: number | null;
+  avgScoreHigh: number | null;
+  issuePrevalence: Record<string, [share: number, low: number, high: number]> | null;
   recordedAt: string;
 }
 